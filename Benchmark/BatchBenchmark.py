@@ -0,0 +1,99 @@
+'''
+比較逐筆 update 與批次 update_batch 的每筆結果成本。
+updater 每次通知都會 emit 一次 ModelSentinel.sig_state，模擬 ViewModelUpdater 的行為。
+
+執行方式 (repo 根目錄):
+    python -m Benchmark.BatchBenchmark --results 200000 --batch 1 16 256
+'''
+from __future__ import annotations
+import argparse
+import collections
+import logging
+import time
+from typing import Any, List
+from FiniteReceiverMachine.FiniteReceiveMachine import FiniteReceiveMachine
+from FiniteReceiverMachine.Logger import log
+from ViewModel import ModelSentinel
+
+
+class QueueReceiver():
+    def __init__(self, n:int):
+        self._queue = collections.deque(range(n))
+
+    def getResults(self) -> Any:
+        try:
+            return self._queue.popleft()
+        except IndexError:
+            return None
+
+    def setConfigs(self, **kwargs) -> None:...
+
+    def trigger(self, **kwargs) -> None:...
+
+    def stop(self) -> None:...
+
+
+class SignalUpdater():
+    '''每筆結果 emit 一次 sig_state。'''
+    def __init__(self):
+        self.sentinel = ModelSentinel()
+        self.sentinel.sig_state.connect(self.getModelState)
+        self.last = None
+        self.renders = 0
+
+    def getModelState(self, updater):
+        self.renders += 1
+
+    def update(self, res) -> None:
+        self.last = res
+        self.sentinel.sig_state.emit(self)
+
+    def setConfigs(self, **kwargs) -> None:...
+
+
+class BatchSignalUpdater(SignalUpdater):
+    '''整批結果只 emit 一次 sig_state。'''
+    def update_batch(self, results:List[Any]) -> None:
+        self.last = results[-1]
+        self.sentinel.sig_state.emit(self)
+
+
+def benchmark(n:int, batch:int)->dict:
+    updater = BatchSignalUpdater() if batch > 1 else SignalUpdater()
+    frm = FiniteReceiveMachine()
+    frm.setFRM(QueueReceiver(n), updater)
+    if batch > 1:
+        frm.setBatch(max_size=batch)
+    start = time.perf_counter()
+    while frm.get():
+        pass
+    elapsed = time.perf_counter() - start
+    return {'batch': batch, 'results': n, 'renders': updater.renders,
+            'ns_per_result': 1e9 * elapsed / n, 'results_per_sec': n / elapsed}
+
+
+def suite(quick:bool=False)->List[dict]:
+    n = 20000 if quick else 200000
+    results = []
+    for batch in (1, 16, 256):
+        r = benchmark(n, batch)
+        r['name'] = f'batch/{batch}'
+        results.append(r)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--results', type=int, default=200000)
+    parser.add_argument('--batch', type=int, nargs='+', default=[1, 16, 256])
+    args = parser.parse_args()
+    log.setLevel(logging.WARNING)
+
+    print(f"{'batch':>6}{'renders':>10}{'ns/result':>12}{'results/s':>14}")
+    for batch in args.batch:
+        r = benchmark(args.results, batch)
+        print(f"{r['batch']:>6}{r['renders']:>10}{r['ns_per_result']:>12.0f}{r['results_per_sec']:>14.0f}")
+
+
+if __name__ == '__main__':
+    main()
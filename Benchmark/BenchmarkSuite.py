@@ -0,0 +1,108 @@
+'''
+MVVM 架構的效能量測套件，在 Linux 上以 Qt offscreen 平台執行，不需要顯示器。
+結果存成 JSON，可與之前 commit 的結果比較以找出效能退化。
+
+執行方式 (repo 根目錄):
+    python -m Benchmark.BenchmarkSuite --output bench.json
+    python -m Benchmark.BenchmarkSuite --quick --compare bench.json
+'''
+from __future__ import annotations
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from FiniteReceiverMachine.Logger import log as frm_log
+from ViewModel.Logger import log as view_model_log
+from View.Logger import log as view_log
+from Benchmark import TimerBenchmark, PushBenchmark, BatchBenchmark, MediatorBenchmark, \
+    SentinelBenchmark, PluginBenchmark
+
+SUITES:Dict[str, Callable[[bool], List[Dict[str, Any]]]] = {
+    'frm_ticks': TimerBenchmark.suite,
+    'frm_latency': PushBenchmark.suite,
+    'frm_batch': BatchBenchmark.suite,
+    'mediator_trigger': MediatorBenchmark.suite,
+    'sentinel_fragment': SentinelBenchmark.suite,
+    'plugin_startup': PluginBenchmark.suite,
+}
+
+
+def _gitCommit()->str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run(names:List[str], quick:bool=False)->Dict[str, Any]:
+    report = {
+        'meta': {
+            'commit': _gitCommit(),
+            'date': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'qt_platform': os.environ.get('QT_QPA_PLATFORM'),
+            'quick': quick,
+        },
+        'results': {},
+    }
+    for name in names:
+        start = time.perf_counter()
+        report['results'][name] = SUITES[name](quick)
+        print(f'{name:<20} done in {time.perf_counter() - start:.1f}s', file=sys.stderr)
+    return report
+
+
+def compare(old:Dict[str, Any], new:Dict[str, Any])->List[str]:
+    '''以 (suite, name, 欄位) 對齊兩份報告中的數值，列出變化的百分比。'''
+    lines = [f"{'suite':<20}{'case':<24}{'metric':<22}{'old':>12}{'new':>12}{'change':>9}"]
+    for suite, rows in new['results'].items():
+        old_rows = {r.get('name'): r for r in old.get('results', {}).get(suite, [])}
+        for row in rows:
+            old_row = old_rows.get(row.get('name'))
+            if old_row is None:
+                continue
+            for key, value in row.items():
+                base = old_row.get(key)
+                if not isinstance(value, (int, float)) or not isinstance(base, (int, float)) \
+                        or isinstance(value, bool) or not base or value == base:
+                    continue
+                change = 100 * (value - base) / abs(base)
+                lines.append(f"{suite:<20}{row['name']:<24}{key:<22}{base:>12.4g}{value:>12.4g}{change:>+8.1f}%")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--suite', nargs='+', default=list(SUITES), choices=list(SUITES))
+    parser.add_argument('--quick', action='store_true', help='縮短量測時間，用於快速檢查')
+    parser.add_argument('--output', help='結果 JSON 的輸出路徑，預設輸出到 stdout')
+    parser.add_argument('--compare', help='與之前的結果 JSON 比較')
+    args = parser.parse_args()
+    for log in (frm_log, view_model_log, view_log):
+        log.setLevel(logging.WARNING)
+
+    report = run(args.suite, args.quick)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    elif not args.compare:
+        print(text)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            print('\n'.join(compare(json.load(f), report)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+'''
+量測 ViewModelEventMediator.trigger 的成本與訂閱者數量的關係。
+
+執行方式 (repo 根目錄):
+    python -m Benchmark.MediatorBenchmark --subscribers 1 10 100 1000
+'''
+from __future__ import annotations
+import argparse
+import time
+from typing import Any, Dict, List
+from ViewModel.ViewModelMediator import ViewModelEventMediator
+
+
+class Subscriber:
+    def __init__(self, mediator:ViewModelEventMediator, event:str):
+        self.count = 0
+        mediator.register(event, self.handler)
+
+    def handler(self, *args):
+        self.count += 1
+
+
+def benchmark(subscribers:int, triggers:int=2000)->Dict[str, Any]:
+    mediator = ViewModelEventMediator()
+    objs = [Subscriber(mediator, 'bench') for _ in range(subscribers)]
+    mediator.trigger('bench', True)
+    start = time.perf_counter()
+    for _ in range(triggers):
+        mediator.trigger('bench', True)
+    elapsed = time.perf_counter() - start
+    assert all(o.count == triggers + 1 for o in objs)
+    return {
+        'name': f'trigger/{subscribers}',
+        'subscribers': subscribers,
+        'us_per_trigger': 1e6 * elapsed / triggers,
+        'ns_per_handler': 1e9 * elapsed / (triggers * subscribers),
+    }
+
+
+def suite(quick:bool=False)->List[Dict[str, Any]]:
+    counts = [1, 10, 100] if quick else [1, 10, 100, 1000]
+    return [benchmark(n, 500 if quick else 2000) for n in counts]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--subscribers', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--triggers', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'subscribers':>12}{'us/trigger':>12}{'ns/handler':>12}")
+    for n in args.subscribers:
+        r = benchmark(n, args.triggers)
+        print(f"{r['subscribers']:>12}{r['us_per_trigger']:>12.2f}{r['ns_per_handler']:>12.0f}")
+
+
+if __name__ == '__main__':
+    main()
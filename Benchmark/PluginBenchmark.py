@@ -0,0 +1,82 @@
+'''
+量測 PlugInView 的啟動成本與 plugin 數量的關係 (以 MainView 的 AppView/Counter 為例)。
+eager : addPluginView 在啟動時建立所有 plugin 的 UI。
+lazy  : addPluginFactory 只註冊 factory，第一次選取時才建立 (啟動後選取第一個 plugin)。
+
+執行方式 (repo 根目錄):
+    QT_QPA_PLATFORM=offscreen python -m Benchmark.PluginBenchmark --plugins 1 10 50 100
+'''
+from __future__ import annotations
+import argparse
+import os
+import time
+from typing import Any, Dict, List
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6 import QtWidgets
+from MainView import AppView, Counter
+from MainViewModel import ViewModelEventMediator, AppViewModel, CounterModel
+
+
+def benchmark(plugins:int, lazy:bool=False)->Dict[str, Any]:
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    widget = QtWidgets.QWidget()
+    mediator = ViewModelEventMediator()
+    app_model = AppViewModel('Main', mediator)
+    view = AppView('Main', app_model)
+
+    start = time.perf_counter()
+    view.setupUI(widget)
+    setup = time.perf_counter()
+    for i in range(plugins):
+        name = f'Counter{i}'
+        if lazy:
+            view.addPluginFactory(name, lambda name=name: Counter(name, CounterModel(name, mediator)))
+        else:
+            view.addPluginView(Counter(name, CounterModel(name, mediator)))
+    added = time.perf_counter()
+    view.run()
+    app_model.render()
+    if plugins:
+        view.getSelectPlugin('Counter0')
+    ran = time.perf_counter()
+    app.processEvents()
+
+    view.stop()
+    widget.deleteLater()
+    app.processEvents()
+    return {
+        'name': f"{'lazy' if lazy else 'plugins'}/{plugins}",
+        'plugins': plugins,
+        'lazy': lazy,
+        'setup_ms': 1e3 * (setup - start),
+        'add_ms': 1e3 * (added - setup),
+        'run_ms': 1e3 * (ran - added),
+        'total_ms': 1e3 * (ran - start),
+        'ms_per_plugin': 1e3 * (added - setup) / plugins if plugins else 0.,
+    }
+
+
+def suite(quick:bool=False)->List[Dict[str, Any]]:
+    counts = [1, 10, 50] if quick else [1, 10, 50, 100]
+    benchmark(1)  # 暖機 : 第一次建立 widget 會載入 Qt 的 style 與字型
+    return [benchmark(n, lazy) for lazy in (False, True) for n in counts]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--plugins', type=int, nargs='+', default=[1, 10, 50, 100])
+    args = parser.parse_args()
+
+    benchmark(1)
+    print(f"{'mode':<7}{'plugins':>8}{'setup ms':>10}{'add ms':>10}{'run ms':>10}{'total ms':>10}{'ms/plugin':>11}")
+    for lazy in (False, True):
+        for n in args.plugins:
+            r = benchmark(n, lazy)
+            print(f"{'lazy' if lazy else 'eager':<7}{r['plugins']:>8}{r['setup_ms']:>10.2f}{r['add_ms']:>10.2f}"
+                  f"{r['run_ms']:>10.2f}{r['total_ms']:>10.2f}{r['ms_per_plugin']:>11.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+'''
+比較 polling 與推送模式 (PushReceiver) 的 FRM : 閒置時的 CPU 使用率，以及資料從產生到 update 的延遲。
+
+執行方式 (repo 根目錄):
+    python -m Benchmark.PushBenchmark --duration 2 --rate 1000
+'''
+from __future__ import annotations
+import argparse
+import collections
+import logging
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional
+from FiniteReceiverMachine.FiniteReceiveMachine import FiniteReceiveMachine
+from FiniteReceiverMachine.Logger import log
+
+
+class PollReceiver():
+    '''只支援 polling 的 receiver，資料為產生時的 perf_counter 時間戳。'''
+    def __init__(self):
+        self._queue = collections.deque()
+
+    def put(self, item:float):
+        self._queue.append(item)
+
+    def getResults(self) -> Any:
+        try:
+            return self._queue.popleft()
+        except IndexError:
+            return None
+
+    def setConfigs(self, **kwargs) -> None:...
+
+    def trigger(self, **kwargs) -> None:...
+
+    def stop(self) -> None:...
+
+
+class PushReceiver(PollReceiver):
+    '''資料就緒時透過 notify 喚醒 FRM 的 receiver。'''
+    def __init__(self):
+        super().__init__()
+        self._notify:Optional[Callable[[], None]] = None
+
+    def setNotifier(self, notify:Optional[Callable[[], None]]) -> None:
+        self._notify = notify
+
+    def put(self, item:float):
+        super().put(item)
+        notify = self._notify
+        if notify is not None:
+            notify()
+
+
+class LatencyUpdater():
+    def __init__(self):
+        self.latencies:List[float] = []
+
+    def update(self, res) -> None:
+        self.latencies.append(time.perf_counter() - res)
+
+    def setConfigs(self, **kwargs) -> None:...
+
+
+def _percentile(data:List[float], q:float)->float:
+    if not data:
+        return float('nan')
+    data = sorted(data)
+    return data[min(len(data) - 1, int(q * len(data)))]
+
+
+def benchmark(mode:str, interval:float, rate:float, duration:float)->Dict[str, Any]:
+    receiver = PushReceiver() if mode == 'push' else PollReceiver()
+    updater = LatencyUpdater()
+    frm = FiniteReceiveMachine()
+    frm.setFRM(receiver, updater)
+    frm.start(interval)
+
+    # 閒置 : 沒有任何資料時的 CPU 成本
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    time.sleep(duration)
+    idle_cpu = 100 * (time.process_time() - cpu) / (time.perf_counter() - wall)
+
+    # 負載 : 以固定速率產生資料並量測延遲
+    period = 1 / rate
+    deadline = time.perf_counter() + duration
+    next_put = time.perf_counter()
+    while next_put < deadline:
+        receiver.put(time.perf_counter())
+        next_put += period
+        delay = next_put - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    time.sleep(0.1)
+    frm.stop()
+
+    lat = [1e6 * x for x in updater.latencies]
+    return {
+        'mode': mode,
+        'interval': interval,
+        'idle_cpu_percent': idle_cpu,
+        'received': len(lat),
+        'latency_us_median': statistics.median(lat) if lat else float('nan'),
+        'latency_us_p99': _percentile(lat, 0.99),
+    }
+
+
+def suite(quick:bool=False)->List[Dict[str, Any]]:
+    duration = 0.3 if quick else 1.
+    results = []
+    for mode, interval in (('poll', 0.), ('poll', 0.001), ('push', 0.)):
+        r = benchmark(mode, interval, 1000., duration)
+        r['name'] = f'{mode}/{interval:g}'
+        results.append(r)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duration', type=float, default=2.)
+    parser.add_argument('--rate', type=float, default=1000., help='資料產生速率 (筆/秒)')
+    parser.add_argument('--interval', type=float, nargs='+', default=[0., 0.001, 0.01],
+                        help='polling 模式使用的 interval')
+    args = parser.parse_args()
+    log.setLevel(logging.WARNING)
+
+    cases = [('poll', interval) for interval in args.interval] + [('push', 0.)]
+    print(f"{'mode':<6}{'interval':>10}{'idle cpu %':>12}{'received':>10}{'lat med us':>12}{'lat p99 us':>12}")
+    for mode, interval in cases:
+        r = benchmark(mode, interval, args.rate, args.duration)
+        print(f"{r['mode']:<6}{r['interval']:>10g}{r['idle_cpu_percent']:>12.1f}{r['received']:>10}"
+              f"{r['latency_us_median']:>12.1f}{r['latency_us_p99']:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
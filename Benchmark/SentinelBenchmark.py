@@ -0,0 +1,113 @@
+'''
+量測 ModelSentinel.sig_state 從 emit 到 fragment 執行的延遲 (需要 Qt，可在 offscreen 平台執行)。
+direct : 在 GUI 執行緒 emit，fragment 同步執行。
+queued : 在背景執行緒 emit (如 FRM 的 updater)，fragment 經由 Qt event loop 在 GUI 執行緒執行。
+
+執行方式 (repo 根目錄):
+    QT_QPA_PLATFORM=offscreen python -m Benchmark.SentinelBenchmark
+'''
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import threading
+import time
+from typing import Any, Dict, List
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6 import QtCore, QtWidgets
+from ViewModel import ModelSentinel
+from View import isFragment
+
+
+class Stamp:
+    __slots__ = ('t',)
+
+    def __init__(self, t:float):
+        self.t = t
+
+
+class LatencyView:
+    def __init__(self, sentinel:ModelSentinel, expected:int, app:QtWidgets.QApplication):
+        self.latencies:List[float] = []
+        self.expected = expected
+        self.app = app
+        sentinel.sig_state.connect(self.getModelState)
+
+    @isFragment()
+    def getModelState(self, stamp:Stamp)->None:
+        self.latencies.append(time.perf_counter() - stamp.t)
+        if len(self.latencies) >= self.expected:
+            self.app.quit()
+
+
+def _app()->QtWidgets.QApplication:
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def _summary(name:str, latencies:List[float], elapsed:float)->Dict[str, Any]:
+    lat = sorted(1e6 * x for x in latencies)
+    return {
+        'name': name,
+        'emits': len(lat),
+        'emits_per_sec': len(lat) / elapsed if elapsed else 0.,
+        'latency_us_median': statistics.median(lat),
+        'latency_us_p99': lat[min(len(lat) - 1, int(0.99 * len(lat)))],
+    }
+
+
+def benchmarkDirect(emits:int)->Dict[str, Any]:
+    app = _app()
+    sentinel = ModelSentinel()
+    view = LatencyView(sentinel, emits + 1, app)
+    start = time.perf_counter()
+    for _ in range(emits):
+        sentinel.sig_state.emit(Stamp(time.perf_counter()))
+    return _summary('direct', view.latencies, time.perf_counter() - start)
+
+
+def benchmarkQueued(emits:int, rate:float)->Dict[str, Any]:
+    app = _app()
+    sentinel = ModelSentinel()
+    view = LatencyView(sentinel, emits, app)
+
+    def produce():
+        period = 1 / rate
+        next_emit = time.perf_counter()
+        for _ in range(emits):
+            sentinel.sig_state.emit(Stamp(time.perf_counter()))
+            next_emit += period
+            delay = next_emit - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    producer = threading.Thread(target=produce, daemon=True)
+    QtCore.QTimer.singleShot(0, producer.start)
+    QtCore.QTimer.singleShot(int(1000 * (emits / rate + 10)), app.quit)
+    start = time.perf_counter()
+    app.exec()
+    elapsed = time.perf_counter() - start
+    producer.join()
+    return _summary(f'queued/{rate:g}Hz', view.latencies, elapsed)
+
+
+def suite(quick:bool=False)->List[Dict[str, Any]]:
+    emits = 2000 if quick else 20000
+    return [benchmarkDirect(emits), benchmarkQueued(emits // 10, 1000.)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--emits', type=int, default=20000)
+    parser.add_argument('--rate', type=float, default=1000., help='queued 模式的 emit 速率 (次/秒)')
+    args = parser.parse_args()
+
+    print(f"{'mode':<16}{'emits':>8}{'emits/s':>12}{'lat med us':>12}{'lat p99 us':>12}")
+    for r in (benchmarkDirect(args.emits), benchmarkQueued(args.emits // 10, args.rate)):
+        print(f"{r['name']:<16}{r['emits']:>8}{r['emits_per_sec']:>12.0f}"
+              f"{r['latency_us_median']:>12.1f}{r['latency_us_p99']:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
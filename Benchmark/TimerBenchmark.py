@@ -0,0 +1,132 @@
+'''
+比較 FRM 各種 tick 來源的效能 : ticks/sec、CPU 使用率、每 tick 的 CPU 成本以及使用的執行緒數量。
+
+執行方式 (repo 根目錄):
+    python -m Benchmark.TimerBenchmark --duration 2 --interval 0 0.001
+'''
+from __future__ import annotations
+import argparse
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List
+from FiniteReceiverMachine.FiniteReceiveMachine import FiniteReceiveMachine, RepeatTimer, ReceiveThread
+from FiniteReceiverMachine.Scheduler import ScheduleThread, SharedScheduler, MissedTickPolicy
+from FiniteReceiverMachine.Logger import log
+
+
+class IdleReceiver():
+    '''永遠沒有資料的 receiver，量測的是純 polling 的成本。'''
+    def getResults(self) -> Any:
+        return None
+
+    def setConfigs(self, **kwargs) -> None:...
+
+    def trigger(self, **kwargs) -> None:...
+
+    def stop(self) -> None:...
+
+
+class TickCounter():
+    def __init__(self, func:Callable[[], None]):
+        self.ticks = 0
+        self.threads = set()
+        self._func = func
+
+    def __call__(self):
+        self.ticks += 1
+        self.threads.add(threading.get_ident())
+        self._func()
+
+
+def _runRepeatTimer(interval, func, duration):
+    timer = RepeatTimer(interval, func)
+    timer.daemon = True
+    timer.thread.daemon = True
+    timer.start()
+    time.sleep(duration)
+    # RepeatTimer.cancel 在 tick 進行中可能取消不到下一個 Timer，改成放慢後再取消
+    timer.interval = 3600
+    timer.cancel()
+
+
+def _runReceiveThread(interval, func, duration):
+    thread = ReceiveThread(interval, func, daemon=True)
+    thread.start()
+    time.sleep(duration)
+    thread.cancel()
+    thread.join()
+
+
+def _runScheduleThread(interval, func, duration):
+    thread = ScheduleThread(interval, func, MissedTickPolicy.SKIP, daemon=True)
+    thread.start()
+    time.sleep(duration)
+    thread.cancel()
+
+
+def _runSharedScheduler(interval, func, duration):
+    scheduler = SharedScheduler()
+    job = scheduler.schedule(interval, func)
+    job.start()
+    time.sleep(duration)
+    job.cancel()
+    scheduler.close()
+
+
+TICK_SOURCES:Dict[str, Callable[[float, Callable[[], None], float], None]] = {
+    'RepeatTimer': _runRepeatTimer,
+    'ReceiveThread': _runReceiveThread,
+    'ScheduleThread': _runScheduleThread,
+    'SharedScheduler': _runSharedScheduler,
+}
+
+
+def benchmark(name:str, interval:float, duration:float)->Dict[str, Any]:
+    frm = FiniteReceiveMachine(IdleReceiver())
+    counter = TickCounter(frm.get)
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    TICK_SOURCES[name](interval, counter, duration)
+    wall = time.perf_counter() - wall
+    cpu = time.process_time() - cpu
+    return {
+        'source': name,
+        'interval': interval,
+        'ticks': counter.ticks,
+        'ticks_per_sec': counter.ticks / wall,
+        'cpu_percent': 100 * cpu / wall,
+        'cpu_us_per_tick': 1e6 * cpu / counter.ticks if counter.ticks else float('nan'),
+        'threads': len(counter.threads),
+    }
+
+
+def suite(quick:bool=False)->List[Dict[str, Any]]:
+    duration = 0.3 if quick else 1.
+    results = []
+    for interval in (0., 0.001):
+        for name in TICK_SOURCES:
+            r = benchmark(name, interval, duration)
+            r['name'] = f"{name}/{interval:g}"
+            results.append(r)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--duration', type=float, default=2.)
+    parser.add_argument('--interval', type=float, nargs='+', default=[0., 0.001])
+    parser.add_argument('--source', nargs='+', default=list(TICK_SOURCES), choices=list(TICK_SOURCES))
+    args = parser.parse_args()
+    log.setLevel(logging.WARNING)
+
+    print(f"{'source':<16}{'interval':>10}{'ticks/s':>12}{'cpu %':>8}{'cpu us/tick':>13}{'threads':>9}")
+    for interval in args.interval:
+        for name in args.source:
+            r = benchmark(name, interval, args.duration)
+            print(f"{r['source']:<16}{r['interval']:>10g}{r['ticks_per_sec']:>12.0f}"
+                  f"{r['cpu_percent']:>8.1f}{r['cpu_us_per_tick']:>13.2f}{r['threads']:>9}")
+
+
+if __name__ == '__main__':
+    main()
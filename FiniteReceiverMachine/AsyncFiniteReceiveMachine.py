@@ -0,0 +1,187 @@
+from __future__ import annotations
+import asyncio
+import inspect
+from typing import Protocol, Optional, Any, Coroutine
+from FiniteReceiverMachine.Logger import log
+from FiniteReceiverMachine.FramePool import Frame
+from FiniteReceiverMachine.Scheduler import MissedTickPolicy, nextTick
+
+
+class AsyncUpdater(Protocol):
+    '''
+    Interface protocol for async Updater.
+    update 可為 coroutine function，也可為一般函式 (例如 Qt 的 ViewModel)。
+    '''
+    async def update(self, res) -> None:
+        ...
+
+    def setConfigs(self, **kwargs)->None:
+        ...
+
+
+class AsyncReceiver(Protocol):
+    '''
+    Interface protocol for async Receiver.
+    getResults 可以 await 直到資料就緒，此時 FRM 不需要 polling。
+    '''
+    async def getResults(self)->Any:...
+
+    def setConfigs(self, **kwargs)->None:...
+
+    def trigger(self, **kwargs)->None:...
+
+    def stop(self)->None:...
+
+
+class AsyncFiniteReceiveMachine:
+    '''
+    Receive data from async receiver and update to updater on an asyncio event loop.
+    與 FiniteReceiveMachine 相同的 start/pause/stop/trigger 生命週期，但不使用任何執行緒;
+    搭配 runQtEventLoop 時，接收、處理與 View 的渲染都在 Qt 的 event loop 上執行。
+    '''
+    _updater: Optional[AsyncUpdater] = None
+    _receiver: Optional[AsyncReceiver] = None
+    _task: Optional[asyncio.Task] = None
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _policy: MissedTickPolicy = MissedTickPolicy.SKIP
+    _idle_min: float = 0.001
+    _idle_max: float = 0.05
+    _is_start = False
+    def __init__(self, receiver:Optional[AsyncReceiver]=None):
+        self._receiver = receiver
+
+    def __repr__(self):
+        return f'Receiver={self._receiver}, Updater={self._updater}'
+
+    def setFRM(self, receiver:AsyncReceiver, updater:AsyncUpdater=None):
+        self.setReceiver(receiver)
+        self.setUpdater(updater)
+
+    def setReceiver(self, receiver):
+        if self._is_start:
+            raise Exception(f'Disable to set Receiver when FRM is launching.')
+        self._receiver = receiver
+
+    def setReceiverConfigs(self, **kwargs):
+        if self._is_start:
+            raise Exception(f"Disable to set Receiver's configs when FRM is launching.")
+        self._receiver.setConfigs(**kwargs)
+
+    def setUpdater(self, updater):
+        if self._is_start:
+            raise Exception(f'Disable to set Updater when FRM is launching.')
+        self._updater = updater
+
+    def setPolicy(self, policy:MissedTickPolicy=MissedTickPolicy.SKIP):
+        if self._is_start:
+            raise Exception(f'Disable to set Policy when FRM is launching.')
+        self._policy = policy
+
+    def setIdleBackoff(self, min_delay:float=0.001, max_delay:float=0.05):
+        '''
+        receiver 沒有資料且不需等待下一個 tick (interval 為 0 或 tick 已遲到) 時，
+        等待時間從 min_delay 倍增到 max_delay，取得資料後重置，避免 event loop 空轉。
+        '''
+        if self._is_start:
+            raise Exception(f'Disable to set Idle Backoff when FRM is launching.')
+        self._idle_min = min_delay
+        self._idle_max = max_delay
+
+    def trigger(self, **trigger_arg):
+        if self._receiver is None:
+            raise Exception(f'Disable to trigger FRM without delegate the receiver.')
+        self._receiver.trigger(**trigger_arg)
+
+    def start(self, interval:float=0, loop:Optional[asyncio.AbstractEventLoop]=None):
+        '''
+        在 loop (預設為目前執行中的 event loop) 上建立接收的 task。
+        可從其他執行緒呼叫，此時必須指定 loop。
+        '''
+        if self._is_start:
+            return
+        if self._receiver is None:
+            raise Exception(f'Disable to launch FRM without delegate the receiver.')
+        self._loop = loop if loop is not None else asyncio.get_running_loop()
+        self._is_start = True
+        if self._isLoopThread():
+            self._task = self._loop.create_task(self._run(interval))
+        else:
+            self._task = asyncio.run_coroutine_threadsafe(self._run(interval), self._loop)
+        log.info('start async FRM')
+
+    def stop(self):
+        if not self._is_start:
+            return
+        self._cancel()
+        log.info('stop async FRM')
+        ret = self._receiver.stop()
+        if inspect.isawaitable(ret):
+            asyncio.run_coroutine_threadsafe(ret, self._loop)
+
+    def pause(self):
+        if not self._is_start:
+            return
+        log.info('pause async FRM')
+        self._cancel()
+
+    def _cancel(self):
+        self._is_start = False
+        if self._isLoopThread():
+            self._task.cancel()
+        else:
+            self._loop.call_soon_threadsafe(self._task.cancel)
+        self._task = None
+
+    def _isLoopThread(self)->bool:
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+
+    async def _run(self, interval:float):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        idle = 0.
+        while True:
+            try:
+                has_data = await self.get()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error(f'Async FRM get raise : {e!r}')
+                has_data = False
+            now = loop.time()
+            next_tick, _ = nextTick(next_tick, interval, now, self._policy)
+            delay = next_tick - now if next_tick > now else 0.
+            if has_data:
+                idle = 0.
+            elif delay <= 0:
+                # non-blocking 的 receiver 沒有資料時退避，不讓 event loop 以 sleep(0) 空轉
+                idle = min(max(idle * 2, self._idle_min), self._idle_max)
+                delay = idle
+            await asyncio.sleep(delay)
+
+    async def get(self)->bool:
+        '''取一次 receiver 的結果並推給 updater，回傳是否有取得資料。'''
+        log.debug('getting results')
+        res = await self._receiver.getResults()
+        if res is None:
+            return False
+        try:
+            if self._updater is not None:
+                ret = self._updater.update(res)
+                if inspect.isawaitable(ret):
+                    await ret
+        finally:
+            if type(res) is Frame:
+                res.release()
+        return True
+
+
+def runQtEventLoop(coro:Optional[Coroutine]=None)->Any:
+    '''
+    以 Qt 的 event loop 作為 asyncio 的 event loop 執行 coro (需先建立 QApplication)，
+    之後在 coro 中 start 的 AsyncFiniteReceiveMachine 與 View 的 fragment 都在 GUI 執行緒上執行，不需跨執行緒。
+    '''
+    from PySide6 import QtAsyncio
+    return QtAsyncio.run(coro, keep_running=True)
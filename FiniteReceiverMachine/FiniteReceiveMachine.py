@@ -1,39 +1,16 @@
 from __future__ import annotations
 import threading
 import time
-from typing import Protocol, Optional, Any, Union
+from typing import Protocol, Optional, Any, Union, Callable, List, runtime_checkable
+from concurrent.futures import Executor
 from threading import Timer
-import logging
-
-log = logging.getLogger('FRM')
-log.setLevel(logging.INFO)
-handler = logging.StreamHandler()
-
-class CustomFormatter(logging.Formatter):
-    normal = '\x1b[20;1m'
-    white = '\x1b[49;1m'
-    green = '\x1b[32;1m'
-    yellow = '\x1b[33;1m'
-    Magenta = '\x1b[35;1m'
-    red = '\x1b[31;1m'
-    reset = '\x1b[0m'
-    def __init__(self, fmt="%(asctime)s | %(name)-10s| %(levelname)-8s|: %(message)s"):
-        super().__init__(fmt)
-        self.fmt = fmt
-        self.FORMATS = {
-            logging.DEBUG: f"{self.green} {self.fmt} {self.reset}",
-            logging.INFO: f"{self.white} {self.fmt} {self.reset}",
-            logging.WARNING: f"{self.yellow} {self.fmt} {self.reset}",
-            logging.ERROR: f"{self.Magenta} {self.fmt} {self.reset}",
-            logging.CRITICAL: f"{self.red} {self.fmt} {self.reset}"
-        }
-
-    def format(self, record):
-        log_fmt = self.FORMATS.get(record.levelno)
-        formatter = logging.Formatter(log_fmt)
-        return formatter.format(record)
-handler.setFormatter(CustomFormatter())
-log.addHandler(handler)
+from FiniteReceiverMachine.Logger import log
+from FiniteReceiverMachine.Scheduler import ScheduleThread, SharedScheduler, ScheduledJob, MissedTickPolicy, NotifyThread
+from FiniteReceiverMachine.RingBuffer import RingBuffer, OverflowPolicy, DispatchThread
+from FiniteReceiverMachine.FramePool import Frame
+from FiniteReceiverMachine.Pipeline import Pipeline, Stage
+from FiniteReceiverMachine.Metrics import FRMMetrics, Stamped
+
 
 class Updater(Protocol):
     '''
@@ -47,6 +24,16 @@ class Updater(Protocol):
         ...
 
 
+@runtime_checkable
+class BatchUpdater(Protocol):
+    '''
+    Optional interface protocol for Updater.
+    批次模式下 FRM 會一次把多筆結果交給 update_batch，未實作時退回逐筆呼叫 update。
+    '''
+    def update_batch(self, results:List[Any]) -> None:
+        ...
+
+
 class Receiver(Protocol):
     '''
     Interface protocol for Receiver.
@@ -60,6 +47,15 @@ class Receiver(Protocol):
 
     def stop(self)->None:...
 
+@runtime_checkable
+class PushReceiver(Protocol):
+    '''
+    Optional interface protocol for Receiver.
+    實作 setNotifier 的 receiver 會在資料就緒時呼叫 notify()，FRM 才去 getResults，
+    不需要 FRM 不斷 polling。
+    '''
+    def setNotifier(self, notify:Optional[Callable[[], None]])->None:...
+
 class RepeatTimer():
     def __init__(self, interval:float, func):
         self.daemon = False
@@ -106,13 +102,27 @@ class FiniteReceiveMachine:
     '''
     _updater: Optional[Updater] = None
     _receiver: Optional[Receiver] = None
-    _start_Thread: Union[RepeatTimer | ReceiveThread] = None
+    _start_Thread: Union[RepeatTimer | ReceiveThread | ScheduleThread | ScheduledJob | NotifyThread] = None
+    _scheduler: Optional[SharedScheduler] = None
+    _policy: MissedTickPolicy = MissedTickPolicy.SKIP
+    _buffer: Optional[RingBuffer] = None
+    _dispatch_Thread: Optional[DispatchThread] = None
+    _batch_size: int = 0
+    _batch_latency: Optional[float] = None
+    _pipeline: Optional[Pipeline] = None
+    _max_in_flight: int = 8
+    _pending_batch: Optional[List[Any]] = None
+    _metrics: Optional[FRMMetrics] = None
+    _metrics_Thread: Optional[ScheduleThread] = None
     _is_start = False
-    def __init__(self, receiver:Optional[Receiver]=None):
+    def __init__(self, receiver:Optional[Receiver]=None, scheduler:Optional[SharedScheduler]=None):
         self._receiver = receiver
+        self._scheduler = scheduler
+        self._stages:List[Stage] = []
 
     def __del__(self):
         self.stop()
+        self.disableMetrics()
         log.info("Close Finite Receive Machine...")
 
     def __repr__(self):
@@ -137,6 +147,111 @@ class FiniteReceiveMachine:
             raise Exception(f'Disable to set Updater when FRM is launching.')
         self._updater = updater
 
+    def setScheduler(self, scheduler:Optional[SharedScheduler]=None,
+                     policy:MissedTickPolicy=MissedTickPolicy.SKIP):
+        '''
+        設定 tick 的來源。scheduler 為 None 時使用專屬的 ScheduleThread，
+        否則掛載到共用的 SharedScheduler 上。
+        '''
+        if self._is_start:
+            raise Exception(f'Disable to set Scheduler when FRM is launching.')
+        self._scheduler = scheduler
+        self._policy = policy
+
+    def setBuffer(self, capacity:int=1024, policy:OverflowPolicy=OverflowPolicy.DROP_OLDEST):
+        '''設定 start(buffer=True) 時 Receiver 與 Updater 之間的 RingBuffer。'''
+        if self._is_start:
+            raise Exception(f'Disable to set Buffer when FRM is launching.')
+        self._buffer = RingBuffer(capacity, policy, on_evict=self._release)
+
+    def setBatch(self, max_size:int=0, max_latency:Optional[float]=None):
+        '''
+        設定批次模式。max_size > 0 時，每次最多收集 max_size 筆結果 (或收集超過 max_latency 秒)
+        後一次交給 Updater.update_batch; max_size 為 0 時關閉批次模式。
+        有 addStage 的 stage 時，同一批結果經過 pipeline 後依原本的順序整批交給 update_batch。
+        '''
+        if self._is_start:
+            raise Exception(f'Disable to set Batch when FRM is launching.')
+        self._batch_size = max_size
+        self._batch_latency = max_latency
+
+    def addStage(self, func:Callable[[Any], Any], executor:Union[str, Executor, None]=None,
+                 workers:int=1, shm_threshold:int=1 << 20):
+        '''
+        在 getResults 與 update 之間加入一個轉換階段 (見 Pipeline.Stage)，
+        executor 為 'thread' 或 'process' 時，耗時的運算不會佔住接收執行緒。
+        '''
+        if self._is_start:
+            raise Exception(f'Disable to add Stage when FRM is launching.')
+        self._stages.append(Stage(func, executor, workers, shm_threshold))
+
+    def clearStages(self):
+        if self._is_start:
+            raise Exception(f'Disable to clear Stages when FRM is launching.')
+        for stage in self._stages:
+            stage.shutdown()
+        self._stages.clear()
+
+    def setMaxInFlight(self, max_in_flight:int=8):
+        '''設定 pipeline 中同時處理的最大筆數，超過時接收端會等待。'''
+        if self._is_start:
+            raise Exception(f'Disable to set max in-flight when FRM is launching.')
+        self._max_in_flight = max_in_flight
+
+    def enableMetrics(self, emit_interval:Optional[float]=None,
+                      emit:Optional[Callable[[dict], None]]=None):
+        '''
+        開啟效能統計，可於執行中開關; 關閉時 get 的額外成本只有一次屬性判斷。
+        emit_interval 不為 None 時，每隔 emit_interval 秒以 emit(getMetrics(reset=True)) 輸出一次，
+        emit 預設為寫入 log。
+        '''
+        if self._metrics is None:
+            self._metrics = FRMMetrics()
+        if self._metrics_Thread is not None:
+            self._metrics_Thread.cancel()
+            self._metrics_Thread = None
+        if emit_interval is not None:
+            emit = emit if emit is not None else lambda m: log.info(f'FRM metrics : {m}')
+            self._metrics_Thread = ScheduleThread(emit_interval, lambda: self._emitMetrics(emit), daemon=True)
+            self._metrics_Thread.start()
+
+    def disableMetrics(self):
+        if self._metrics_Thread is not None:
+            self._metrics_Thread.cancel()
+            self._metrics_Thread = None
+        self._metrics = None
+
+    def getMetrics(self, reset:bool=False)->Optional[dict]:
+        '''
+        回傳效能統計的快照，未開啟時回傳 None。
+        queue_depth 為 buffer 與 pipeline 中尚未 update 的筆數，dropped 為其累計丟棄數量，
+        filtered 為 pipeline 的 stage 回傳 None 過濾掉的筆數。
+        '''
+        if self._metrics is None:
+            return None
+        snapshot = self._metrics.snapshot(reset)
+        buffer = self._buffer if self._dispatch_Thread is not None else None
+        pipeline = self._pipeline
+        # RingBuffer 與 Pipeline 定義了 __len__，空的時候為 False，需以 is not None 判斷
+        has_buffer, has_pipeline = buffer is not None, pipeline is not None
+        snapshot['queue_depth'] = (len(buffer) if has_buffer else 0) + (len(pipeline) if has_pipeline else 0)
+        snapshot['dropped'] = (buffer.drops if has_buffer else 0) + (pipeline.dropped if has_pipeline else 0)
+        snapshot['filtered'] = pipeline.filtered if has_pipeline else 0
+        return snapshot
+
+    def _emitMetrics(self, emit:Callable[[dict], None]):
+        if self._metrics_Thread is None or self._metrics_Thread.ticks == 0:
+            # ScheduleThread 啟動時會立即執行一次，此時還沒有任何統計
+            return
+        snapshot = self.getMetrics(reset=True)
+        if snapshot is not None:
+            emit(snapshot)
+
+    @property
+    def buffer(self)->Optional[RingBuffer]:
+        '''緩衝模式使用的 RingBuffer，可由 buffer.stats() 取得丟失數量與 high water mark。'''
+        return self._buffer
+
     def trigger(self, **trigger_arg):
         if self._receiver is None:
             raise Exception(f'Disable to trigger FRM without delegate the receiver.')
@@ -144,14 +259,33 @@ class FiniteReceiveMachine:
         self._receiver.trigger(**trigger_arg)
 
     def start(self, interval:float=0, buffer=False):
+        '''
+        buffer 為 True 時，接收端只把結果放進 RingBuffer，
+        由另一條 DispatchThread 負責呼叫 Updater.update。
+        '''
         if self._is_start:
             # log.info('Your machine is launching')
             return
         if self._receiver is None:
             raise Exception(f'Disable to launch FRM without delegate the receiver.')
-        self._start_Thread = RepeatTimer(interval, self.get)
-        # self._start_Thread = ReceiveThread(interval, self.get)
+        if buffer:
+            if self._buffer is None:
+                self._buffer = RingBuffer(on_evict=self._release)
+            self._buffer.open()
+            if self._batch_size > 0:
+                self._dispatch_Thread = DispatchThread(self._buffer, self._updateBatch,
+                                                       self._batch_size, self._batch_latency)
+            else:
+                self._dispatch_Thread = DispatchThread(self._buffer, self._update)
+            self._dispatch_Thread.start()
+        if self._stages:
+            self._pipeline = Pipeline(self._stages, self._forward, self._max_in_flight)
+            self._pipeline.start()
+        self._start_Thread = self._createThread(interval)
         self._start_Thread.start()
+        if self.is_push:
+            self._receiver.setNotifier(self._start_Thread.notify)
+            self._start_Thread.notify()
         log.info('start FSM')
         self._is_start = True
 
@@ -161,7 +295,9 @@ class FiniteReceiveMachine:
             return
         if self._receiver is None:
             raise Exception(f'Disable to launch FRM without delegate the receiver.')
-        self._start_Thread.cancel()
+        self._cancelThread()
+        for stage in self._stages:
+            stage.shutdown()
         log.info('stop FRM')
         if self._receiver is not None:
             self._receiver.stop()
@@ -172,16 +308,145 @@ class FiniteReceiveMachine:
             # log.info("You can't pause the machine if it's not launching")
             return
         log.info('pause FRM')
-        self._start_Thread.cancel()
+        self._cancelThread()
         self._is_start = False
 
-    def get(self):
+    @property
+    def is_push(self)->bool:
+        '''receiver 是否支援推送模式 (PushReceiver)。'''
+        return isinstance(self._receiver, PushReceiver)
+
+    def _createThread(self, interval:float)->Union[ScheduleThread | ScheduledJob | NotifyThread]:
+        if self.is_push:
+            return NotifyThread(self.drain)
+        if self._scheduler is not None:
+            return self._scheduler.schedule(interval, self.get, self._policy)
+        return ScheduleThread(interval, self.get, self._policy)
+
+    def _cancelThread(self):
+        if self.is_push:
+            self._receiver.setNotifier(None)
+        self._start_Thread.cancel()
+        if self._pipeline is not None:
+            self._pipeline.flush()
+            self._pipeline = None
+        if self._dispatch_Thread is not None:
+            self._dispatch_Thread.cancel()
+            self._dispatch_Thread = None
+
+    def get(self)->bool:
+        '''取一次 receiver 的結果並推給 updater，回傳是否有取得資料。'''
         log.debug('getting results')
-        res = self._receiver.getResults()
+        if self._batch_size > 0 and self._dispatch_Thread is None:
+            return self._getBatch()
+        res = self._poll()
         if res is None:
-            return
-        if self._updater is not None:
-            self._updater.update(res)
+            return False
+        if self._pipeline is not None:
+            self._pipeline.submit(res)
+        else:
+            self._forward(res)
+        return True
+
+    def _poll(self)->Any:
+        metrics = self._metrics
+        if metrics is None:
+            return self._receiver.getResults()
+        start = time.perf_counter()
+        res = self._receiver.getResults()
+        end = time.perf_counter()
+        metrics.polled(res, start, end)
+        # 結果攜帶 receive 的時間經過 pipeline 與 buffer，update 時計算端到端延遲
+        return None if res is None else Stamped(res, end)
+
+    def _forward(self, res):
+        if self._dispatch_Thread is not None:
+            if not self._buffer.push(res):
+                self._release(res)
+        elif self._pending_batch is not None:
+            # pipeline 依 submit 的順序呼叫 sink，由 _getBatch 整批送出
+            self._pending_batch.append(res)
+        else:
+            self._update(res)
+
+    @staticmethod
+    def _release(res):
+        '''歸還被 RingBuffer 丟棄的 Frame。'''
+        if type(res) is Stamped:
+            res = res.value
+        if type(res) is Frame:
+            res.release()
+
+    def _getBatch(self)->bool:
+        batch = []
+        deadline = None if self._batch_latency is None else time.monotonic() + self._batch_latency
+        while len(batch) < self._batch_size:
+            res = self._poll()
+            if res is None:
+                break
+            batch.append(res)
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+        if not batch:
+            return False
+        if self._pipeline is not None:
+            batch = self._pipeBatch(batch)
+        if batch:
+            self._updateBatch(batch)
+        return True
+
+    def _pipeBatch(self, batch:List[Any])->List[Any]:
+        '''把一批結果送進 pipeline，等待全部送出後回傳未被 stage 過濾的結果 (順序不變)。'''
+        self._pending_batch = []
+        try:
+            for res in batch:
+                self._pipeline.submit(res)
+            self._pipeline.flush()
+            return self._pending_batch
+        finally:
+            self._pending_batch = None
+
+    def _update(self, res):
+        '''推給 updater，若結果為 FramePool 的 Frame，update 結束後歸還給 pool。'''
+        received = None
+        if type(res) is Stamped:
+            res, received = res.value, res.received
+        metrics = self._metrics
+        start = time.perf_counter() if metrics is not None else 0.
+        try:
+            if self._updater is not None:
+                self._updater.update(res)
+        finally:
+            if metrics is not None:
+                metrics.updated((received,), start, time.perf_counter())
+            if type(res) is Frame:
+                res.release()
+
+    def _updateBatch(self, batch:List[Any]):
+        received = [res.received if type(res) is Stamped else None for res in batch]
+        batch = [res.value if type(res) is Stamped else res for res in batch]
+        metrics = self._metrics
+        start = time.perf_counter() if metrics is not None else 0.
+        try:
+            if self._updater is None:
+                return
+            if isinstance(self._updater, BatchUpdater):
+                self._updater.update_batch(batch)
+                return
+            for res in batch:
+                self._updater.update(res)
+        finally:
+            if metrics is not None:
+                metrics.updated(received, start, time.perf_counter())
+            for res in batch:
+                if type(res) is Frame:
+                    res.release()
+
+    def drain(self):
+        '''推送模式下被喚醒後，持續取出 receiver 的結果直到沒有資料或 FRM 被暫停。'''
+        thread = self._start_Thread
+        while self.get() and not thread.is_cancelled:
+            pass
 
 
 if __name__ == '__main__':
@@ -0,0 +1,119 @@
+from __future__ import annotations
+import collections
+import struct
+import threading
+from typing import Dict, List, Optional, Tuple, Union
+from FiniteReceiverMachine.Logger import log
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class Frame:
+    '''
+    FramePool 中的一個預先配置的資料框
+    Receiver 將資料直接寫入 buffer (可寫)，Updater 只透過 view (唯讀) 讀取，
+    FRM 在 update 結束後會呼叫 release() 把 Frame 還給 pool，因此 Updater 不可保留 view 的參照。
+    '''
+    __slots__ = ('buffer', 'view', 'index', 'seq', 'timestamp', '_pool', '_in_use')
+
+    def __init__(self, pool:FramePool, index:int, buffer, view):
+        self.buffer = buffer
+        self.view = view
+        self.index = index
+        self.seq = 0
+        self.timestamp = 0.
+        self._pool = pool
+        self._in_use = False
+
+    def __repr__(self):
+        return f'Frame(index={self.index}, seq={self.seq}, in_use={self._in_use})'
+
+    def release(self)->None:
+        self._pool.release(self)
+
+
+class FramePool:
+    '''
+    固定數量、固定 shape 的 Frame 池
+    所有記憶體在建立時一次配置完成，acquire/release 不會產生新的陣列。
+    安裝 NumPy 時 buffer/view 為 ndarray，否則為 memoryview (dtype 需為 struct 格式字元，如 'f'、'h')。
+    搭配 FRM 的 RingBuffer 時，任何 OverflowPolicy 丟棄的 Frame 都會自動歸還。
+    '''
+    def __init__(self, shape:Union[int, Tuple[int, ...]], dtype:str='f', count:int=8):
+        if count <= 0:
+            raise Exception(f'FramePool count must be positive, got {count}.')
+        self.shape = (shape,) if isinstance(shape, int) else tuple(shape)
+        self.dtype = dtype
+        self.count = count
+        self.misses = 0
+        self._frames:List[Frame] = [self._createFrame(i) for i in range(count)]
+        self._free = collections.deque(self._frames)
+        self._cond = threading.Condition()
+        self._waiting = 0
+
+    def __len__(self):
+        '''目前可用的 Frame 數量。'''
+        return len(self._free)
+
+    def stats(self)->Dict[str, int]:
+        return {'count': self.count, 'free': len(self._free),
+                'in_use': self.count - len(self._free), 'misses': self.misses}
+
+    def acquire(self, timeout:Optional[float]=0)->Optional[Frame]:
+        '''
+        取得一個可寫入的 Frame，pool 用完時等待 timeout 秒 (None 表示一直等待)，
+        等不到則回傳 None 並累計 misses。
+        '''
+        try:
+            frame = self._free.popleft()
+        except IndexError:
+            frame = self._waitFrame(timeout)
+            if frame is None:
+                self.misses += 1
+                return None
+        frame._in_use = True
+        return frame
+
+    def release(self, frame:Frame)->None:
+        if frame._pool is not self:
+            raise Exception(f'{frame} does not belong to this FramePool.')
+        if not frame._in_use:
+            log.warning(f'{frame} is released twice.')
+            return
+        frame._in_use = False
+        self._free.append(frame)
+        if self._waiting:
+            with self._cond:
+                self._cond.notify()
+
+    def _waitFrame(self, timeout:Optional[float])->Optional[Frame]:
+        if timeout == 0:
+            return None
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    try:
+                        return self._free.popleft()
+                    except IndexError:
+                        pass
+                    if not self._cond.wait(timeout):
+                        return None
+            finally:
+                self._waiting -= 1
+
+    def _createFrame(self, index:int)->Frame:
+        if np is not None:
+            buffer = np.zeros(self.shape, dtype=self.dtype)
+            view = buffer.view()
+            view.flags.writeable = False
+        else:
+            size = struct.calcsize(self.dtype)
+            for dim in self.shape:
+                size *= dim
+            buffer = memoryview(bytearray(size)).cast(self.dtype, self.shape)
+            view = buffer.toreadonly()
+        return Frame(self, index, buffer, view)
@@ -0,0 +1,132 @@
+from __future__ import annotations
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class Histogram:
+    '''
+    以 2 的次方 (微秒) 分桶的延遲統計
+    record 只做常數次的整數運算，百分位數為所在分桶的上界。
+    本身沒有 lock，多個執行緒寫入時由 FRMMetrics 的 lock 保護。
+    '''
+    __slots__ = ('buckets', 'count', 'total', 'max')
+    size = 40
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.buckets:List[int] = [0] * self.size
+        self.count = 0
+        self.total = 0.
+        self.max = 0.
+
+    def record(self, seconds:float):
+        us = int(seconds * 1e6)
+        self.buckets[min(us.bit_length(), self.size - 1) if us > 0 else 0] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q:float)->float:
+        '''回傳第 q (0~1) 百分位數的上界，單位為微秒。'''
+        if self.count == 0:
+            return 0.
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= target:
+                return float(1 << i) if i else 1.
+        return self.max * 1e6
+
+    def snapshot(self)->Dict[str, float]:
+        return {
+            'count': self.count,
+            'mean_us': 1e6 * self.total / self.count if self.count else 0.,
+            'max_us': 1e6 * self.max,
+            'p50_us': self.percentile(0.5),
+            'p90_us': self.percentile(0.9),
+            'p99_us': self.percentile(0.99),
+        }
+
+
+class Stamped:
+    '''
+    開啟統計時，結果以 Stamped 包裝後經過 pipeline 與 buffer，攜帶 receive 的時間，
+    update 前再取出原本的結果，Receiver 與 Updater 都不會看到包裝。
+    '''
+    __slots__ = ('value', 'received')
+
+    def __init__(self, value:Any, received:float):
+        self.value = value
+        self.received = received
+
+    def __repr__(self):
+        return f'Stamped({self.value!r}, received={self.received})'
+
+
+class FRMMetrics:
+    '''
+    FiniteReceiveMachine 的效能統計
+    tick 次數、空 poll 比例、getResults/update 的延遲，以及結果從 receive 到 update 完成的延遲。
+    polled 在接收執行緒、updated 可能在 dispatch 或 pipeline 的執行緒呼叫，以 lock 保護所有統計。
+    '''
+    def __init__(self):
+        self.get_latency = Histogram()
+        self.update_latency = Histogram()
+        self.e2e_latency = Histogram()
+        self._lock = threading.Lock()
+        self._reset()
+
+    def reset(self):
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        self.ticks = 0
+        self.empty_polls = 0
+        self.results = 0
+        self.get_latency.reset()
+        self.update_latency.reset()
+        self.e2e_latency.reset()
+        self._since = time.perf_counter()
+
+    def polled(self, res:Any, start:float, end:float):
+        with self._lock:
+            self.ticks += 1
+            self.get_latency.record(end - start)
+            if res is None:
+                self.empty_polls += 1
+            else:
+                self.results += 1
+
+    def updated(self, received:Iterable[Optional[float]], start:float, end:float):
+        '''received 為每筆結果的 receive 時間 (Stamped.received)，None 表示開啟統計前收到的結果。'''
+        with self._lock:
+            self.update_latency.record(end - start)
+            for t in received:
+                if t is not None:
+                    self.e2e_latency.record(end - t)
+
+    def snapshot(self, reset:bool=False)->Dict[str, Any]:
+        with self._lock:
+            return self._snapshot(reset)
+
+    def _snapshot(self, reset:bool)->Dict[str, Any]:
+        elapsed = time.perf_counter() - self._since
+        snapshot = {
+            'elapsed_s': elapsed,
+            'ticks': self.ticks,
+            'tick_rate': self.ticks / elapsed if elapsed > 0 else 0.,
+            'results': self.results,
+            'empty_poll_ratio': self.empty_polls / self.ticks if self.ticks else 0.,
+            'get_latency': self.get_latency.snapshot(),
+            'update_latency': self.update_latency.snapshot(),
+            'e2e_latency': self.e2e_latency.snapshot(),
+        }
+        if reset:
+            self._reset()
+        return snapshot
@@ -0,0 +1,262 @@
+from __future__ import annotations
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, NamedTuple, Optional
+from FiniteReceiverMachine.Logger import log
+from FiniteReceiverMachine.FiniteReceiveMachine import FiniteReceiveMachine, Receiver, Updater, PushReceiver
+from FiniteReceiverMachine.FramePool import Frame
+from FiniteReceiverMachine.Scheduler import MissedTickPolicy, nextTick
+
+
+class SourceResult(NamedTuple):
+    '''共用 updater 收到的結果，附帶產生此結果的 receiver 名稱。'''
+    source: str
+    result: Any
+
+
+@dataclass
+class ReceiverSource:
+    name: str
+    receiver: Receiver
+    updater: Optional[Updater] = None
+    interval: float = 0
+    priority: int = 0
+    isolate: bool = False
+    is_push: bool = False
+    polls: int = 0
+    results: int = 0
+    errors: int = 0
+    next_tick: float = 0.
+    is_queued: bool = False
+    is_running: bool = False
+    is_pending: bool = False
+    token: Optional[object] = None
+    FRM: Optional[FiniteReceiveMachine] = field(default=None, repr=False)
+
+
+class _SourceRouter():
+    '''isolate 的 receiver 由專屬的 FRM 驅動，此類別作為其 updater，將結果轉交給 MultiReceiveMachine。'''
+    def __init__(self, machine:MultiReceiveMachine, source:ReceiverSource):
+        self._machine = machine
+        self._source = source
+
+    def update(self, res) -> None:
+        self._machine._route(self._source, res)
+
+    def setConfigs(self, **kwargs) -> None:...
+
+
+class MultiReceiveMachine:
+    '''
+    Receive data from many receivers and update to updaters.
+    所有 receiver 共用固定數量的 worker 執行緒，依到期時間與 priority 排程;
+    每個 receiver 同時最多只有一個 worker 在處理，慢的裝置只會佔住一個 worker 而不會拖慢其他裝置。
+    isolate=True 的 receiver 改由專屬的 FiniteReceiveMachine 執行緒驅動。
+    '''
+    def __init__(self, workers:int=4, updater:Optional[Updater]=None):
+        self.workers = workers
+        self._updater = updater
+        self._sources:Dict[str, ReceiverSource] = {}
+        self._cond = threading.Condition()
+        self._timers:List[tuple] = []
+        self._ready:List[tuple] = []
+        self._seq = itertools.count()
+        self._threads:List[threading.Thread] = []
+        self._is_start = False
+
+    def __del__(self):
+        self.stop()
+
+    def __repr__(self):
+        return f'Receivers={list(self._sources)}, Updater={self._updater}, workers={self.workers}'
+
+    def addReceiver(self, name:str, receiver:Receiver, updater:Optional[Updater]=None,
+                    interval:float=0, priority:int=0, isolate:bool=False):
+        '''
+        加入一個 receiver。updater 為此 receiver 專屬的 updater (收到原始結果)，
+        priority 越大，在 worker 不足時越優先被處理。
+        '''
+        if self._is_start:
+            raise Exception(f'Disable to add Receiver when MRM is launching.')
+        if name in self._sources:
+            raise Exception(f'Receiver "{name}" is already added.')
+        self._sources[name] = ReceiverSource(name=name, receiver=receiver, updater=updater,
+                                             interval=interval, priority=priority, isolate=isolate,
+                                             is_push=isinstance(receiver, PushReceiver))
+
+    def removeReceiver(self, name:str):
+        if self._is_start:
+            raise Exception(f'Disable to remove Receiver when MRM is launching.')
+        self._sources.pop(name, None)
+
+    def setUpdater(self, updater:Optional[Updater]):
+        '''設定共用的 updater，收到的結果為 SourceResult。'''
+        if self._is_start:
+            raise Exception(f'Disable to set Updater when MRM is launching.')
+        self._updater = updater
+
+    def trigger(self, name:Optional[str]=None, **trigger_arg):
+        '''觸發指定的 receiver，name 為 None 時觸發全部。'''
+        sources = self._sources.values() if name is None else [self._sources[name]]
+        for source in sources:
+            source.receiver.trigger(**trigger_arg)
+
+    def stats(self)->Dict[str, Dict[str, int]]:
+        return {name: {'polls': s.polls, 'results': s.results, 'errors': s.errors}
+                for name, s in self._sources.items()}
+
+    def start(self):
+        if self._is_start:
+            return
+        if not self._sources:
+            raise Exception(f'Disable to launch MRM without delegate any receiver.')
+        self._is_start = True
+        now = time.monotonic()
+        with self._cond:
+            for source in self._sources.values():
+                if source.isolate:
+                    continue
+                source.token = object()
+                source.next_tick = now
+                if source.is_push:
+                    source.receiver.setNotifier(lambda source=source: self._notify(source))
+                self._pushReady(source)
+        for source in self._sources.values():
+            if source.isolate:
+                source.FRM = FiniteReceiveMachine(source.receiver)
+                source.FRM.setUpdater(_SourceRouter(self, source))
+                source.FRM.start(source.interval)
+        shared = sum(not s.isolate for s in self._sources.values())
+        for i in range(min(self.workers, shared)):
+            thread = threading.Thread(target=self._work, name=f'MRM-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        log.info(f'start MRM with {len(self._sources)} receivers, {len(self._threads)} workers')
+
+    def pause(self):
+        if not self._is_start:
+            return
+        log.info('pause MRM')
+        self._cancel()
+
+    def stop(self):
+        if not self._is_start:
+            return
+        self._cancel()
+        log.info('stop MRM')
+        for source in self._sources.values():
+            source.receiver.stop()
+
+    def _cancel(self):
+        with self._cond:
+            self._is_start = False
+            self._timers.clear()
+            self._ready.clear()
+            for source in self._sources.values():
+                source.token = None
+                source.is_queued = source.is_pending = False
+            self._cond.notify_all()
+        for source in self._sources.values():
+            if source.isolate and source.FRM is not None:
+                source.FRM.pause()
+                source.FRM = None
+            elif source.is_push:
+                source.receiver.setNotifier(None)
+        current = threading.current_thread()
+        for thread in self._threads:
+            if thread is not current:
+                thread.join()
+        self._threads.clear()
+
+    def _enqueue(self, source:ReceiverSource):
+        '''在 lock 中呼叫，依 interval 將 receiver 放入 timer heap 或直接放入 ready heap。'''
+        if source.is_push:
+            return
+        if source.next_tick <= time.monotonic():
+            self._pushReady(source)
+        else:
+            heapq.heappush(self._timers, (source.next_tick, next(self._seq), source, source.token))
+
+    def _pushReady(self, source:ReceiverSource):
+        if source.is_queued:
+            return
+        source.is_queued = True
+        heapq.heappush(self._ready, (-source.priority, next(self._seq), source, source.token))
+        self._cond.notify()
+
+    def _notify(self, source:ReceiverSource):
+        with self._cond:
+            if source.token is None:
+                return
+            if source.is_running:
+                source.is_pending = True
+            else:
+                self._pushReady(source)
+
+    def _next(self)->Optional[ReceiverSource]:
+        with self._cond:
+            while self._is_start:
+                now = time.monotonic()
+                while self._timers and self._timers[0][0] <= now:
+                    _, _, source, token = heapq.heappop(self._timers)
+                    if token is source.token:
+                        self._pushReady(source)
+                while self._ready:
+                    _, _, source, token = heapq.heappop(self._ready)
+                    source.is_queued = False
+                    if token is source.token:
+                        source.is_running = True
+                        return source
+                self._cond.wait(self._timers[0][0] - now if self._timers else None)
+            return None
+
+    def _work(self):
+        while True:
+            source = self._next()
+            if source is None:
+                return
+            try:
+                self._poll(source)
+            except Exception as e:
+                source.errors += 1
+                log.error(f'Receiver "{source.name}" raise : {e!r}')
+            with self._cond:
+                source.is_running = False
+                if source.token is None:
+                    continue
+                if source.is_pending:
+                    source.is_pending = False
+                    self._pushReady(source)
+                    continue
+                source.next_tick, _ = nextTick(source.next_tick, source.interval,
+                                               time.monotonic(), MissedTickPolicy.SKIP)
+                self._enqueue(source)
+                is_due = source.is_queued
+            if is_due:
+                # 同 ScheduleThread，interval <= 0 時不等待，但仍讓出 GIL 給其他執行緒
+                time.sleep(0)
+
+    def _poll(self, source:ReceiverSource):
+        '''polling 的 receiver 每次取一筆; 推送模式的 receiver 被喚醒後取到沒有資料為止。'''
+        source.polls += 1
+        while True:
+            res = source.receiver.getResults()
+            if res is None:
+                return
+            self._route(source, res)
+            if not source.is_push or not self._is_start:
+                return
+
+    def _route(self, source:ReceiverSource, res):
+        source.results += 1
+        try:
+            if source.updater is not None:
+                source.updater.update(res)
+            if self._updater is not None:
+                self._updater.update(SourceResult(source.name, res))
+        finally:
+            if type(res) is Frame and not source.isolate:
+                res.release()
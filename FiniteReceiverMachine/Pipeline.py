@@ -0,0 +1,243 @@
+from __future__ import annotations
+import collections
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, List, Optional, Union
+from FiniteReceiverMachine.Logger import log
+from FiniteReceiverMachine.FramePool import Frame, np
+from FiniteReceiverMachine.Metrics import Stamped
+
+try:
+    from multiprocessing import shared_memory, resource_tracker
+except ImportError:
+    shared_memory = None
+
+
+class SharedArray:
+    '''
+    以 shared memory 在 process 間傳遞 ndarray 的描述子，只有名稱、shape 與 dtype 會被 pickle。
+    '''
+    def __init__(self, name:str, shape:tuple, dtype:str):
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+
+    @classmethod
+    def create(cls, array)->tuple:
+        '''建立 shared memory 並複製 array，回傳 (描述子, shm handle)。'''
+        shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)[...] = array
+        return cls(shm.name, array.shape, array.dtype.str), shm
+
+    def attach(self)->tuple:
+        '''附加到已存在的 shared memory，回傳 (ndarray, shm handle)。'''
+        shm = shared_memory.SharedMemory(name=self.name)
+        return np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf), shm
+
+
+def _untrack(shm):
+    # 子 process 與主 process 共用 resource tracker，子 process 建立的 shared memory 交由主 process unlink
+    resource_tracker.unregister(shm._name, 'shared_memory')
+
+
+def _callShared(func:Callable[[Any], Any], payload:Any, threshold:int)->Any:
+    '''在子 process 中執行 : 從 shared memory 取出輸入，較大的 ndarray 輸出也經由 shared memory 傳回。'''
+    shm_in = None
+    if isinstance(payload, SharedArray):
+        payload, shm_in = payload.attach()
+    try:
+        out = func(payload)
+        if np is not None and isinstance(out, np.ndarray):
+            if out.nbytes >= threshold:
+                desc, shm_out = SharedArray.create(out)
+                _untrack(shm_out)
+                shm_out.close()
+                out = desc
+            elif shm_in is not None:
+                out = np.array(out)
+    finally:
+        payload = None
+        if shm_in is not None:
+            shm_in.close()
+    return out
+
+
+class Stage:
+    '''
+    Pipeline 中的一個轉換階段，func(res) 的回傳值交給下一個階段，回傳 None 表示丟棄這筆結果。
+    executor : None 在呼叫端執行緒中執行、'thread' 使用 ThreadPoolExecutor、
+               'process' 使用 ProcessPoolExecutor (func 需可被 pickle)，或直接給一個 Executor。
+    在同一個 process 中執行時 func 收到的是 Frame 本身，'process' 時收到的是 ndarray (Frame 取其 view)，
+    大於 shm_threshold bytes 的 ndarray 以 shared memory 傳遞，不經過 pickle。
+    '''
+    def __init__(self, func:Callable[[Any], Any], executor:Union[str, Executor, None]=None,
+                 workers:int=1, shm_threshold:int=1 << 20):
+        if executor not in (None, 'thread', 'process') and not isinstance(executor, Executor):
+            raise Exception(f'Unknown stage executor {executor!r}.')
+        self.func = func
+        self.executor = executor
+        self.workers = workers
+        self.shm_threshold = shm_threshold
+        self._executor:Optional[Executor] = executor if isinstance(executor, Executor) else None
+
+    @property
+    def is_process(self)->bool:
+        return self.executor == 'process' or isinstance(self.executor, ProcessPoolExecutor)
+
+    def start(self):
+        if self._executor is not None:
+            return
+        if self.executor == 'thread':
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='FRM-stage')
+        elif self.executor == 'process':
+            self._executor = ProcessPoolExecutor(self.workers)
+
+    def shutdown(self):
+        '''只關閉由 Stage 自己建立的 executor。'''
+        if isinstance(self.executor, str) and self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def submit(self, value:Any)->Future:
+        if self._executor is None:
+            future = Future()
+            try:
+                future.set_result(self.func(value))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        if not self.is_process:
+            return self._executor.submit(self.func, value)
+        shm = None
+        if type(value) is Frame:
+            value = value.view
+        if np is not None and shared_memory is not None and isinstance(value, np.ndarray) \
+                and value.nbytes >= self.shm_threshold:
+            value, shm = SharedArray.create(value)
+        future = self._executor.submit(_callShared, self.func, value, self.shm_threshold)
+        if shm is not None:
+            future.add_done_callback(lambda _: (shm.close(), shm.unlink()))
+        return future
+
+    @staticmethod
+    def result(future:Future)->Any:
+        out = future.result()
+        if isinstance(out, SharedArray):
+            array, shm = out.attach()
+            out = np.array(array)
+            del array
+            shm.close()
+            shm.unlink()
+        return out
+
+
+class _Item:
+    __slots__ = ('received', 'value', 'is_done', 'is_dropped', 'is_failed')
+
+    def __init__(self, received:Optional[float]=None):
+        self.received = received
+        self.value = None
+        self.is_done = False
+        self.is_dropped = False
+        self.is_failed = False
+
+
+class Pipeline:
+    '''
+    receive → stage(s) → update 的轉換管線
+    每筆結果依序經過各個 Stage，不論在哪個 executor 中完成，交給 sink 的順序都與 submit 的順序相同;
+    同時處理中的筆數超過 max_in_flight 時 submit 會阻塞，對接收端形成背壓。
+    stage 回傳 None 過濾掉的筆數計入 filtered，stage 發生例外而丟失的筆數計入 dropped。
+    submit 收到 Stamped 時只把原本的結果交給 stage，送出時再以相同的 receive 時間包裝。
+    '''
+    def __init__(self, stages:List[Stage], sink:Callable[[Any], None], max_in_flight:int=8):
+        self.stages = stages
+        self.max_in_flight = max_in_flight
+        self.dropped = 0
+        self.filtered = 0
+        self._sink = sink
+        self._queue = collections.deque()
+        self._undelivered = 0
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._deliver_lock = threading.RLock()
+        self._idle = threading.Condition(self._lock)
+
+    def __len__(self):
+        return len(self._queue)
+
+    def start(self):
+        for stage in self.stages:
+            stage.start()
+
+    def shutdown(self):
+        self.flush()
+        for stage in self.stages:
+            stage.shutdown()
+
+    def flush(self, timeout:Optional[float]=None)->bool:
+        '''等待所有處理中的結果送出 (sink 已返回)。'''
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._undelivered, timeout)
+
+    def submit(self, res:Any):
+        self._slots.acquire()
+        item = _Item()
+        if type(res) is Stamped:
+            item.received = res.received
+            res = res.value
+        with self._lock:
+            self._queue.append(item)
+            self._undelivered += 1
+        self._runStage(item, 0, res)
+
+    def _runStage(self, item:_Item, index:int, value:Any):
+        if value is None:
+            item.is_dropped = True
+            self._finish(item)
+            return
+        if index == len(self.stages):
+            item.value = value
+            self._finish(item)
+            return
+        stage = self.stages[index]
+        future = stage.submit(value)
+        future.add_done_callback(lambda f: self._onStageDone(item, index, value, f))
+
+    def _onStageDone(self, item:_Item, index:int, value:Any, future:Future):
+        try:
+            out = self.stages[index].result(future)
+        except Exception as e:
+            log.error(f'Pipeline stage {index} raise : {e!r}')
+            item.is_failed = True
+            out = None
+        if out is not value and type(value) is Frame:
+            value.release()
+        self._runStage(item, index + 1, out)
+
+    def _finish(self, item:_Item):
+        item.is_done = True
+        with self._deliver_lock:
+            while True:
+                with self._lock:
+                    if not self._queue or not self._queue[0].is_done:
+                        return
+                    head = self._queue.popleft()
+                self._slots.release()
+                try:
+                    if head.is_dropped:
+                        if head.is_failed:
+                            self.dropped += 1
+                        else:
+                            self.filtered += 1
+                        continue
+                    value = head.value if head.received is None else Stamped(head.value, head.received)
+                    try:
+                        self._sink(value)
+                    except Exception as e:
+                        log.error(f'Pipeline sink raise : {e!r}')
+                finally:
+                    with self._lock:
+                        self._undelivered -= 1
+                        if not self._undelivered:
+                            self._idle.notify_all()
@@ -0,0 +1,227 @@
+from __future__ import annotations
+import threading
+import time
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+from FiniteReceiverMachine.Logger import log
+
+
+class OverflowPolicy(Enum):
+    '''
+    RingBuffer 滿載時 push 的處理策略。
+    DROP_OLDEST : 覆蓋最舊的資料。
+    DROP_NEWEST : 丟棄這次 push 的資料。
+    BLOCK       : 阻塞 producer 直到有空間 (背壓)。
+    '''
+    DROP_OLDEST = 'drop_oldest'
+    DROP_NEWEST = 'drop_newest'
+    BLOCK = 'block'
+
+
+class RingBuffer:
+    '''
+    固定容量的 SPSC (單一 producer、單一 consumer) 環狀緩衝區
+    producer 只寫 _head，consumer 只寫 _tail，push/pop 的主要路徑不需要 lock，
+    只有在 producer 或 consumer 需要等待時才使用 Event 喚醒對方。
+    每一格存放 [序號, 資料]，consumer 以序號判斷該格是否已被 producer 覆蓋 (DROP_OLDEST)。
+    DROP_OLDEST 覆蓋時，producer 與 consumer 以 list.pop 搶同一筆資料 (只有一方會拿到)，
+    producer 拿到的資料交給 on_evict (例如把 Frame 歸還給 FramePool)。
+    '''
+    def __init__(self, capacity:int=1024, policy:OverflowPolicy=OverflowPolicy.DROP_OLDEST,
+                 on_evict:Optional[Callable[[Any], None]]=None):
+        if capacity <= 0:
+            raise Exception(f'RingBuffer capacity must be positive, got {capacity}.')
+        self.capacity = capacity
+        self.policy = policy
+        self.on_evict = on_evict
+        self._slots:List[Any] = [None] * capacity
+        self._head = 0
+        self._tail = 0
+        self._has_data = threading.Event()
+        self._has_space = threading.Event()
+        self._consumer_waiting = False
+        self._producer_waiting = False
+        self.is_closed = False
+        self.pushed = 0
+        self.popped = 0
+        self.drops = 0
+        self.high_water = 0
+
+    def __len__(self):
+        return min(self._head - self._tail, self.capacity)
+
+    def stats(self)->Dict[str, int]:
+        return {'capacity': self.capacity, 'size': len(self), 'pushed': self.pushed,
+                'popped': self.popped, 'drops': self.drops, 'high_water': self.high_water}
+
+    def push(self, item:Any, timeout:Optional[float]=None)->bool:
+        '''由 producer 呼叫，回傳資料是否有放入緩衝區。'''
+        head = self._head
+        if head - self._tail >= self.capacity:
+            if self.policy is OverflowPolicy.DROP_NEWEST:
+                self.drops += 1
+                return False
+            if self.policy is OverflowPolicy.BLOCK and not self._waitSpace(timeout):
+                self.drops += 1
+                return False
+            # DROP_OLDEST 直接覆蓋，由 consumer 在 pop 時偵測並計算丟失數量
+            self._evict(head % self.capacity)
+        self._slots[head % self.capacity] = [head, item]
+        self._head = head + 1
+        self.pushed += 1
+        size = len(self)
+        if size > self.high_water:
+            self.high_water = size
+        if self._consumer_waiting:
+            self._has_data.set()
+        return True
+
+    def pop(self, timeout:Optional[float]=0)->Optional[Any]:
+        '''
+        由 consumer 呼叫，取出最舊的資料; 沒有資料時等待 timeout 秒 (None 表示一直等到 wake)，
+        等不到資料則回傳 None。
+        '''
+        item = self._pop()
+        if item is not None or timeout == 0:
+            return item
+        self._consumer_waiting = True
+        self._has_data.clear()
+        try:
+            item = self._pop()
+            if item is None and not self.is_closed:
+                self._has_data.wait(timeout)
+                item = self._pop()
+        finally:
+            self._consumer_waiting = False
+        return item
+
+    def drain(self, max_items:Optional[int]=None)->List[Any]:
+        '''不等待，一次取出目前緩衝區中的資料 (最多 max_items 筆)。'''
+        items = []
+        while max_items is None or len(items) < max_items:
+            item = self._pop()
+            if item is None:
+                break
+            items.append(item)
+        return items
+
+    def open(self):
+        self.is_closed = False
+
+    def close(self):
+        '''喚醒所有等待中的 producer 與 consumer，關閉後 push/pop 都不再等待。'''
+        self.is_closed = True
+        self._has_data.set()
+        self._has_space.set()
+
+    def clear(self):
+        self._tail = self._head
+
+    def _pop(self)->Optional[Any]:
+        while True:
+            tail = self._tail
+            head = self._head
+            if head == tail:
+                return None
+            if head - tail > self.capacity:
+                # producer 已覆蓋最舊的資料 (DROP_OLDEST)
+                self.drops += head - tail - self.capacity
+                tail = head - self.capacity
+            entry = self._slots[tail % self.capacity]
+            if entry is None or entry[0] != tail:
+                # 讀取前該格已被 producer 覆蓋 (DROP_OLDEST)，跳過後重新讀取
+                self._tail = tail + 1
+                self.drops += 1
+                continue
+            # 只取出這一格的資料，不清除整格，避免與正在覆蓋該格的 producer 互相干擾
+            try:
+                item = entry.pop(1)
+            except IndexError:
+                # producer 覆蓋前已取走並交給 on_evict
+                self._tail = tail + 1
+                self.drops += 1
+                continue
+            self._tail = tail + 1
+            self.popped += 1
+            if self._producer_waiting:
+                self._has_space.set()
+            return item
+
+    def _evict(self, slot:int)->None:
+        entry = self._slots[slot]
+        if entry is None:
+            return
+        try:
+            item = entry.pop(1)
+        except IndexError:
+            # consumer 已取走
+            return
+        if self.on_evict is not None:
+            self.on_evict(item)
+
+    def _waitSpace(self, timeout:Optional[float])->bool:
+        self._producer_waiting = True
+        try:
+            while True:
+                self._has_space.clear()
+                if self._head - self._tail < self.capacity:
+                    return True
+                if self.is_closed or not self._has_space.wait(timeout):
+                    return False
+        finally:
+            self._producer_waiting = False
+
+
+class DispatchThread(threading.Thread):
+    '''
+    RingBuffer 的 consumer 執行緒
+    將緩衝區中的資料依序交給 func (通常為 Updater.update)，使慢速的 updater 不會拖慢接收端。
+    batch_size > 0 時改為批次模式，func 每次收到一個 list，
+    最多 batch_size 筆，或自第一筆起等待超過 max_latency 秒即送出。
+    '''
+    def __init__(self, buffer:RingBuffer, func:Callable[[Any], None],
+                 batch_size:int=0, max_latency:Optional[float]=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buffer = buffer
+        self.batch_size = batch_size
+        self.max_latency = max_latency
+        self._func = func
+        self.is_cancelled = False
+
+    def run(self) -> None:
+        while True:
+            item = self.buffer.pop(timeout=None)
+            if item is None:
+                if self.is_cancelled:
+                    break
+                continue
+            if self.batch_size > 0:
+                item = self._collect(item)
+            try:
+                self._func(item)
+            except Exception as e:
+                log.error(f'Dispatch thread function raise : {e!r}')
+
+    def _collect(self, first:Any)->List[Any]:
+        deadline = time.monotonic() + (self.max_latency or 0)
+        batch = [first]
+        batch.extend(self.buffer.drain(self.batch_size - 1))
+        if not self.max_latency:
+            return batch
+        while len(batch) < self.batch_size and not self.buffer.is_closed:
+            remain = deadline - time.monotonic()
+            if remain <= 0:
+                break
+            item = self.buffer.pop(timeout=remain)
+            if item is None:
+                continue
+            batch.append(item)
+            batch.extend(self.buffer.drain(self.batch_size - len(batch)))
+        return batch
+
+    def cancel(self):
+        '''停止前會先把緩衝區中剩下的資料送完。'''
+        self.is_cancelled = True
+        self.buffer.close()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join()
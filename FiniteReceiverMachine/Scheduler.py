@@ -0,0 +1,232 @@
+from __future__ import annotations
+import heapq
+import itertools
+import threading
+import time
+from enum import Enum
+from typing import Callable, List, Optional, Tuple
+from FiniteReceiverMachine.Logger import log
+
+
+class MissedTickPolicy(Enum):
+    '''
+    當 func 執行時間超過 interval 導致錯過 tick 時的處理策略。
+    CATCH_UP : 不等待，連續補跑錯過的 tick。
+    SKIP     : 丟棄錯過的 tick，對齊到下一個時間格點。
+    '''
+    CATCH_UP = 'catch_up'
+    SKIP = 'skip'
+
+
+def nextTick(next_tick:float, interval:float, now:float, policy:MissedTickPolicy)->Tuple[float, int]:
+    '''
+    以 monotonic clock 計算下一次 tick 的時間點(修正漂移)，並回傳錯過的 tick 數。
+    CATCH_UP 每次只前進一個 interval，回傳的 1 表示下一個 tick 已經遲到 (每個遲到的 tick 只計算一次)。
+    '''
+    if interval <= 0:
+        return now, 0
+    next_tick += interval
+    if next_tick >= now:
+        return next_tick, 0
+    if policy is MissedTickPolicy.CATCH_UP:
+        return next_tick, 1
+    missed = int((now - next_tick) // interval) + 1
+    next_tick += missed * interval
+    return next_tick, missed
+
+
+class ScheduleThread(threading.Thread):
+    '''
+    常駐的排程執行緒
+    整個生命週期只使用一條執行緒，以 monotonic clock 修正漂移，
+    並以 Event 等待，使 cancel 能立即喚醒執行緒而不需等到 interval 結束。
+    '''
+    def __init__(self, interval:float, func:Callable[[], None],
+                 policy:MissedTickPolicy=MissedTickPolicy.SKIP, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.interval = interval
+        self.policy = policy
+        self.ticks = 0
+        self.missed_ticks = 0
+        self._func = func
+        self._cancel = threading.Event()
+
+    def run(self) -> None:
+        next_tick = time.monotonic()
+        while not self._cancel.is_set():
+            try:
+                self._func()
+            except Exception as e:
+                log.error(f'Schedule thread function raise : {e!r}')
+            self.ticks += 1
+            now = time.monotonic()
+            next_tick, missed = nextTick(next_tick, self.interval, now, self.policy)
+            self.missed_ticks += missed
+            if next_tick > now:
+                if self._cancel.wait(next_tick - now):
+                    break
+            else:
+                # interval <= 0 或補跑錯過的 tick 時不等待，但仍讓出 GIL 給其他執行緒
+                time.sleep(0)
+
+    def cancel(self):
+        self._cancel.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join()
+
+
+class ScheduledJob:
+    '''
+    SharedScheduler 上的一個排程工作，提供與 ScheduleThread 相同的 start/cancel 介面。
+    與 ScheduleThread.cancel 相同，cancel 返回時 func 已不在執行中 (在排程執行緒中呼叫時除外)。
+    '''
+    def __init__(self, scheduler:SharedScheduler, interval:float, func:Callable[[], None],
+                 policy:MissedTickPolicy=MissedTickPolicy.SKIP):
+        self.interval = interval
+        self.policy = policy
+        self.ticks = 0
+        self.missed_ticks = 0
+        self.next_tick = 0.
+        self._func = func
+        self._scheduler = scheduler
+        self._token:Optional[object] = None
+        self.is_cancelled = False
+        self.is_running = False
+
+    def start(self):
+        self.is_cancelled = False
+        self._scheduler.add(self)
+
+    def cancel(self):
+        self.is_cancelled = True
+        self._scheduler.cancel(self)
+
+
+class SharedScheduler:
+    '''
+    共用排程器
+    多個 FiniteReceiveMachine 共用同一條執行緒，依到期時間(heap)依序執行各自的工作。
+    '''
+    def __init__(self, name:str='SharedScheduler'):
+        self.name = name
+        self._heap:List[Tuple[float, int, ScheduledJob, object]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread:Optional[threading.Thread] = None
+        self._is_closed = False
+
+    def schedule(self, interval:float, func:Callable[[], None],
+                 policy:MissedTickPolicy=MissedTickPolicy.SKIP)->ScheduledJob:
+        '''建立一個尚未啟動的排程工作，呼叫 job.start() 後開始執行。'''
+        return ScheduledJob(self, interval, func, policy)
+
+    def add(self, job:ScheduledJob):
+        with self._cond:
+            if self._is_closed:
+                raise Exception(f'Disable to add job when {self.name} is closed.')
+            job.next_tick = time.monotonic()
+            job._token = object()
+            self._push(job)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def cancel(self, job:ScheduledJob):
+        '''喚醒排程執行緒移除 job，並等待執行中的 job 結束 (在排程執行緒中呼叫時不等待)。'''
+        with self._cond:
+            # cancel 也在 _cond 上等待，因此一律使用 notify_all，避免喚醒的不是排程執行緒
+            self._cond.notify_all()
+            if threading.current_thread() is not self._thread:
+                self._cond.wait_for(lambda: not job.is_running)
+
+    def close(self):
+        with self._cond:
+            self._is_closed = True
+            self._cond.notify_all()
+        if self._thread is not None and threading.current_thread() is not self._thread:
+            self._thread.join()
+        self._thread = None
+
+    def _push(self, job:ScheduledJob):
+        heapq.heappush(self._heap, (job.next_tick, next(self._seq), job, job._token))
+
+    @staticmethod
+    def _isAlive(job:ScheduledJob, token:object)->bool:
+        '''job 被 cancel 或重新 start 後，heap 中舊的項目即失效。'''
+        return not job.is_cancelled and job._token is token
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    if self._is_closed:
+                        self._heap.clear()
+                        return
+                    while self._heap and not self._isAlive(*self._heap[0][2:]):
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    due = self._heap[0][0]
+                    now = time.monotonic()
+                    if due <= now:
+                        break
+                    self._cond.wait(due - now)
+                _, _, job, token = heapq.heappop(self._heap)
+                job.is_running = True
+            try:
+                job._func()
+            except Exception as e:
+                log.error(f'{self.name} job function raise : {e!r}')
+            job.ticks += 1
+            with self._cond:
+                job.is_running = False
+                self._cond.notify_all()
+                if not self._isAlive(job, token):
+                    continue
+                job.next_tick, missed = nextTick(job.next_tick, job.interval, time.monotonic(), job.policy)
+                job.missed_ticks += missed
+                self._push(job)
+            if job.next_tick <= time.monotonic():
+                # 同 ScheduleThread，不等待時仍讓出 GIL
+                time.sleep(0)
+
+
+class NotifyThread(threading.Thread):
+    '''
+    推送模式的執行緒
+    平時阻塞在 Event 上不佔用 CPU，只有當 receiver 呼叫 notify() 表示資料就緒時才執行 func。
+    '''
+    def __init__(self, func:Callable[[], None], *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ticks = 0
+        self._func = func
+        self._ready = threading.Event()
+        self.is_cancelled = False
+
+    def notify(self):
+        '''由 receiver 呼叫，可在任何執行緒中使用。'''
+        self._ready.set()
+
+    def run(self) -> None:
+        while True:
+            self._ready.wait()
+            if self.is_cancelled:
+                break
+            self._ready.clear()
+            try:
+                self._func()
+            except Exception as e:
+                log.error(f'Notify thread function raise : {e!r}')
+            self.ticks += 1
+
+    def cancel(self):
+        self.is_cancelled = True
+        self._ready.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join()
@@ -1,11 +1,20 @@
+import os
+import sys
+import Profiler
+
+# MVVM_PROFILE_STARTUP=1 python Main.py : 輸出每個模組的 import 時間與每個 plugin setupUI 的時間
+if os.environ.get(Profiler.ENV_VAR):
+    Profiler.enable()
+
 from PySide6 import QtCore, QtGui, QtWidgets
 from MainView import AppView, Counter
 from MainViewModel import ViewModelEventMediator, AppViewModel, CounterModel
+from View import discoverPlugins, registerPlugins
 
 
 if __name__ == "__main__":
-    import sys
-    app = QtWidgets.QApplication(sys.argv)
+    with Profiler.section('QApplication'):
+        app = QtWidgets.QApplication(sys.argv)
     window = QtWidgets.QMainWindow()
     window.resize(600,100)
     widget = QtWidgets.QWidget()
@@ -13,16 +22,16 @@ if __name__ == "__main__":
     mediator = ViewModelEventMediator()
 
     app_model = AppViewModel('Main', mediator)
-    counter_model = CounterModel('Counter', mediator)
-    counter_model2 = CounterModel('Counter2', mediator)
 
     AppView = AppView('Main', app_model)
-    counterView = Counter('Counter', counter_model)
-    counterView2 = Counter('Counter2', counter_model2)
 
-    AppView.setupUI(widget)
-    AppView.addPluginView(counterView)
-    AppView.addPluginView(counterView2)
+    with Profiler.section('Main setupUI'):
+        AppView.setupUI(widget)
+    for name in ('Counter', 'Counter2'):
+        AppView.addPluginFactory(name, lambda name=name: Counter(name, CounterModel(name, mediator)))
+    with Profiler.section('discoverPlugins'):
+        registerPlugins(AppView, mediator, discoverPlugins())
+    AppView.setIdleUnload(300)
 
     AppView.run()
 
@@ -31,4 +40,9 @@ if __name__ == "__main__":
     window.setCentralWidget(widget)
     window.show()
 
+    profiler = Profiler.active()
+    if profiler is not None:
+        QtCore.QTimer.singleShot(0, lambda: print(profiler.report(), file=sys.stderr))
+        app.aboutToQuit.connect(lambda: print(profiler.report(), file=sys.stderr))
+
     sys.exit(app.exec())
\ No newline at end of file
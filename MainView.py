@@ -1,4 +1,4 @@
-from View import BaseView, PlugInView, isFragment, PlugInViewInfo
+from View import BaseView, PlugInView, isFragment, PlugInViewInfo, bind
 from typing import Optional
 from PySide6 import QtCore,QtGui,QtWidgets
 from MainViewModel import AppViewModel, CounterModel, ViewModelEventMediator
@@ -13,13 +13,12 @@ class AppView(PlugInView):
         self.view_model.sentinel.sig_setPlugin.connect(self.getPluginNotify)
         self.view_model.sentinel.sig_message.connect(self.getMessage)
         self.view_model.sentinel.sig_selectPlugin.connect(self.getSelectPlugin)
-        for name, plug_in_view in self.plugin_views.items():
-            plug_in_view.view.run()
 
     def _disconnectSentinel(self):
         super()._disconnectSentinel()
         self.view_model.sentinel.sig_setPlugin.disconnect(self.getPluginNotify)
         self.view_model.sentinel.sig_message.disconnect(self.getMessage)
+        self.view_model.sentinel.sig_selectPlugin.disconnect(self.getSelectPlugin)
 
     def setupUI(self, wg:QtWidgets.QWidget) ->None:
         self.ques = QtWidgets.QMessageBox(wg)
@@ -56,29 +55,35 @@ class AppView(PlugInView):
 
     @isFragment()
     def getModelState(self, view_model:AppViewModel) ->None:
-        if view_model.is_connect:
-            self.pb_connect.setText('Disconnect')
+        state = view_model.snapshot()
+        if state.is_connect:
+            self.diff(self.pb_connect).setText('Disconnect')
         else:
-            self.pb_connect.setText('Connect')
+            self.diff(self.pb_connect).setText('Connect')
             self.el_ID.clear()
 
-        self.ccb_plugin.setEnabled(view_model.is_connect)
-        self.el_ID.setEnabled(view_model.is_connect)
-        self.pb_set_setting.setEnabled(view_model.is_connect)
+        self.diff(self.ccb_plugin).setEnabled(state.is_connect)
+        self.diff(self.el_ID).setEnabled(state.is_connect)
+        self.diff(self.pb_set_setting).setEnabled(state.is_connect)
 
     @isFragment()
     def getPluginNotify(self, view_model:AppViewModel)->None:
         self.ccb_plugin.clear()
-        self.ccb_plugin.addItems(tuple(view_model.plugins.keys()))
+        self.ccb_plugin.addItems(tuple(self.plugin_views.keys()))
 
     def getSelectPlugin(self, plugin:str)->None:
-        self.stack.setCurrentWidget(self.plugin_views[plugin].view.wg)
+        view = self.activatePlugin(plugin)
+        self.stack.setCurrentWidget(view.wg)
 
     def _addPluginToLayout(self, view:BaseView):
         wg = QtWidgets.QWidget()
         self.stack.addWidget(wg)
         view.setupUI(wg=wg)
 
+    def _removePluginFromLayout(self, view:BaseView):
+        self.stack.removeWidget(view.wg)
+        view.wg.deleteLater()
+
     def getMessage(self, msg:str):
         ret = QtWidgets.QMessageBox.warning(self.ques, 'Notice',
                                       msg, QtWidgets.QMessageBox.StandardButton.Ok)
@@ -87,6 +92,10 @@ class AppView(PlugInView):
 
 class Counter(BaseView):
     view_model:Optional[CounterModel]=None
+    bindings = (
+        bind('current_number', 'lb_number.text', lambda number: f'Current Number : {number}'),
+        bind('is_enable', 'wg.enabled'),
+    )
     def __init__(self, name, view_model:CounterModel):
         super().__init__(name=name, view_model=view_model)
 
@@ -107,8 +116,7 @@ class Counter(BaseView):
 
     @isFragment()
     def getModelState(self, view_model:CounterModel) ->None:
-        self.lb_number.setText(f'Current Number : {view_model.current_number}')
-        self.wg.setEnabled(view_model.is_enable)
+        # lb_number 與 wg 由 bindings 更新
         return
 
     def _addPluginToLayout(self, view_info: PlugInViewInfo) ->None:...
@@ -1,44 +1,45 @@
 import inspect
-from PySide6 import QtCore, QtGui, QtWidgets
-from ViewModel import ViewModel, ModelSentinel, Repository, ViewModelEventMediator, isHandler
+from ViewModel import ViewModel, Repository, ViewModelEventMediator, DispatchMode, isHandler, ObservableProperty
 from ViewModel.Logger import log
 import View.View as SETTING_PROCESS
 
 
-class AppModelSentinel(ModelSentinel):
-    sig_setPlugin = QtCore.Signal(object)
-    sig_selectPlugin = QtCore.Signal(object)
+APP_SIGNALS = {'sig_setPlugin': object, 'sig_selectPlugin': object}
 
 class UIState(Repository):
-    def __init__(self):
-        self._is_connect = False
-        self._is_set = False
+    is_connect: bool = False
+    is_set: bool = False
 
 class AppViewModel(ViewModel):
+    sentinel_signals = APP_SIGNALS
+
     @property
     def is_connect(self):
-        return self._state._is_connect
+        return self._state.is_connect
 
     @is_connect.setter
     def is_connect(self, is_connect: bool):
-        self._state._is_connect = is_connect
+        self._state.is_connect = is_connect
         self.mediator.trigger('changed_Connect', is_connect)
         self.sentinel.sig_state.emit(self)
 
     @property
     def is_set(self):
-        return self._state._is_set
+        return self._state.is_set
 
     @is_set.setter
     def is_set(self, is_set: bool):
-        self._state._is_set = is_set
+        self._state.is_set = is_set
         self.sentinel.sig_state.emit(self)
 
     def __init__(self, name:str, mediator:ViewModelEventMediator):
         super().__init__(name=name, mediator=mediator)
-        self.sentinel = AppModelSentinel()
         self._state = UIState()
-        self.mediator.register('changed_Connect', self.ConnectState)
+        self.mediator.register('changed_Connect', self.ConnectState, DispatchMode.GUI)
+
+    def snapshot(self)->UIState.Snapshot:
+        '''供 View 渲染用的不可變狀態。'''
+        return self._state.snapshot()
 
     def render(self):
         self.mediator.trigger('changed_Connect', self.is_connect)
@@ -46,10 +47,16 @@ class AppViewModel(ViewModel):
         for name, plugin in self.plugins.items():
             plugin.render()
 
+    def addPlugin(self, name:str, plugin:ViewModel)->None:
+        '''加入 plugin 時同步目前的連線狀態 (plugin 可能在連線後才由 factory 建立)。'''
+        super().addPlugin(name=name, plugin=plugin)
+        self.mediator.trigger('changed_Connect', self.is_connect)
+
     def connectDevice(self)->None:
         log.info('Connect device')
-        self.is_connect = True
-        self.setPlugins()
+        with self.batch():
+            self.is_connect = True
+            self.setPlugins()
 
     def disconnectDevice(self)->None:
         log.info('Disconnect device')
@@ -92,34 +99,21 @@ class AppViewModel(ViewModel):
 
 
 
-class CounterModel(ViewModel):
-    @property
-    def current_number(self)->int:
-        return self._current_number
-    @current_number.setter
-    def current_number(self, number):
-        if number == 10:
-            number = 0
-        elif number == -1:
-            number = 9
-        self._current_number = number
-        self.sentinel.sig_state.emit(self)
-
-    @property
-    def is_enable(self)->bool:
-        return self._enable
+def wrapDigit(number:int)->int:
+    if number == 10:
+        number = 0
+    elif number == -1:
+        number = 9
+    return number
 
-    @is_enable.setter
-    def is_enable(self, is_enable):
-        self._enable = is_enable
-        self.sentinel.sig_state.emit(self)
+class CounterModel(ViewModel):
+    sentinel_signals = APP_SIGNALS
+    current_number = ObservableProperty(0, convert=wrapDigit)
+    is_enable = ObservableProperty(True)
 
     def __init__(self, name:str, mediator:ViewModelEventMediator):
         super().__init__(name=name, mediator=mediator)
-        self.sentinel = AppModelSentinel()
-        self.mediator.register('changed_Connect', self.setViewEnable)
-        self._current_number=0
-        self._enable = True
+        self.mediator.register('changed_Connect', self.setViewEnable, DispatchMode.GUI)
 
     def render(self):
         self.sentinel.sig_state.emit(self)
@@ -139,6 +133,8 @@ class CounterModel(ViewModel):
             self.is_enable = is_connect
 
 class SettingModel(ViewModel):
+    sentinel_signals = APP_SIGNALS
+
     @property
     def is_set(self):
         return self._is_set
@@ -149,7 +145,6 @@ class SettingModel(ViewModel):
         self.sentinel.sig_state.emit(self)
     def __init__(self, name: str, mediator: ViewModelEventMediator):
         super().__init__(name=name, mediator=mediator)
-        self.sentinel = AppModelSentinel()
         self._is_set = False
     def render(self):
         self.sentinel.sig_state.emit(self)
@@ -0,0 +1,138 @@
+'''
+啟動時間量測模式
+enable() 之後 import 的每個模組都會記錄執行時間 (total 包含它 import 的子模組，self 不包含)，
+section() 記錄任意區段的時間，例如每個 plugin 的 setupUI。未開啟時 section() 幾乎沒有成本。
+
+Main.py 在設定環境變數 MVVM_PROFILE_STARTUP=1 時開啟，啟動完成與結束時輸出報告。
+這個模組放在 repo 根目錄、只依賴標準函式庫，import 時不會執行任何 package 的 __init__，
+因此可以在 import ViewModel、View 或 PySide6 之前開啟，量測到整個應用程式的 import。
+'''
+from __future__ import annotations
+import contextlib
+import importlib.abc
+import sys
+import threading
+import time
+from typing import Any, Iterator, List, NamedTuple, Optional
+
+ENV_VAR = 'MVVM_PROFILE_STARTUP'
+
+
+class ProfileRecord(NamedTuple):
+    kind:str
+    name:str
+    total:float
+    self_time:float
+
+
+class _TimedLoader:
+    '''包裝原本的 loader，只量測 exec_module，其他屬性交給原本的 loader。'''
+    def __init__(self, loader, profiler:StartupProfiler):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        with self._profiler.section(module.__name__, kind='import'):
+            self._loader.exec_module(module)
+
+    def __getattr__(self, name:str)->Any:
+        return getattr(self._loader, name)
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    def __init__(self, profiler:StartupProfiler):
+        self._profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                spec.loader = _TimedLoader(spec.loader, self._profiler)
+            return spec
+        return None
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.records:List[ProfileRecord] = []
+        self._local = threading.local()
+        self._finder:Optional[_TimingFinder] = None
+        self._reported = 0
+        self.start = time.perf_counter()
+
+    def install(self)->None:
+        if self._finder is None:
+            self._finder = _TimingFinder(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def uninstall(self)->None:
+        if self._finder is not None:
+            sys.meta_path.remove(self._finder)
+            self._finder = None
+
+    @contextlib.contextmanager
+    def section(self, name:str, kind:str='setup')->Iterator[None]:
+        stack:List[float] = self._local.__dict__.setdefault('children', [])
+        stack.append(0.)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            total = time.perf_counter() - start
+            children = stack.pop()
+            if stack:
+                stack[-1] += total
+            self.records.append(ProfileRecord(kind, name, total, total - children))
+
+    def report(self, limit:int=20, only_new:bool=True)->str:
+        '''以 self time 由大到小列出，only_new 為 True 時只列出上次報告後的紀錄。'''
+        records = self.records[self._reported:] if only_new else self.records
+        self._reported = len(self.records)
+        lines = [f'Startup profile : {1e3 * (time.perf_counter() - self.start):.1f} ms since enable, '
+                 f'{len(records)} records']
+        for kind in ('import', 'setup'):
+            rows = sorted((r for r in records if r.kind == kind), key=lambda r: r.self_time, reverse=True)
+            if not rows:
+                continue
+            total = sum(r.self_time for r in rows)
+            lines.append(f'{kind:<8}{"self ms":>10}{"total ms":>10}  name   (sum of self {1e3 * total:.1f} ms)')
+            for r in rows[:limit]:
+                lines.append(f'{"":<8}{1e3 * r.self_time:>10.2f}{1e3 * r.total:>10.2f}  {r.name}')
+        return '\n'.join(lines)
+
+
+_profiler:Optional[StartupProfiler] = None
+
+
+def enable()->StartupProfiler:
+    '''開始量測之後的 import 與 section。'''
+    global _profiler
+    if _profiler is None:
+        _profiler = StartupProfiler()
+        _profiler.install()
+    return _profiler
+
+
+def disable()->None:
+    global _profiler
+    if _profiler is not None:
+        _profiler.uninstall()
+        _profiler = None
+
+
+def active()->Optional[StartupProfiler]:
+    return _profiler
+
+
+def section(name:str, kind:str='setup')->contextlib.AbstractContextManager:
+    '''量測一個區段，未開啟量測時不做任何事。'''
+    if _profiler is None:
+        return contextlib.nullcontext()
+    return _profiler.section(name, kind)
@@ -0,0 +1,117 @@
+'''
+以 importlib.metadata 的 entry point 尋找第三方 plugin。
+
+plugin 套件在 pyproject.toml 宣告:
+    [project.entry-points."mvvm.plugins"]
+    Oscilloscope = "scope_plugin.view:createView"
+
+entry point 的名稱為 plugin 名稱，指向的物件為 factory(name, mediator) -> BaseView。
+掃描 entry point 的結果存成 manifest (JSON)，以已安裝套件的 dist-info 名稱 (含版本) 作為 key，
+套件沒有改變時啟動只讀取 manifest，plugin 的模組在第一次開啟頁面時才 import。
+'''
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sys
+from typing import Any, Callable, List, NamedTuple, Optional
+from View.Logger import log
+
+ENTRY_POINT_GROUP = 'mvvm.plugins'
+MANIFEST_VERSION = 1
+
+
+def defaultManifestPath()->str:
+    path = os.environ.get('MVVM_PLUGIN_MANIFEST')
+    if path:
+        return path
+    cache = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache, 'study-mvvm', 'plugins.json')
+
+
+class PluginSpec(NamedTuple):
+    name:str
+    value:str
+    dist:str = ''
+    version:str = ''
+
+    def load(self)->Callable[..., Any]:
+        '''import plugin 的模組並回傳 factory。'''
+        from importlib import metadata
+        return metadata.EntryPoint(self.name, self.value, ENTRY_POINT_GROUP).load()
+
+
+def installedFingerprint(group:str=ENTRY_POINT_GROUP)->str:
+    '''
+    以 sys.path 上 dist-info/egg-info 目錄的名稱 (包含套件名稱與版本) 計算指紋，
+    只列出目錄，不讀取任何 metadata 檔案。
+    '''
+    digest = hashlib.sha1(f'{MANIFEST_VERSION}|{group}|{sys.version}'.encode())
+    for path in sys.path:
+        try:
+            entries = sorted(e for e in os.listdir(path or '.') if e.endswith(('.dist-info', '.egg-info')))
+        except OSError:
+            continue
+        digest.update(f'\0{path}\0'.encode())
+        digest.update('\0'.join(entries).encode())
+    return digest.hexdigest()
+
+
+def scanEntryPoints(group:str=ENTRY_POINT_GROUP)->List[PluginSpec]:
+    # importlib.metadata 的 import 成本不低，只在需要掃描時載入
+    from importlib import metadata
+    specs = {}
+    for entry_point in metadata.entry_points(group=group):
+        dist = entry_point.dist
+        specs.setdefault(entry_point.name, PluginSpec(
+            name=entry_point.name, value=entry_point.value,
+            dist=dist.metadata['Name'] if dist is not None else '',
+            version=dist.version if dist is not None else ''))
+    return sorted(specs.values())
+
+
+def _readManifest(path:str, key:str)->Optional[List[PluginSpec]]:
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('key') != key:
+        return None
+    try:
+        return [PluginSpec(**plugin) for plugin in manifest['plugins']]
+    except (KeyError, TypeError):
+        return None
+
+
+def _writeManifest(path:str, key:str, specs:List[PluginSpec])->None:
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'key': key, 'plugins': [spec._asdict() for spec in specs]}, f, indent=2)
+        os.replace(tmp, path)
+    except OSError as e:
+        log.warning(f'Failed to write plugin manifest {path} : {e!r}')
+
+
+def discoverPlugins(manifest_path:Optional[str]=None, group:str=ENTRY_POINT_GROUP,
+                    refresh:bool=False)->List[PluginSpec]:
+    '''回傳已安裝的 plugin，套件沒有改變時直接使用 manifest，refresh 為 True 時強制重新掃描。'''
+    path = manifest_path or defaultManifestPath()
+    key = installedFingerprint(group)
+    specs = None if refresh else _readManifest(path, key)
+    if specs is None:
+        specs = scanEntryPoints(group)
+        _writeManifest(path, key, specs)
+        log.debug(f'Scanned {len(specs)} plugins from entry points')
+    return specs
+
+
+def registerPlugins(view, mediator, specs:List[PluginSpec])->None:
+    '''將 plugin 以 factory 註冊到 PlugInView，第一次選取頁面時才 import plugin 模組。'''
+    for spec in specs:
+        if spec.name in view.plugin_views:
+            log.warning(f'Plugin {spec.name} from {spec.dist} is already registered')
+            continue
+        view.addPluginFactory(spec.name, lambda spec=spec: spec.load()(spec.name, mediator))
@@ -0,0 +1,110 @@
+from __future__ import annotations
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+from PySide6 import QtCore, QtGui
+from ViewModel.ViewModel import PropertyChange
+
+_EMPTY = object()
+
+
+def displayRefreshRate(default:float=60.)->float:
+    '''主螢幕的更新率，無法取得時回傳 default。'''
+    app = QtGui.QGuiApplication.instance()
+    screen = app.primaryScreen() if isinstance(app, QtGui.QGuiApplication) else None
+    rate = screen.refreshRate() if screen is not None else 0.
+    return rate if rate > 0 else default
+
+
+class RenderScheduler(QtCore.QObject):
+    '''
+    渲染排程器
+    sentinel 的 signal 以 DirectConnection 在 emit 的執行緒只標記 dirty 並保存最新的狀態，
+    第一次標記時才排一個 flush 到 GUI 執行緒，flush 間隔不小於 1 / max_fps。
+    一個 frame 內的多次 sig_state 只渲染一次最新的 ViewModel;
+    sig_property 依屬性合併成一個 PropertyChange (第一次的 old、最後一次的 new)，
+    若同一個 frame 內已有 sig_state，整個 fragment 已包含屬性的改變，不再執行屬性 fragment。
+    必須在 GUI 執行緒建立。
+    '''
+    sig_schedule = QtCore.Signal()
+
+    def __init__(self, render_state:Callable[[Any], None], render_property:Callable[[PropertyChange], None],
+                 max_fps:Optional[float]=None):
+        super().__init__()
+        self._render_state = render_state
+        self._render_property = render_property
+        self.max_fps = max_fps if max_fps else displayRefreshRate()
+        self._lock = threading.Lock()
+        self._state:Any = _EMPTY
+        self._changes:Dict[str, PropertyChange] = {}
+        self._is_scheduled = False
+        self.is_active = False
+        self._last_render = 0.
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(QtCore.Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self.flush)
+        self.sig_schedule.connect(self._onSchedule, QtCore.Qt.ConnectionType.QueuedConnection)
+        self.emissions = 0
+        self.renders = 0
+
+    def markState(self, view_model:Any)->None:
+        with self._lock:
+            if not self.is_active:
+                return
+            self.emissions += 1
+            self._state = view_model
+            if self._is_scheduled:
+                return
+            self._is_scheduled = True
+        self.sig_schedule.emit()
+
+    def markProperty(self, change:PropertyChange)->None:
+        with self._lock:
+            if not self.is_active:
+                return
+            self.emissions += 1
+            pending = self._changes.get(change.name)
+            if pending is not None:
+                change = PropertyChange(change.name, pending.old, change.new)
+            self._changes[change.name] = change
+            if self._is_scheduled:
+                return
+            self._is_scheduled = True
+        self.sig_schedule.emit()
+
+    def _onSchedule(self)->None:
+        delay = self._last_render + 1 / self.max_fps - time.perf_counter()
+        if delay <= 0:
+            self.flush()
+        else:
+            self._timer.start(max(1, round(1000 * delay)))
+
+    def flush(self)->None:
+        with self._lock:
+            state, self._state = self._state, _EMPTY
+            changes, self._changes = self._changes, {}
+            self._is_scheduled = False
+            if not self.is_active:
+                return
+        self._last_render = time.perf_counter()
+        if state is not _EMPTY:
+            self.renders += 1
+            self._render_state(state)
+            return
+        for change in changes.values():
+            self.renders += 1
+            self._render_property(change)
+
+    def cancel(self)->None:
+        '''停止渲染並丟棄尚未渲染的狀態。'''
+        self._timer.stop()
+        with self._lock:
+            self.is_active = False
+            self._state = _EMPTY
+            self._changes = {}
+            self._is_scheduled = False
+
+    def stats(self)->Dict[str, Any]:
+        return {'max_fps': self.max_fps, 'emissions': self.emissions, 'renders': self.renders,
+                'coalesced': self.emissions - self.renders}
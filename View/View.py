@@ -2,16 +2,23 @@ from __future__ import annotations
 
 from functools import wraps
 import abc
+import time
 from dataclasses import dataclass
 from View.Logger import log
 from PySide6 import QtCore, QtGui, QtWidgets
-from ViewModel.ViewModel import ViewModel
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+from ViewModel.ViewModel import ViewModel, PropertyChange
+import Profiler
+from View.RenderScheduler import RenderScheduler
 
 
 @dataclass
 class PlugInViewInfo:
     name: str
-    view:BaseView
+    view:Optional[BaseView] = None
+    factory:Optional[Callable[[], BaseView]] = None
+    last_active:float = 0.
+    is_loaded:bool = False
 
 
 class IView():
@@ -26,61 +33,410 @@ class IView():
         ...
 
 
+_UNSET = object()
+
+
+class Binding(NamedTuple):
+    prop:str
+    widget:str
+    setter:str
+    formatter:Optional[Callable[[Any], Any]] = None
+
+
+def bind(prop:str, target:str, formatter:Optional[Callable[[Any], Any]]=None)->Binding:
+    '''
+    宣告 ViewModel 屬性與 widget 的單向綁定，target 為 "widget.property" (或直接寫 setter 名稱)，
+    例如 bind('current_number', 'lb_number.text', lambda n: f'Current Number : {n}')
+    會在 current_number 改變時呼叫 self.lb_number.setText(formatter(new))。
+    '''
+    widget, _, attr = target.partition('.')
+    if not widget or not attr:
+        raise Exception(f'Binding target must be "widget.property", got "{target}".')
+    if not (attr.startswith('set') and attr[3:4].isupper()):
+        attr = f'set{attr[0].upper()}{attr[1:]}'
+    return Binding(prop, widget, attr, formatter)
+
+
+def _compileBinder(setter:Callable[[Any], Any], formatter:Optional[Callable[[Any], Any]],
+                   diff:WidgetDiff)->Callable[[Any], None]:
+    '''將一個綁定編譯成直接呼叫 widget setter 的 closure，值與上次相同時跳過 Qt 的呼叫。'''
+    last = [_UNSET]
+
+    def update(value:Any)->None:
+        if formatter is not None:
+            value = formatter(value)
+        previous = last[0]
+        if previous is not _UNSET:
+            try:
+                is_same = previous is value or bool(previous == value)
+            except Exception:
+                is_same = False
+            if is_same:
+                diff.skipped += 1
+                return
+        last[0] = value
+        diff.applied += 1
+        setter(value)
+    return update
+
+
 class BaseView(IView):
     '''
     View 類別
     只負責UI的規格、布局以及樣式。
+    類別屬性 bindings 以 bind() 宣告屬性與 widget 的綁定，run() 時編譯成每個屬性的 closure，
+    屬性改變時直接更新 widget，不需要執行 fragment，stop() 時解除。
     '''
+    bindings:Tuple[Binding, ...] = ()
+    _binders:Dict[str, Tuple[Callable[[Any], None], ...]] = {}
+    _max_fps:Optional[float] = 0.
+    _render_scheduler:Optional[RenderScheduler] = None
+
     def __init__(self, name:str, view_model:ViewModel):
         super().__init__()
         self.name = name
         self.view_model:ViewModel = view_model
+        self.is_connected = False
 
     @abc.abstractmethod
     def getModelState(self, view_model:ViewModel)->None:...
 
+    def setMaxFps(self, max_fps:Optional[float]=None)->None:
+        '''
+        開啟渲染批次處理 : 每個 frame 最多執行一次 fragment，使用最新的狀態。
+        max_fps 為 None 時使用螢幕更新率，0 關閉批次處理 (每次 emit 都執行 fragment)。
+        '''
+        if self.is_connected:
+            raise Exception(f'Disable to set max fps when view is running.')
+        self._max_fps = max_fps
+        self._render_scheduler = None
+
+    def diff(self, widget:QtWidgets.QWidget)->_DiffWidget:
+        '''
+        回傳 widget 的包裝，呼叫 setXxx 時若參數與 widget 目前的值相同則跳過 Qt 的呼叫，
+        例如 self.diff(self.pb_connect).setText('Connect')。
+        '''
+        return _DiffWidget(widget, widgetDiff(self))
+
+    def widgetStats(self)->Dict[str, int]:
+        '''self.diff() 與 bindings 的統計 : 實際呼叫與跳過的 widget setXxx 次數。'''
+        return widgetDiff(self).stats()
+
+    def renderStats(self)->Dict[str, Any]:
+        '''批次渲染的統計 : emit 次數、實際渲染次數與被合併的次數。'''
+        if self._render_scheduler is None:
+            return {}
+        return self._render_scheduler.stats()
+
     def run(self):
         self._connectSentinel()
 
+    def _compileBindings(self)->Dict[str, Tuple[Callable[[Any], None], ...]]:
+        '''解析 bindings 的 widget 與 setter (只在 run() 時執行一次)，依屬性名稱分組。'''
+        diff = widgetDiff(self)
+        groups:Dict[str, List[Callable[[Any], None]]] = {}
+        for binding in self.bindings:
+            setter = getattr(getattr(self, binding.widget, None), binding.setter, None)
+            if not callable(setter):
+                raise Exception(f'Disable to bind "{binding.prop}" to {binding.widget}.{binding.setter}.')
+            groups.setdefault(binding.prop, []).append(_compileBinder(setter, binding.formatter, diff))
+        return {prop: tuple(binders) for prop, binders in groups.items()}
+
+    def _applyBindings(self, view_model:ViewModel)->None:
+        for prop, binders in self._binders.items():
+            value = getattr(view_model, prop)
+            for binder in binders:
+                binder(value)
+
+    def _renderState(self, view_model:ViewModel)->None:
+        '''有綁定時 sig_state 的 slot : 先更新綁定的 widget，再執行 getModelState。'''
+        self._applyBindings(view_model)
+        self.getModelState(view_model)
+
+    def _stateSlot(self)->Callable[[ViewModel], None]:
+        return self._renderState if self._binders else self.getModelState
+
     def _connectSentinel(self):
-        self.view_model.sentinel.sig_state.connect(self.getModelState)
+        sentinel = self.view_model.sentinel
+        self._binders = self._compileBindings()
+        self._applyBindings(self.view_model)
+        if self._max_fps == 0:
+            sentinel.sig_state.connect(self._stateSlot())
+            sentinel.sig_property.connect(self.getPropertyChange)
+        else:
+            if self._render_scheduler is None:
+                self._render_scheduler = RenderScheduler(self._stateSlot(), self.getPropertyChange, self._max_fps)
+            scheduler = self._render_scheduler
+            scheduler.is_active = True
+            sentinel.sig_state.connect(scheduler.markState, QtCore.Qt.ConnectionType.DirectConnection)
+            sentinel.sig_property.connect(scheduler.markProperty, QtCore.Qt.ConnectionType.DirectConnection)
+        self.is_connected = True
 
     def stop(self):
         self._disconnectSentinel()
 
     def _disconnectSentinel(self):
-        self.view_model.sentinel.sig_state.disconnect(self.getModelState)
+        sentinel = self.view_model.sentinel
+        scheduler = self._render_scheduler
+        if scheduler is not None and scheduler.is_active:
+            sentinel.sig_state.disconnect(scheduler.markState)
+            sentinel.sig_property.disconnect(scheduler.markProperty)
+            scheduler.cancel()
+        else:
+            sentinel.sig_state.disconnect(self._stateSlot())
+            sentinel.sig_property.disconnect(self.getPropertyChange)
+        self._binders = {}
+        self.is_connected = False
+
+    @classmethod
+    def _propertyFragments(cls)->Dict[str, Tuple[str, ...]]:
+        '''以 isFragment(observe=...) 宣告的 fragment，依屬性名稱分組 (每個類別只收集一次)。'''
+        fragments = cls.__dict__.get('_property_fragments')
+        if fragments is None:
+            groups:Dict[str, List[str]] = {}
+            for attr in dir(cls):
+                for name in getattr(getattr(cls, attr, None), 'observe', ()):
+                    groups.setdefault(name, []).append(attr)
+            fragments = {name: tuple(attrs) for name, attrs in groups.items()}
+            setattr(cls, '_property_fragments', fragments)
+        return fragments
+
+    def getPropertyChange(self, change:PropertyChange)->None:
+        '''
+        只更新綁定該屬性的 widget 並執行訂閱該屬性的 fragment，
+        沒有任何綁定或 fragment 的屬性則執行整個 getModelState，與 sig_state 相同。
+        '''
+        binders = self._binders.get(change.name)
+        attrs = self._propertyFragments().get(change.name)
+        if binders is None and attrs is None:
+            self.getModelState(self.view_model)
+            return
+        if binders is not None:
+            for binder in binders:
+                binder(change.new)
+        if attrs is not None:
+            for attr in attrs:
+                getattr(self, attr)(change)
 
 class PlugInView(BaseView):
     '''
     View 類別
     只負責UI的規格、布局以及樣式。
+    plugin 可以直接加入 (addPluginView)，或只註冊 factory (addPluginFactory)，第一次被選取時才建立 View 與 UI。
+    只有目前選取的 plugin 會連接 sentinel，其他 plugin 的 fragment 不會執行 (connect_inactive 為 True 時全部連接)，
+    重新選取時會呼叫 view model 的 render 同步狀態。
+    由 factory 建立的 plugin 閒置超過 setIdleUnload 設定的時間後會卸載 UI (widget tree)，
+    View 與 view model 保留，下次選取時重新 setupUI，綁定會依 view model 目前的狀態同步。
     '''
+    connect_inactive:bool = False
+
     def __init__(self, name:str, view_model:ViewModel):
         super().__init__(name=name, view_model=view_model)
         self.plugin_views:dict[str, PlugInViewInfo] = {}
+        self.active_plugin:Optional[str] = None
+        self._idle_timer:Optional[QtCore.QTimer] = None
+        self._idle_unload = 0.
 
     def run(self):
         self._connectSentinel()
-        for name, plug_in_view in self.plugin_views.items():
-            plug_in_view.view.run()
+        for name in self._connectedPlugins():
+            self.plugin_views[name].view.run()
 
     def stop(self):
         self._disconnectSentinel()
-        for name, plug_in_view in self.plugin_views.items():
-            plug_in_view.view.stop()
+        for info in self.plugin_views.values():
+            if info.view is not None and info.view.is_connected:
+                info.view.stop()
+
+    def _connectedPlugins(self)->List[str]:
+        if self.connect_inactive:
+            return [name for name, info in self.plugin_views.items() if info.is_loaded]
+        return [] if self.active_plugin is None else [self.active_plugin]
 
     def addPluginView(self, view: BaseView)->None:
         self.plugin_views.update({view.name:PlugInViewInfo(name=view.name, view=view)})
         self.view_model.addPlugin(name=view.view_model.name, plugin=view.view_model)
-        self._addPluginToLayout(view)
+        self._loadView(view)
+
+    def addPluginFactory(self, name:str, factory:Callable[[], BaseView])->None:
+        '''註冊 plugin 的 factory，第一次選取時才建立 View (factory 回傳的 View 名稱需與 name 相同)。'''
+        self.plugin_views.update({name:PlugInViewInfo(name=name, factory=factory)})
+
+    def loadPlugin(self, name:str)->BaseView:
+        info = self.plugin_views[name]
+        if info.view is None:
+            log.debug(f'Load plugin {name}')
+            with Profiler.section(f'{name} factory'):
+                info.view = info.factory()
+            self.view_model.addPlugin(name=info.view.view_model.name, plugin=info.view.view_model)
+        if not info.is_loaded:
+            self._loadView(info.view)
+        return info.view
+
+    def _loadView(self, view:BaseView)->None:
+        with Profiler.section(f'{view.name} setupUI'):
+            self._addPluginToLayout(view)
+        self.plugin_views[view.name].is_loaded = True
+        if self.is_connected and self.connect_inactive:
+            view.run()
+
+    def activatePlugin(self, name:str)->BaseView:
+        '''選取 plugin : 需要時建立 View，連接它的 sentinel 並斷開前一個選取的 plugin。'''
+        view = self.loadPlugin(name)
+        previous = self.active_plugin
+        if previous == name:
+            return view
+        now = time.monotonic()
+        if previous is not None:
+            info = self.plugin_views[previous]
+            info.last_active = now
+            if not self.connect_inactive and info.view is not None and info.view.is_connected:
+                info.view.stop()
+        self.active_plugin = name
+        self.plugin_views[name].last_active = now
+        if self.is_connected and not view.is_connected:
+            view.run()
+            view.view_model.render()
+        return view
+
+    def unloadPlugin(self, name:str)->bool:
+        '''
+        卸載由 factory 建立且未被選取的 plugin 的 UI，回傳是否有卸載。
+        View 與 view model 保留 (狀態不會遺失)，下次 loadPlugin 時重新 setupUI。
+        '''
+        info = self.plugin_views[name]
+        if info.factory is None or not info.is_loaded or name == self.active_plugin:
+            return False
+        log.debug(f'Unload plugin {name}')
+        view = info.view
+        self._removePluginFromLayout(view)
+        if view.is_connected:
+            view.stop()
+        info.is_loaded = False
+        return True
+
+    def unloadIdlePlugins(self, idle:float)->List[str]:
+        now = time.monotonic()
+        names = [name for name, info in self.plugin_views.items()
+                 if info.is_loaded and now - info.last_active >= idle]
+        return [name for name in names if self.unloadPlugin(name)]
+
+    def setIdleUnload(self, idle:Optional[float])->None:
+        '''閒置超過 idle 秒的 plugin 自動卸載，None 或 0 關閉。需在 GUI 執行緒呼叫。'''
+        self._idle_unload = idle or 0.
+        if not self._idle_unload:
+            if self._idle_timer is not None:
+                self._idle_timer.stop()
+            return
+        if self._idle_timer is None:
+            self._idle_timer = QtCore.QTimer()
+            self._idle_timer.timeout.connect(lambda: self.unloadIdlePlugins(self._idle_unload))
+        self._idle_timer.start(max(1000, int(500 * self._idle_unload)))
 
     @abc.abstractmethod
     def _addPluginToLayout(self, view: BaseView)->None:...
 
+    def _removePluginFromLayout(self, view: BaseView)->None:
+        '''
+        卸載 plugin 的 UI : 預設將 setupUI 收到的 widget (view.wg) 從 parent 的 layout 移除並刪除，
+        plugin 的 widget 不是以 view.wg 保存時需覆寫。
+        '''
+        widget = getattr(view, 'wg', None)
+        if not isinstance(widget, QtWidgets.QWidget):
+            raise Exception(f'Disable to unload plugin {view.name} without view.wg, override _removePluginFromLayout.')
+        parent = widget.parentWidget()
+        layout = parent.layout() if parent is not None else None
+        if layout is not None:
+            layout.removeWidget(widget)
+        widget.hide()
+        widget.deleteLater()
+
+
+class WidgetDiff:
+    '''
+    以 widget 目前的值比對 setXxx 的參數 (setText 比對 text()、setEnabled 比對 widget 本身的 enabled 屬性...)，
+    相同時跳過 Qt 的呼叫。比對的是 widget 當下的值，使用者修改過的 widget 也會被設回 model 的狀態;
+    沒有對應 getter 的 setter 每次都會呼叫。不保存 widget 的參考，只累計 applied 與 skipped 的次數。
+    '''
+    __slots__ = ('applied', 'skipped')
+
+    def __init__(self):
+        self.applied = 0
+        self.skipped = 0
+
+    @staticmethod
+    def current(widget:QtWidgets.QWidget, setter:str)->Any:
+        '''回傳 setter 對應的目前值，沒有對應的 getter 時回傳 _UNSET。'''
+        getter = _DIFF_GETTERS.get(setter)
+        if getter is not None:
+            return getter(widget)
+        prop = f'{setter[3].lower()}{setter[4:]}'
+        for name in (prop, f'is{setter[3:]}'):
+            attr = getattr(widget, name, None)
+            if callable(attr):
+                try:
+                    return attr()
+                except TypeError:
+                    return _UNSET
+        return _UNSET
+
+    def call(self, widget:QtWidgets.QWidget, setter:str, args:tuple)->Any:
+        if len(args) == 1:
+            current = self.current(widget, setter)
+            if current is not _UNSET:
+                try:
+                    is_same = bool(current == args[0])
+                except Exception:
+                    is_same = False
+                if is_same:
+                    self.skipped += 1
+                    return None
+        self.applied += 1
+        return getattr(widget, setter)(*args)
 
-def isFragment(name=None):
-    '''定義一個的fragment物件，用於訂閱 Sentinel 類別的通知.'''
+    def stats(self)->Dict[str, int]:
+        return {'applied': self.applied, 'skipped': self.skipped}
+
+
+# enabled/visible 需比對 widget 本身的設定，isEnabled()/isVisible() 會受 parent 影響
+_DIFF_GETTERS:Dict[str, Callable[[QtWidgets.QWidget], Any]] = {
+    'setEnabled': lambda widget: not widget.testAttribute(QtCore.Qt.WidgetAttribute.WA_ForceDisabled),
+    'setDisabled': lambda widget: widget.testAttribute(QtCore.Qt.WidgetAttribute.WA_ForceDisabled),
+    'setVisible': lambda widget: not widget.isHidden(),
+    'setHidden': lambda widget: widget.isHidden(),
+}
+
+
+class _DiffWidget:
+    '''BaseView.diff() 回傳的包裝 : setXxx 經過 WidgetDiff 比對，其他屬性直接取自 widget。'''
+    __slots__ = ('_widget', '_diff')
+
+    def __init__(self, widget:QtWidgets.QWidget, diff:WidgetDiff):
+        self._widget = widget
+        self._diff = diff
+
+    def __getattr__(self, name:str)->Any:
+        if name.startswith('set') and name[3:4].isupper():
+            widget, diff = self._widget, self._diff
+            return lambda *args: diff.call(widget, name, args)
+        return getattr(self._widget, name)
+
+
+def widgetDiff(view:BaseView)->WidgetDiff:
+    diff = view.__dict__.get('_widget_diff')
+    if diff is None:
+        diff = view.__dict__['_widget_diff'] = WidgetDiff()
+    return diff
+
+
+def isFragment(name=None, observe:Optional[Union[str, Iterable[str]]]=None):
+    '''
+    定義一個的fragment物件，用於訂閱 Sentinel 類別的通知.
+    observe 為 ViewModel 的 ObservableProperty 名稱，指定後 fragment 只在這些屬性改變時執行，參數為 PropertyChange。
+    fragment 中以 self.diff(widget).setXxx(...) 呼叫時，與 widget 目前的值相同則不呼叫 Qt (見 WidgetDiff)。
+    '''
+    if isinstance(observe, str):
+        observe = (observe,)
     def decorator(func):
         @wraps(func)
         def wrap(self, arg):
@@ -91,6 +447,7 @@ def isFragment(name=None):
             #     return
             func(self, arg)
             return func
+        wrap.observe = tuple(observe or ())
         return wrap
     return decorator
 
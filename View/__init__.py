@@ -1 +1,3 @@
-from View.View import BaseView, isFragment, isActivity, PlugInView, PlugInViewInfo
\ No newline at end of file
+from View.View import BaseView, isFragment, isActivity, PlugInView, PlugInViewInfo, WidgetDiff, Binding, bind
+from View.RenderScheduler import RenderScheduler
+from View.PluginDiscovery import PluginSpec, discoverPlugins, registerPlugins
\ No newline at end of file
@@ -0,0 +1,217 @@
+from __future__ import annotations
+import array
+import threading
+from collections import namedtuple
+from typing import Any, Dict, Optional, Tuple, Union
+
+_np:Any = None
+
+
+def _numpy()->Any:
+    '''第一次建立 ColumnRepository 時才 import NumPy (import ViewModel 不需要載入 NumPy)，未安裝時回傳 None。'''
+    global _np
+    if _np is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _np = numpy
+    return _np or None
+
+
+def _fieldProperty(index:int, name:str)->property:
+    def fget(self:Repository)->Any:
+        return self._current[1][index]
+
+    def fset(self:Repository, value:Any)->None:
+        self._set(index, value)
+
+    return property(fget, fset, doc=f'Repository field "{name}".')
+
+
+class _RepositoryMeta(type):
+    '''
+    將類別層級有型別標註的欄位 (例如 `is_connect: bool = False`) 轉成讀寫 snapshot tuple 的 property，
+    並為每個子類別建立對應的 Snapshot (namedtuple) 類別與空的 __slots__。
+    '''
+    def __new__(mcs, name:str, bases:Tuple[type, ...], namespace:Dict[str, Any]):
+        fields:Dict[str, Any] = {}
+        for base in reversed(bases):
+            fields.update(getattr(base, '_fields', {}))
+        for field in namespace.get('__annotations__', {}):
+            if not field.startswith('_'):
+                fields[field] = namespace.pop(field, None)
+        namespace.setdefault('__slots__', ())
+        namespace['_fields'] = fields
+        namespace['Snapshot'] = namedtuple(f'{name}Snapshot', tuple(fields))
+        for index, field in enumerate(fields):
+            namespace[field] = _fieldProperty(index, field)
+        return super().__new__(mcs, name, bases, namespace)
+
+
+class Repository(metaclass=_RepositoryMeta):
+    '''
+    資料倉庫類別
+    負責在 View model 內部狀態或希望記錄的資料過多時，將狀態或資料結構存進此類別。
+    欄位以類別層級的型別標註宣告，所有欄位的值存在一個不可變的 Snapshot (namedtuple) 中，
+    每次寫入建立新的 Snapshot 並遞增版本，未改變的欄位直接共用同一個物件。
+    snapshot() 只回傳目前的 Snapshot，不需要複製也不需要 lock，
+    View 可以在背景執行緒持續寫入時從一致的狀態渲染。欄位的值應為不可變的物件 (tuple、frozenset 等)。
+
+    class UIState(Repository):
+        is_connect: bool = False
+    '''
+    __slots__ = ('_current', '_write_lock')
+
+    def __init__(self, **values):
+        self._current:Tuple[int, tuple] = (0, self.Snapshot(**{**self._fields, **values}))
+        self._write_lock = threading.Lock()
+
+    @property
+    def version(self)->int:
+        return self._current[0]
+
+    def snapshot(self)->tuple:
+        '''目前狀態的不可變 Snapshot。'''
+        return self._current[1]
+
+    def read(self)->Tuple[int, tuple]:
+        '''同時取得版本與 Snapshot，兩者保證一致。'''
+        return self._current
+
+    def _set(self, index:int, value:Any)->None:
+        with self._write_lock:
+            version, state = self._current
+            if state[index] is value:
+                return
+            values = list(state)
+            values[index] = value
+            self._current = (version + 1, tuple.__new__(type(state), values))
+
+    def update(self, **changes)->None:
+        '''一次寫入多個欄位，只產生一個新版本。'''
+        with self._write_lock:
+            version, state = self._current
+            self._current = (version + 1, state._replace(**changes))
+
+    def __repr__(self):
+        version, state = self._current
+        return f'{self.__class__.__name__}(version={version}, {state!r})'
+
+
+ColumnSpec = Union[str, Tuple[str, int]]
+
+
+class ColumnRepository(Repository):
+    '''
+    欄位式 (columnar) 的歷史資料倉庫
+    每個 column 在建立時一次配置 capacity 筆的型別化陣列，之後 append 不再配置記憶體，
+    超過 capacity 時覆蓋最舊的資料，記憶體用量固定且可由 stats() 取得。
+    安裝 NumPy 時 column 為 ndarray，可用 (dtype, width) 指定每筆為固定長度的向量 (如多通道的值)，
+    否則為 array.array (dtype 需為 array 的型別字元，如 'd'、'f'、'i')，window 回傳 memoryview。
+    每筆資料同時寫入兩個位置 (鏡像)，任何長度不超過 capacity 的視窗都是連續的記憶體，
+    window 不需要複製，O(1) 取得。window 是 live view，之後的 append 可能覆寫內容，需要保留時請複製。
+    適合單一 writer (如 FRM 的 updater)，可搭配 Repository 的欄位存放純量狀態。
+
+    history = ColumnRepository(10000, {'timestamp': 'd', 'value': ('f', 8)})
+    '''
+    __slots__ = ('capacity', '_columns', '_head', '_np')
+
+    def __init__(self, capacity:int, columns:Dict[str, ColumnSpec], **values):
+        super().__init__(**values)
+        if capacity <= 0:
+            raise Exception(f'ColumnRepository capacity must be positive, got {capacity}.')
+        if not columns:
+            raise Exception(f'ColumnRepository needs at least one column.')
+        self.capacity = capacity
+        self._np = _numpy()
+        self._columns = {name: self._createColumn(name, spec) for name, spec in columns.items()}
+        self._head = 0
+
+    def _createColumn(self, name:str, spec:ColumnSpec):
+        dtype, width = (spec, None) if isinstance(spec, str) else spec
+        np = self._np
+        if np is not None:
+            shape = (2 * self.capacity,) if width is None else (2 * self.capacity, width)
+            return np.zeros(shape, dtype=dtype)
+        if width is not None:
+            raise Exception(f'Column "{name}" with width needs NumPy.')
+        column = array.array(dtype)
+        column.frombytes(bytes(column.itemsize * 2 * self.capacity))
+        return column
+
+    def __len__(self):
+        return min(self._head, self.capacity)
+
+    @property
+    def total(self)->int:
+        '''從建立 (或 clear) 後 append 的總筆數。'''
+        return self._head
+
+    @property
+    def columns(self)->Tuple[str, ...]:
+        return tuple(self._columns)
+
+    def append(self, **values)->None:
+        '''寫入一筆資料，需提供所有 column 的值。'''
+        index = self._head % self.capacity
+        mirror = index + self.capacity
+        for name, column in self._columns.items():
+            value = values[name]
+            column[index] = value
+            column[mirror] = value
+        self._head += 1
+
+    def extend(self, **values)->None:
+        '''一次寫入多筆資料 (每個 column 為等長的序列)，安裝 NumPy 時以切片寫入。'''
+        count = len(values[next(iter(self._columns))])
+        if count == 0:
+            return
+        np = self._np
+        if np is None:
+            for i in range(count):
+                self.append(**{name: values[name][i] for name in self._columns})
+            return
+        kept = min(count, self.capacity)
+        start = (self._head + count - kept) % self.capacity
+        first = min(kept, self.capacity - start)
+        rest = kept - first
+        for name, column in self._columns.items():
+            data = np.asarray(values[name])[count - kept:]
+            column[start:start + first] = data[:first]
+            column[start + self.capacity:start + self.capacity + first] = data[:first]
+            column[:rest] = data[first:]
+            column[self.capacity:self.capacity + rest] = data[first:]
+        self._head += count
+
+    def window(self, name:str, n:Optional[int]=None):
+        '''最近 n 筆 (預設為全部保存的資料) 依時間順序的 view。'''
+        length = len(self)
+        n = length if n is None else min(n, length)
+        end = self._head % self.capacity + self.capacity
+        column = self._columns[name]
+        if self._np is None:
+            return memoryview(column)[end - n:end]
+        return column[end - n:end]
+
+    def latest(self, name:str)->Any:
+        if self._head == 0:
+            raise IndexError(f'ColumnRepository is empty.')
+        return self._columns[name][(self._head - 1) % self.capacity]
+
+    def clear(self)->None:
+        self._head = 0
+
+    @property
+    def nbytes(self)->int:
+        return sum(self._columnBytes(column) for column in self._columns.values())
+
+    def _columnBytes(self, column)->int:
+        if self._np is not None:
+            return column.nbytes
+        return column.itemsize * len(column)
+
+    def stats(self)->Dict[str, Any]:
+        return {'capacity': self.capacity, 'length': len(self), 'total': self._head,
+                'nbytes': self.nbytes,
+                'columns': {name: self._columnBytes(column) for name, column in self._columns.items()}}
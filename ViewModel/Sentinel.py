@@ -0,0 +1,68 @@
+'''
+ModelSentinel 需要 Qt 的 signal，類別在第一次使用時才建立，
+import ViewModel 與 mediator 時不會載入 PySide6 (例如單元測試或只使用 FRM 的服務)。
+'''
+from __future__ import annotations
+import threading
+from typing import Dict, Tuple
+
+_lock = threading.RLock()
+_classes:Dict[Tuple[Tuple[str, type], ...], type] = {}
+
+
+def _createModelSentinel()->type:
+    from PySide6 import QtCore
+    from ViewModel.ViewModel import Task
+
+    class ModelSentinel(QtCore.QObject):
+        '''
+        哨兵類別
+        負責廣播當 ViewModel 狀態或屬性改變時，負責通知 View 類別執行 fragment。
+        sig_state 廣播整個 ViewModel，sig_property 只廣播單一屬性的改變 (PropertyChange)。
+        '''
+        sig_task = QtCore.Signal(Task)
+        sig_notify = QtCore.Signal(object)
+        sig_message = QtCore.Signal(str)
+        sig_error = QtCore.Signal(str)
+        sig_state = QtCore.Signal(object)
+        sig_property = QtCore.Signal(object)
+
+    ModelSentinel.__module__ = 'ViewModel.ViewModel'
+    ModelSentinel.__qualname__ = 'ModelSentinel'
+    return ModelSentinel
+
+
+def sentinelClass(signals:Dict[str, type]=None, name:str='ModelSentinel')->type:
+    '''
+    回傳 ModelSentinel，或加上額外 signal 的子類別 (例如 {'sig_setPlugin': object})。
+    相同的 signal 組合只建立一次類別。
+    '''
+    key = tuple(sorted((signals or {}).items()))
+    cls = _classes.get(key)
+    if cls is not None:
+        return cls
+    with _lock:
+        cls = _classes.get(key)
+        if cls is None:
+            if not key:
+                cls = _createModelSentinel()
+            else:
+                from PySide6 import QtCore
+                base = sentinelClass()
+                cls = type(name, (base,), {attr: QtCore.Signal(arg) for attr, arg in key})
+            _classes[key] = cls
+    return cls
+
+
+def createSentinel(cls:type):
+    '''
+    建立 sentinel 實例。在 GUI 以外的執行緒 (例如 FRM 的 updater) 第一次使用時，
+    建立後移到 QApplication 的執行緒，queued connection 與 deleteLater 才不會綁在會結束的執行緒上。
+    尚未建立 QApplication 時維持在建立的執行緒。
+    '''
+    from PySide6 import QtCore
+    sentinel = cls()
+    app = QtCore.QCoreApplication.instance()
+    if app is not None and sentinel.thread() is not app.thread():
+        sentinel.moveToThread(app.thread())
+    return sentinel
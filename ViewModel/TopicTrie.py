@@ -0,0 +1,84 @@
+from __future__ import annotations
+import re
+from typing import Dict, List, Set, Tuple
+
+_SEPARATOR = re.compile(r'[./]')
+WILDCARD = '*'
+DEEP_WILDCARD = '**'
+
+def splitTopic(topic:str)->Tuple[str, ...]:
+    '''以 "." 或 "/" 將 topic 切成階層，例如 "plugin.Counter/changed" -> ("plugin", "Counter", "changed")。'''
+    return tuple(_SEPARATOR.split(topic))
+
+def isPattern(topic:str)->bool:
+    '''topic 中含有 "*" (一層) 或 "**" (零或多層) 的階層時為訂閱用的 pattern。'''
+    return any(segment in (WILDCARD, DEEP_WILDCARD) for segment in splitTopic(topic))
+
+
+class _Node:
+    __slots__ = ('children', 'patterns')
+
+    def __init__(self):
+        self.children:Dict[str, _Node] = {}
+        self.patterns:Set[str] = set()
+
+
+class TopicTrie:
+    '''
+    pattern 的前綴樹
+    以階層建立節點，match 只走訪與 topic 相符的分支，不需要逐一比對所有 pattern。
+    match 的結果依 pattern 的加入順序排列。
+    '''
+    def __init__(self):
+        self._root = _Node()
+        self._order:Dict[str, int] = {}
+        self._count = 0
+
+    def __len__(self):
+        return len(self._order)
+
+    def __contains__(self, pattern:str):
+        return pattern in self._order
+
+    def add(self, pattern:str)->None:
+        if pattern in self._order:
+            return
+        node = self._root
+        for segment in splitTopic(pattern):
+            node = node.children.setdefault(segment, _Node())
+        node.patterns.add(pattern)
+        self._order[pattern] = self._count
+        self._count += 1
+
+    def remove(self, pattern:str)->None:
+        if self._order.pop(pattern, None) is None:
+            return
+        path = [self._root]
+        segments = splitTopic(pattern)
+        for segment in segments:
+            path.append(path[-1].children[segment])
+        path[-1].patterns.discard(pattern)
+        # 由葉節點往回移除已經沒有用途的節點
+        for depth in range(len(segments), 0, -1):
+            node = path[depth]
+            if node.children or node.patterns:
+                break
+            del path[depth - 1].children[segments[depth - 1]]
+
+    def match(self, topic:str)->List[str]:
+        segments = splitTopic(topic)
+        found:Set[str] = set()
+        stack = [(self._root, 0)]
+        while stack:
+            node, i = stack.pop()
+            deep = node.children.get(DEEP_WILDCARD)
+            if deep is not None:
+                stack.extend((deep, j) for j in range(i, len(segments) + 1))
+            if i == len(segments):
+                found.update(node.patterns)
+                continue
+            for key in (segments[i], WILDCARD):
+                child = node.children.get(key)
+                if child is not None:
+                    stack.append((child, i + 1))
+        return sorted(found, key=self._order.__getitem__)
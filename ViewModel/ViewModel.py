@@ -1,13 +1,28 @@
 from __future__ import annotations
 import abc
+import contextlib
+import itertools
+import threading
 import typing
-from typing import List, Dict, Any, Callable, Optional
+from typing import List, Dict, Any, Callable, NamedTuple, Optional
 from attrs import define
-from PySide6 import QtWidgets, QtCore
 from functools import wraps
 from ViewModel.Logger import log
 
 from ViewModel.ViewModelMediator import ViewModelEventMediator
+from ViewModel.Repository import Repository
+from ViewModel.Sentinel import sentinelClass, createSentinel
+
+if typing.TYPE_CHECKING:
+    from PySide6 import QtCore
+
+    class ModelSentinel(QtCore.QObject):...
+
+def __getattr__(name:str)->Any:
+    # ModelSentinel 在第一次取用時才載入 Qt 並建立
+    if name == 'ModelSentinel':
+        return sentinelClass()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 @define
 class Task():
@@ -29,35 +44,215 @@ def isHandler():
     return decorator
 
 
-class ModelSentinel(QtCore.QObject):
+class PropertyChange(NamedTuple):
+    '''ObservableProperty 改變時由 sig_property 廣播的內容。'''
+    name:str
+    old:Any
+    new:Any
+
+
+def _isSame(old:Any, new:Any)->bool:
+    if old is new:
+        return True
+    try:
+        return bool(old == new)
+    except Exception:
+        return False
+
+class ObservableProperty:
     '''
-    哨兵類別
-    負責廣播當 ViewModel 狀態或屬性改變時，負責通知 View 類別執行 fragment。
+    可觀察的屬性
+    值改變時經由 sentinel.sig_property 發出 PropertyChange(name, old, new)，值相同時不通知。
+    convert 可在存入前轉換設定的值，例如限制範圍。
     '''
-    sig_task = QtCore.Signal(Task)
-    sig_notify = QtCore.Signal(object)
-    sig_message = QtCore.Signal(str)
-    sig_error = QtCore.Signal(str)
-    sig_state = QtCore.Signal(object)
+    def __init__(self, default:Any=None, convert:Optional[Callable[[Any], Any]]=None):
+        self.default = default
+        self.convert = convert
+        self.name = ''
+        self._attr = ''
+
+    def __set_name__(self, owner:type, name:str):
+        self.name = name
+        self._attr = f'_{name}'
+
+    def __get__(self, obj:Any, owner:type=None)->Any:
+        if obj is None:
+            return self
+        return obj.__dict__.get(self._attr, self.default)
+
+    def __set__(self, obj:Any, value:Any)->None:
+        if self.convert is not None:
+            value = self.convert(value)
+        old = obj.__dict__.get(self._attr, self.default)
+        obj.__dict__[self._attr] = value
+        if _isSame(old, value):
+            return
+        obj.sentinel.sig_property.emit(PropertyChange(self.name, old, value))
+
+class _SignalRecorder:
+    '''批次更新期間取代 sentinel 的 signal，emit 只記錄下來，其他操作 (connect 等) 交給原本的 signal。'''
+    __slots__ = ('_batch', '_name')
 
-class Repository:
+    def __init__(self, batch:ChangeBatch, name:str):
+        self._batch = batch
+        self._name = name
+
+    def emit(self, *args)->None:
+        self._batch.record(self._name, args)
+
+    def __getattr__(self, attr:str)->Any:
+        return getattr(getattr(self._batch.sentinel, self._name), attr)
+
+class _BatchSentinel:
+    def __init__(self, batch:ChangeBatch):
+        self._batch = batch
+
+    def __getattr__(self, name:str)->Any:
+        if name.startswith('sig_'):
+            return _SignalRecorder(self._batch, name)
+        return getattr(self._batch.sentinel, name)
+
+class _BatchMediator:
+    def __init__(self, batch:ChangeBatch):
+        self._batch = batch
+
+    def trigger(self, event_name:str, *args, **kwargs)->None:
+        self._batch.recordTrigger(event_name, args, kwargs)
+
+    def __getattr__(self, name:str)->Any:
+        return getattr(self._batch.mediator, name)
+
+class ChangeBatch:
     '''
-    資料倉庫類別
-    負責在 View model 內部狀態或希望記錄的資料過多時，將狀態或資料結構存進此類別
+    批次更新期間暫存的通知 (只屬於開啟批次的執行緒)
+    sig_state 只保留最後一次; sig_property 依屬性合併 (第一次的 old、最後一次的 new)，值沒有改變的不通知;
+    mediator 的事件只保留最後一次的參數; 其他 signal (如 sig_message) 全部保留。
+    commit 時依原本的順序送出，被合併的通知位於最後一次出現的位置。
     '''
-    ...
+    def __init__(self, sentinel:ModelSentinel, mediator:ViewModelEventMediator):
+        self.sentinel = sentinel
+        self.mediator = mediator
+        self.sentinel_proxy = _BatchSentinel(self)
+        self.mediator_proxy = _BatchMediator(self)
+        self.depth = 0
+        # key -> (signal 名稱或 None 表示 mediator 的事件, 名稱, args, kwargs)，dict 保持插入順序
+        self.pending:Dict[typing.Hashable, typing.Tuple[Optional[str], str, tuple, dict]] = {}
+        self._seq = itertools.count()
+
+    def _append(self, key:typing.Hashable, entry:tuple)->None:
+        self.pending.pop(key, None)
+        self.pending[key] = entry
+
+    def record(self, name:str, args:tuple)->None:
+        if name == 'sig_state':
+            key = name
+        elif name == 'sig_property':
+            change = args[0]
+            key = (name, change.name)
+            pending = self.pending.get(key)
+            if pending is not None:
+                args = (PropertyChange(change.name, pending[2][0].old, change.new),)
+        else:
+            key = next(self._seq)
+        self._append(key, (name, name, args, {}))
+
+    def recordTrigger(self, event_name:str, args:tuple, kwargs:dict)->None:
+        self._append(('trigger', event_name), (None, event_name, args, kwargs))
+
+    def commit(self)->None:
+        for signal, name, args, kwargs in self.pending.values():
+            if signal is None:
+                self.mediator.trigger(name, *args, **kwargs)
+            elif signal == 'sig_property':
+                change = args[0]
+                if not _isSame(change.old, change.new):
+                    self.sentinel.sig_property.emit(change)
+            else:
+                getattr(self.sentinel, signal).emit(*args)
+
+_sentinel_lock = threading.Lock()
 
 class ViewModel():
     '''
     View model 類別
     負責紀錄 view 的狀態及顯示邏輯，以及提供 Domain model 的使用介面。
+    每個實例有自己的 sentinel，第一次使用時才建立，import 時不會載入 Qt 也不會建立任何 QObject。
+    sentinel 一律屬於 QApplication 的執行緒，即使第一次使用是在其他執行緒。
+    sentinel 的類別為 sentinel_class，未指定時為 ModelSentinel 加上 sentinel_signals 宣告的額外 signal。
     '''
-    sentinel = ModelSentinel()
+    sentinel_class:Optional[type] = None
+    sentinel_signals:Dict[str, type] = {}
+
+    @property
+    def sentinel(self)->ModelSentinel:
+        batch = self._currentBatch()
+        if batch is not None:
+            return batch.sentinel_proxy
+        return self._realSentinel()
+
+    def _currentBatch(self)->Optional[ChangeBatch]:
+        '''目前執行緒開啟中的批次，其他執行緒的批次不影響這個執行緒的通知。'''
+        local = self.__dict__.get('_batch_local')
+        if local is None:
+            return None
+        return getattr(local, 'batch', None)
+
+    @sentinel.setter
+    def sentinel(self, sentinel:ModelSentinel):
+        self._sentinel = sentinel
+
+    def _realSentinel(self)->ModelSentinel:
+        sentinel = self.__dict__.get('_sentinel')
+        if sentinel is None:
+            with _sentinel_lock:
+                sentinel = self.__dict__.get('_sentinel')
+                if sentinel is None:
+                    sentinel = self._sentinel = createSentinel(self._sentinelType())
+        return sentinel
+
+    @classmethod
+    def _sentinelType(cls)->type:
+        if cls.sentinel_class is not None:
+            return cls.sentinel_class
+        return sentinelClass(cls.sentinel_signals, f'{cls.__name__}Sentinel')
+
+    @property
+    def mediator(self)->ViewModelEventMediator:
+        batch = self._currentBatch()
+        if batch is not None:
+            return batch.mediator_proxy
+        return self._mediator
+
+    @mediator.setter
+    def mediator(self, mediator:ViewModelEventMediator):
+        self._mediator = mediator
+
     def __init__(self, name:str, mediator:ViewModelEventMediator):
         self.name = name
         self.mediator = mediator
         self.plugins:Dict[str, ViewModel] = {}
 
+    @contextlib.contextmanager
+    def batch(self)->typing.Iterator[ChangeBatch]:
+        '''
+        批次更新 : 區塊內暫停 sentinel 的 emit 與 mediator 的 trigger，離開最外層的區塊時合併成一次通知送出。
+        可以巢狀使用。區塊內拋出例外時，已改變的狀態仍會通知。
+        批次只屬於開啟它的執行緒 : 其他執行緒的通知照常立即送出，不會被合併或改由這個執行緒送出。
+        '''
+        # dict.setdefault 為原子操作，多個執行緒同時開啟批次時只會建立一個 threading.local
+        local = self.__dict__.setdefault('_batch_local', threading.local())
+        batch = getattr(local, 'batch', None)
+        if batch is None:
+            batch = local.batch = ChangeBatch(self._realSentinel(), self._mediator)
+        batch.depth += 1
+        try:
+            yield batch
+        finally:
+            batch.depth -= 1
+            if batch.depth == 0:
+                local.batch = None
+                batch.commit()
+
     @abc.abstractmethod
     def render(self)->None:
         '''
@@ -70,6 +265,9 @@ class ViewModel():
         self.plugins.update({name:plugin})
         return
 
+    def removePlugin(self, name:str)->None:
+        self.plugins.pop(name, None)
+
 class Results(typing.Protocol):
     '''Class Results's interface.'''
     ...
@@ -93,6 +291,16 @@ class ViewModelUpdater(ViewModel):
         接取來自 FRM 類別的推送(Results類別)，並發起來自 Receiver 資料更新的通知。
         '''
         ...
+
+    def update_batch(self, results:List[Results])->None:
+        '''
+        接取 FRM 批次模式的推送，預設逐筆呼叫 update。
+        批次內的通知會合併成一次，子類別也可覆寫成直接套用全部結果。
+        '''
+        with self.batch():
+            for res in results:
+                self.update(res)
+
     def startFRM(self)->None:...
 
     def stopFRM(self)->None:...
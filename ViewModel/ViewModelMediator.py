@@ -1,36 +1,455 @@
+from __future__ import annotations
+import abc
+import collections
+import threading
 import weakref
-from typing import List, Dict, Any, Callable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from enum import Enum
+from typing import List, Dict, Any, Callable, Hashable, Optional, Tuple
 from ViewModel.Logger import log
+from ViewModel.TopicTrie import TopicTrie, isPattern
+
+def _isBoundMethod(handler:Callable[..., Any])->bool:
+    '''Python 函式的 bound method (builtin 的 bound method 如 list.append 沒有 __func__)。'''
+    return hasattr(handler, '__self__') and hasattr(handler, '__func__')
+
+def _handlerKey(handler:Callable[..., Any])->Tuple[Hashable, ...]:
+    '''
+    同一個物件的同一個方法每次取得的 bound method 都不同，以 (物件 id, 函式) 作為識別;
+    其他 callable (函式、lambda、builtin 的 bound method) 以本身 (相等即相同) 作為識別。
+    '''
+    if _isBoundMethod(handler):
+        return id(handler.__self__), handler.__func__
+    try:
+        hash(handler)
+    except TypeError:
+        return id(handler), None
+    return handler, None
+
+class _StrongRef:
+    '''與 weakref 相同的呼叫介面，但保存強參照。'''
+    __slots__ = ('_obj',)
+
+    def __init__(self, obj:Any):
+        self._obj = obj
+
+    def __call__(self)->Any:
+        return self._obj
+
+def _handlerRef(handler:Callable[..., Any], callback:Callable[[weakref.ref], None])->Callable[[], Any]:
+    '''
+    bound method 以 WeakMethod 保存，物件被回收時自動移除訂閱;
+    函式、lambda、closure 與 builtin 的 bound method 沒有可以跟隨的擁有者，以強參照保存，
+    需以 unregister 移除 (否則 lambda 與 closure 會在註冊後立即被回收而永遠不會被呼叫)。
+    '''
+    if _isBoundMethod(handler):
+        try:
+            return weakref.WeakMethod(handler, callback)
+        except TypeError:
+            # 物件不支援弱參照 (例如 __slots__ 沒有 __weakref__)
+            pass
+    return _StrongRef(handler)
+
+class DispatchMode(Enum):
+    '''
+    handler 的傳遞模式。
+    DIRECT : 在 trigger 的呼叫端執行緒同步執行 (以 setCoalesce 合併的事件在 GUI event loop 中傳遞)。
+    GUI    : 在 Qt GUI 執行緒執行，若 trigger 已在 GUI 執行緒 (或沒有 QApplication) 則直接執行。
+    WORKER : 交給背景 worker 執行，trigger 不會被 handler 阻塞。
+    '''
+    DIRECT = 'direct'
+    GUI = 'gui'
+    WORKER = 'worker'
+
+class _DeferredQueue:
+    '''
+    延遲呼叫的佇列
+    一次 event loop 迭代內累積的呼叫只排程一次 flush，一連串的 trigger 只需要一次跨執行緒的切換。
+    同一個佇列的呼叫依 trigger 的順序執行。
+    '''
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending:List[Tuple[weakref.ref, tuple, dict]] = []
+        self._is_scheduled = False
+        self.posted = 0
+        self.batches = 0
+
+    def post(self, ref:weakref.ref, args:tuple, kwargs:dict)->None:
+        with self._lock:
+            self._pending.append((ref, args, kwargs))
+            self.posted += 1
+            if self._is_scheduled:
+                return
+            self._is_scheduled = True
+        self._schedule()
+
+    @abc.abstractmethod
+    def _schedule(self)->None:
+        '''
+        安排之後在目標執行緒呼叫 flush 的抽象介面
+        '''
+        ...
+
+    def flush(self)->None:
+        while True:
+            with self._lock:
+                pending = self._pending
+                if not pending:
+                    self._is_scheduled = False
+                    return
+                self._pending = []
+                self.batches += 1
+            for ref, args, kwargs in pending:
+                handler = ref()
+                if handler is None:
+                    continue
+                try:
+                    handler(*args, **kwargs)
+                except Exception as e:
+                    log.error(f'Queued handler {handler!r} raise : {e!r}')
+
+    def __len__(self):
+        return len(self._pending)
+
+class _GuiQueue(_DeferredQueue):
+    '''以 QueuedConnection 的 signal 將 flush 排進 GUI 執行緒的 event loop，第一次使用時才載入 Qt。'''
+    def __init__(self):
+        super().__init__()
+        self._invoker = None
+        self._gui_thread = None
+
+    def isGuiThread(self)->Optional[bool]:
+        '''回傳目前是否在 GUI 執行緒，沒有 QApplication 時回傳 None。'''
+        from PySide6 import QtCore
+        app = QtCore.QCoreApplication.instance()
+        if app is None:
+            return None
+        return QtCore.QThread.currentThread() == app.thread()
+
+    def _schedule(self)->None:
+        if self._invoker is None:
+            self._createInvoker()
+        self._invoker.sig_flush.emit()
+
+    def postLater(self, delay:float, ref:weakref.ref)->None:
+        '''delay 秒後在 GUI 執行緒呼叫 ref() 指向的函式，計時由 GUI event loop 的 timer 負責，不建立執行緒。'''
+        if self._invoker is None:
+            self._createInvoker()
+        self._invoker.sig_later.emit(max(1, round(1e3 * delay)), ref)
+
+    @staticmethod
+    def _call(ref:weakref.ref)->None:
+        handler = ref()
+        if handler is None:
+            return
+        try:
+            handler()
+        except Exception as e:
+            log.error(f'Delayed handler {handler!r} raise : {e!r}')
+
+    def _createInvoker(self)->None:
+        from PySide6 import QtCore
+
+        queue = self
+
+        class Invoker(QtCore.QObject):
+            sig_flush = QtCore.Signal()
+            sig_later = QtCore.Signal(int, object)
+
+            @QtCore.Slot()
+            def flush(self):
+                queue.flush()
+
+            @QtCore.Slot(int, object)
+            def later(self, msec:int, ref:weakref.ref):
+                QtCore.QTimer.singleShot(msec, self, lambda: queue._call(ref))
+
+        with self._lock:
+            if self._invoker is not None:
+                return
+            # slot 必須屬於 GUI 執行緒的 QObject，queued 呼叫才會在 GUI 執行緒執行
+            invoker = Invoker()
+            invoker.moveToThread(QtCore.QCoreApplication.instance().thread())
+            invoker.sig_flush.connect(invoker.flush, QtCore.Qt.ConnectionType.QueuedConnection)
+            invoker.sig_later.connect(invoker.later, QtCore.Qt.ConnectionType.QueuedConnection)
+            self._invoker = invoker
+
+class _WorkerQueue(_DeferredQueue):
+    '''在 executor 上執行 flush，同一時間只有一個 flush 在執行以保持順序。'''
+    def __init__(self, executor:Optional[Executor]=None):
+        super().__init__()
+        self._executor = executor
+        self._is_own = executor is None
+
+    def _schedule(self)->None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='Mediator')
+        self._executor.submit(self.flush)
+
+    def shutdown(self)->None:
+        if self._is_own and self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+def _samePayload(a:Tuple[tuple, dict], b:Tuple[tuple, dict])->bool:
+    '''比較兩次 trigger 的參數，無法比較的型別 (如 numpy array) 視為不同。'''
+    try:
+        return bool(a == b)
+    except Exception:
+        return False
+
+class _Coalescer:
+    '''
+    單一事件的合併策略
+    window 為 None 時不合併，只做 dedup;
+    window 為 0 時合併到下一次 GUI event loop 迭代 (frame);
+    window 大於 0 時合併 window 秒內的 trigger，由 GUI event loop 的 timer 計時。合併期間只保留最後一次的參數。
+    合併後在 GUI 執行緒傳遞，各 handler 仍依自己的 DispatchMode 執行;
+    沒有 QApplication 時沒有可以延後傳遞的執行緒，直接在呼叫端傳遞 (只做 dedup)，DIRECT 的 handler 不會跑到其他執行緒。
+    dedup 為 True 時，與上一次傳遞相同的參數不再傳遞。
+    '''
+    _EMPTY = object()
+
+    def __init__(self, mediator:ViewModelEventMediator, event_name:str, window:Optional[float], dedup:bool):
+        self._mediator = weakref.ref(mediator)
+        self.event_name = event_name
+        self.window = window
+        self.dedup = dedup
+        self._lock = threading.Lock()
+        self._pending:Any = self._EMPTY
+        self._last:Any = self._EMPTY
+        self._flush_ref = weakref.WeakMethod(self.flush)
+        self.triggered = 0
+        self.delivered = 0
+        self.collapsed = 0
+        self.deduped = 0
+
+    def offer(self, args:tuple, kwargs:dict)->bool:
+        '''回傳這次 trigger 是否要立即傳遞。'''
+        payload = (args, kwargs)
+        with self._lock:
+            self.triggered += 1
+            if self._pending is not self._EMPTY:
+                self._pending = payload
+                self.collapsed += 1
+                return False
+            is_deferred = self.window is not None and self._hasEventLoop()
+            if not is_deferred:
+                return self._accept(payload)
+            self._pending = payload
+        self._schedule()
+        return False
+
+    def _accept(self, payload:Tuple[tuple, dict])->bool:
+        if self.dedup and self._last is not self._EMPTY and _samePayload(self._last, payload):
+            self.deduped += 1
+            return False
+        self._last = payload
+        self.delivered += 1
+        return True
+
+    def _hasEventLoop(self)->bool:
+        mediator = self._mediator()
+        return mediator is not None and mediator._gui_queue.isGuiThread() is not None
+
+    def _schedule(self)->None:
+        mediator = self._mediator()
+        if mediator is None:
+            return
+        if self.window > 0:
+            mediator._gui_queue.postLater(self.window, self._flush_ref)
+        else:
+            mediator._gui_queue.post(self._flush_ref, (), {})
+
+    def flush(self)->None:
+        with self._lock:
+            payload = self._pending
+            if payload is self._EMPTY:
+                return
+            self._pending = self._EMPTY
+            is_accepted = self._accept(payload)
+        mediator = self._mediator()
+        if is_accepted and mediator is not None:
+            args, kwargs = payload
+            mediator._deliver(self.event_name, args, kwargs)
+
+    def stats(self)->Dict[str, Any]:
+        return {'window': self.window, 'dedup': self.dedup, 'triggered': self.triggered,
+                'delivered': self.delivered, 'collapsed': self.collapsed, 'deduped': self.deduped}
 
 class ViewModelEventMediator:
     '''
     View Model 仲介類別
     負責 View Model間的通信。
+    bound method 以弱參照保存，物件被回收時由 weakref 的 callback 以 O(1) 移除;
+    函式與 lambda 以強參照保存，需以 unregister 移除;
+    每個事件的 handler 依註冊順序呼叫，trigger 使用預先建立的 tuple，只在訂閱改變時重建。
+    每個 handler 可指定 DispatchMode，GUI/WORKER 模式的呼叫會累積後整批傳遞。
+    事件名稱以 "." 或 "/" 分層，訂閱時可使用 "*" (一層) 與 "**" (零或多層) 萬用字元，
+    例如 "device.*.connected" 或 "plugin.Counter/**"。pattern 以前綴樹比對，
+    每個 topic 解析後的 handler 會被快取，直到訂閱改變; 快取最多保留 dispatch_cache_size 個 topic (LRU)。
+    沒有任何訂閱的 topic 不做任何事。
     '''
-    def __init__(self):
-        self._events:dict[str, set[Callable[..., Any]]] = {}
+    dispatch_cache_size:int = 1024
+
+    def __init__(self, executor:Optional[Executor]=None):
+        self._events:dict[str, dict[Hashable, Tuple[weakref.ref, DispatchMode]]] = {}
+        self._dispatch:collections.OrderedDict[str, Tuple[Tuple[weakref.ref, DispatchMode], ...]] = \
+            collections.OrderedDict()
+        # 訂閱的修改與快取的寫入使用同一個 lock，避免其他執行緒 register 後被過期的解析結果覆蓋;
+        # weakref 的 callback 可能在持有 lock 的執行緒中觸發，因此使用 RLock
+        self._lock = threading.RLock()
+        self._gui_queue = _GuiQueue()
+        self._worker_queue = _WorkerQueue(executor)
+        self._coalescers:dict[str, _Coalescer] = {}
+        self._patterns = TopicTrie()
+        self.direct_calls = 0
 
     # 註冊事件
-    def register(self, event_name:str, handler:Callable[..., Any]):
-        if event_name not in self._events:
-            self._events[event_name] = set([])
-        self._events[event_name].add(weakref.WeakMethod(handler))
+    def register(self, event_name:str, handler:Callable[..., Any], mode:DispatchMode=DispatchMode.DIRECT):
+        key = _handlerKey(handler)
+        with self._lock:
+            handlers = self._events.setdefault(event_name, {})
+            if key in handlers:
+                return
+            ref = _handlerRef(handler, self._pruner(event_name, key))
+            handlers[key] = (ref, mode)
+            if isPattern(event_name):
+                self._patterns.add(event_name)
+            self._invalidate(event_name)
 
     def unregister(self, event_name:str, handler:Callable[..., Any]):
-        if event_name not in self._events:
-            return
-        self._events[event_name].remove(handler)
+        with self._lock:
+            handlers = self._events.get(event_name)
+            if handlers is None:
+                return
+            if handlers.pop(_handlerKey(handler), None) is not None:
+                self._removeHandler(event_name, handlers)
+
+    def _removeHandler(self, event_name:str, handlers:dict)->None:
+        '''在 lock 中呼叫 : handler 移除後清除快取，沒有 handler 的事件一併刪除。'''
+        self._invalidate(event_name)
+        if not handlers:
+            del self._events[event_name]
+            if event_name in self._patterns:
+                self._patterns.remove(event_name)
+
+    def _invalidate(self, event_name:str)->None:
+        '''pattern 的訂閱改變可能影響任何 topic，清除全部已解析的結果; 一般 topic 只清除自己。'''
+        with self._lock:
+            if event_name in self._patterns or isPattern(event_name):
+                self._dispatch.clear()
+            else:
+                self._dispatch.pop(event_name, None)
+
+    def _cached(self, topic:str)->Tuple[Tuple[weakref.ref, DispatchMode], ...]:
+        dispatch = self._dispatch
+        entries = dispatch.get(topic)
+        if entries is not None:
+            try:
+                dispatch.move_to_end(topic)
+            except KeyError:
+                # 其他執行緒剛好清除了快取，這次仍使用已取得的結果
+                pass
+            return entries
+        with self._lock:
+            entries = dispatch.get(topic)
+            if entries is None:
+                entries = dispatch[topic] = self._resolve(topic)
+                while len(dispatch) > self.dispatch_cache_size:
+                    dispatch.popitem(last=False)
+        return entries
+
+    def _resolve(self, topic:str)->Tuple[Tuple[weakref.ref, DispatchMode], ...]:
+        '''合併 topic 本身與符合的 pattern 的 handler，同一個 handler 只保留第一次出現的。'''
+        entries = dict(self._events.get(topic, {}))
+        if len(self._patterns):
+            for pattern in self._patterns.match(topic):
+                for key, entry in self._events.get(pattern, {}).items():
+                    entries.setdefault(key, entry)
+        return tuple(entries.values())
+
+    def _pruner(self, event_name:str, key:Hashable)->Callable[[weakref.ref], None]:
+        mediator = weakref.ref(self)
+        def prune(ref:weakref.ref):
+            owner = mediator()
+            if owner is None:
+                return
+            with owner._lock:
+                handlers = owner._events.get(event_name)
+                entry = handlers.get(key) if handlers is not None else None
+                if entry is not None and entry[0] is ref:
+                    del handlers[key]
+                    owner._removeHandler(event_name, handlers)
+        return prune
+
+    def handlerCount(self, event_name:str)->int:
+        return len(self._events.get(event_name, ()))
+
+    def setCoalesce(self, event_name:str, window:Optional[float]=0., dedup:bool=False)->None:
+        '''
+        設定事件的合併策略 (需主動開啟)。
+        window : None 不合併; 0 合併到下一個 frame; 大於 0 合併 window 秒內的 trigger，只傳遞最後一次的參數。
+                 合併需要 GUI event loop，沒有 QApplication 時直接傳遞。
+        dedup : 與上一次傳遞相同的參數不再傳遞。
+        '''
+        if window is not None and window < 0:
+            raise Exception(f'Coalesce window must not be negative, got {window}.')
+        previous = self._coalescers.get(event_name)
+        self._coalescers[event_name] = _Coalescer(self, event_name, window, dedup)
+        if previous is not None:
+            previous.flush()
+
+    def clearCoalesce(self, event_name:str)->None:
+        coalescer = self._coalescers.pop(event_name, None)
+        if coalescer is not None:
+            coalescer.flush()
+
+    def coalesceStats(self)->Dict[str, Dict[str, Any]]:
+        return {name: coalescer.stats() for name, coalescer in self._coalescers.items()}
 
     # 觸發事件
     def trigger(self, event_name:str, *args, **kwargs):
-        assert self._events.get(event_name) is not None
-        for handler_ref in self._events[event_name]:
+        coalescer = self._coalescers.get(event_name)
+        if coalescer is not None and not coalescer.offer(args, kwargs):
+            return
+        self._deliver(event_name, args, kwargs)
+
+    def _deliver(self, event_name:str, args:tuple, kwargs:dict)->None:
+        entries = self._cached(event_name)
+        is_gui_thread = None
+        for handler_ref, mode in entries:
+            if mode is DispatchMode.WORKER:
+                self._worker_queue.post(handler_ref, args, kwargs)
+                continue
+            if mode is DispatchMode.GUI:
+                if is_gui_thread is None:
+                    is_gui_thread = self._gui_queue.isGuiThread() is not False
+                if not is_gui_thread:
+                    self._gui_queue.post(handler_ref, args, kwargs)
+                    continue
             handler = handler_ref()
             if handler is None:
-                # self._events[event_name].remove(handler_ref)
                 continue
+            self.direct_calls += 1
             handler(*args, **kwargs)
 
+    def processPending(self)->None:
+        '''在目前的執行緒執行尚未傳遞的 GUI 呼叫，用於關閉前或沒有 event loop 的情境。'''
+        self._gui_queue.flush()
+
+    def stats(self)->Dict[str, int]:
+        return {'direct_calls': self.direct_calls,
+                'gui_posted': self._gui_queue.posted, 'gui_batches': self._gui_queue.batches,
+                'gui_pending': len(self._gui_queue),
+                'worker_posted': self._worker_queue.posted, 'worker_batches': self._worker_queue.batches,
+                'worker_pending': len(self._worker_queue)}
+
+    def shutdown(self)->None:
+        '''等待 worker 完成目前的呼叫並關閉 mediator 自己建立的 executor。'''
+        self._worker_queue.shutdown()
+        self._worker_queue.flush()
+
 if __name__ == '__main__':
     m = ViewModelEventMediator()
     class test:
@@ -1,2 +1,10 @@
-from ViewModel.ViewModel import ViewModel, isHandler, ModelSentinel, Repository
-from ViewModel.ViewModelMediator import ViewModelEventMediator
\ No newline at end of file
+from ViewModel.ViewModel import ViewModel, isHandler, Repository, ObservableProperty, PropertyChange
+from ViewModel.Repository import ColumnRepository
+from ViewModel.ViewModelMediator import ViewModelEventMediator, DispatchMode
+from ViewModel.Sentinel import sentinelClass
+
+def __getattr__(name:str):
+    # ModelSentinel 在第一次取用時才載入 Qt 並建立
+    if name == 'ModelSentinel':
+        return sentinelClass()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,77 @@
+import asyncio
+import os
+import pytest
+from FiniteReceiverMachine.AsyncFiniteReceiveMachine import AsyncFiniteReceiveMachine
+
+
+@pytest.fixture(scope='module')
+def qapp():
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PySide6 import QtWidgets
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def runQt(coro):
+    from PySide6 import QtAsyncio
+    # quit_qapp=False 時 PySide6 6.7 的 loop 在 coroutine 結束後不會離開 exec()，
+    # quit() 只結束這一次的 exec()，QApplication 之後仍可使用
+    return QtAsyncio.run(coro, keep_running=False)
+
+
+class ListReceiver:
+    '''non-blocking 的 async receiver，依序回傳 results 後不再有資料。'''
+    def __init__(self, results):
+        self.results = list(results)
+        self.polls = 0
+        self.is_stopped = False
+
+    async def getResults(self):
+        self.polls += 1
+        return self.results.pop(0) if self.results else None
+
+    def setConfigs(self, **kwargs):...
+
+    def trigger(self, **kwargs):...
+
+    def stop(self):
+        self.is_stopped = True
+
+
+class ListUpdater:
+    def __init__(self):
+        self.results = []
+
+    async def update(self, res):
+        self.results.append(res)
+
+    def setConfigs(self, **kwargs):...
+
+
+def test_updates_every_result_on_qt_loop(qapp):
+    receiver, updater = ListReceiver(range(20)), ListUpdater()
+
+    async def main():
+        frm = AsyncFiniteReceiveMachine()
+        frm.setFRM(receiver, updater)
+        frm.start(interval=0)
+        while len(updater.results) < 20:
+            await asyncio.sleep(0.005)
+        frm.stop()
+
+    runQt(main())
+    assert updater.results == list(range(20))
+    assert receiver.is_stopped
+
+
+def test_empty_polls_back_off(qapp):
+    receiver = ListReceiver([])
+
+    async def main():
+        frm = AsyncFiniteReceiveMachine(receiver)
+        frm.start(interval=0)
+        await asyncio.sleep(0.2)
+        frm.stop()
+
+    runQt(main())
+    # 1, 2, 4 ... 50 ms 的退避，200 ms 內只會 polling 十次左右
+    assert 3 <= receiver.polls <= 20
@@ -0,0 +1,220 @@
+import threading
+import time
+import pytest
+from FiniteReceiverMachine.FiniteReceiveMachine import FiniteReceiveMachine
+
+
+class CountReceiver:
+    '''依序回傳 1~total，送完後不再有資料。'''
+    def __init__(self, total:int):
+        self.total = total
+        self.sent = 0
+
+    def getResults(self):
+        if self.sent >= self.total:
+            return None
+        self.sent += 1
+        return self.sent
+
+    def setConfigs(self, **kwargs):...
+
+    def trigger(self, **kwargs):...
+
+    def stop(self):...
+
+
+class BatchUpdater:
+    def __init__(self):
+        self.singles = []
+        self.batches = []
+        self._lock = threading.Lock()
+
+    @property
+    def results(self):
+        with self._lock:
+            return self.singles + [res for batch in self.batches for res in batch]
+
+    def update(self, res):
+        with self._lock:
+            self.singles.append(res)
+
+    def update_batch(self, results):
+        with self._lock:
+            self.batches.append(list(results))
+
+    def setConfigs(self, **kwargs):...
+
+
+def waitFor(predicate, timeout:float=5.)->bool:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.002)
+    return True
+
+
+@pytest.mark.parametrize('executor', [None, 'thread'])
+def test_batch_with_stages_uses_update_batch(executor):
+    receiver, updater = CountReceiver(100), BatchUpdater()
+    frm = FiniteReceiveMachine()
+    frm.setFRM(receiver, updater)
+    frm.setBatch(16)
+    frm.addStage(lambda n: n * 2, executor=executor, workers=4)
+    frm.start(interval=0)
+    try:
+        assert waitFor(lambda: len(updater.results) == 100)
+    finally:
+        frm.stop()
+    assert updater.singles == []
+    assert [len(batch) for batch in updater.batches] == [16] * 6 + [4]
+    assert updater.results == [n * 2 for n in range(1, 101)]
+
+
+def test_batch_with_stages_skips_filtered_results():
+    receiver, updater = CountReceiver(32), BatchUpdater()
+    frm = FiniteReceiveMachine()
+    frm.setFRM(receiver, updater)
+    frm.setBatch(16)
+    frm.addStage(lambda n: n if n % 2 else None, executor='thread')
+    frm.start(interval=0)
+    try:
+        assert waitFor(lambda: len(updater.results) == 16)
+    finally:
+        frm.stop()
+    assert updater.singles == []
+    assert [len(batch) for batch in updater.batches] == [8, 8]
+    assert updater.results == list(range(1, 33, 2))
+
+
+class NotifyingReceiver:
+    '''資料由 produce() 放入，並呼叫 FRM 設定的 notifier。'''
+    def __init__(self):
+        self.queue = []
+        self.polls = 0
+        self.notify = None
+        self._lock = threading.Lock()
+
+    def setNotifier(self, notify):
+        self.notify = notify
+
+    def produce(self, value):
+        with self._lock:
+            self.queue.append(value)
+        notify = self.notify
+        if notify is not None:
+            notify()
+
+    def getResults(self):
+        with self._lock:
+            self.polls += 1
+            return self.queue.pop(0) if self.queue else None
+
+    def setConfigs(self, **kwargs):...
+
+    def trigger(self, **kwargs):...
+
+    def stop(self):...
+
+
+def test_push_receiver_delivers_without_polling_when_idle():
+    receiver, updater = NotifyingReceiver(), BatchUpdater()
+    frm = FiniteReceiveMachine()
+    frm.setFRM(receiver, updater)
+    assert frm.is_push
+    frm.start()
+    try:
+        assert receiver.notify is not None
+        time.sleep(0.05)
+        idle_polls = receiver.polls
+        time.sleep(0.1)
+        # 沒有資料時不會 polling
+        assert receiver.polls == idle_polls <= 1
+        for value in range(50):
+            receiver.produce(value)
+        assert waitFor(lambda: len(updater.results) == 50)
+    finally:
+        frm.stop()
+    assert updater.results == list(range(50))
+    # 每次喚醒取到沒有資料為止，最多多一次空的 getResults
+    assert receiver.polls <= idle_polls + 50 + 50
+    assert receiver.notify is None
+
+
+def test_push_receiver_drains_burst_in_one_wakeup():
+    receiver, updater = NotifyingReceiver(), BatchUpdater()
+    for value in range(20):
+        receiver.produce(value)
+    frm = FiniteReceiveMachine()
+    frm.setFRM(receiver, updater)
+    frm.start()
+    try:
+        assert waitFor(lambda: len(updater.results) == 20)
+        time.sleep(0.02)
+        assert frm._start_Thread.ticks == 1
+    finally:
+        frm.stop()
+    assert updater.results == list(range(20))
+    assert receiver.polls == 21
+
+
+class SingleUpdater:
+    '''沒有 update_batch 的 updater。'''
+    def __init__(self):
+        self.results = []
+
+    def update(self, res):
+        self.results.append(res)
+
+    def setConfigs(self, **kwargs):...
+
+
+@pytest.mark.parametrize('buffer', [False, True])
+def test_batch_calls_update_batch(buffer):
+    receiver, updater = CountReceiver(100), BatchUpdater()
+    frm = FiniteReceiveMachine()
+    frm.setFRM(receiver, updater)
+    frm.setBatch(16)
+    frm.start(interval=0, buffer=buffer)
+    try:
+        assert waitFor(lambda: len(updater.results) == 100)
+    finally:
+        frm.stop()
+    assert updater.singles == []
+    assert all(0 < len(batch) <= 16 for batch in updater.batches)
+    assert updater.results == list(range(1, 101))
+    if not buffer:
+        assert [len(batch) for batch in updater.batches] == [16] * 6 + [4]
+
+
+def test_batch_falls_back_to_update_without_update_batch():
+    receiver, updater = CountReceiver(40), SingleUpdater()
+    frm = FiniteReceiveMachine()
+    frm.setFRM(receiver, updater)
+    frm.setBatch(16)
+    frm.start(interval=0)
+    try:
+        assert waitFor(lambda: len(updater.results) == 40)
+    finally:
+        frm.stop()
+    assert updater.results == list(range(1, 41))
+
+
+def test_batch_max_latency_limits_collection_time():
+    class SlowReceiver(CountReceiver):
+        def getResults(self):
+            time.sleep(0.01)
+            return super().getResults()
+
+    receiver, updater = SlowReceiver(20), BatchUpdater()
+    frm = FiniteReceiveMachine()
+    frm.setFRM(receiver, updater)
+    frm.setBatch(16, max_latency=0.03)
+    frm.start(interval=0)
+    try:
+        assert waitFor(lambda: len(updater.results) == 20)
+    finally:
+        frm.stop()
+    # 每次收集最多約 0.03 秒，不會等到 16 筆
+    assert max(len(batch) for batch in updater.batches) <= 5
+    assert updater.results == list(range(1, 21))
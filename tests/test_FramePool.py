@@ -0,0 +1,70 @@
+import time
+import pytest
+from FiniteReceiverMachine.FiniteReceiveMachine import FiniteReceiveMachine
+from FiniteReceiverMachine.FramePool import FramePool
+from FiniteReceiverMachine.RingBuffer import OverflowPolicy
+
+
+class FrameReceiver:
+    def __init__(self, pool:FramePool):
+        self.pool = pool
+        self.seq = 0
+
+    def getResults(self):
+        frame = self.pool.acquire()
+        if frame is None:
+            return None
+        self.seq += 1
+        frame.seq = self.seq
+        return frame
+
+    def setConfigs(self, **kwargs):...
+
+    def trigger(self, **kwargs):...
+
+    def stop(self):...
+
+
+class SlowUpdater:
+    def __init__(self):
+        self.count = 0
+
+    def update(self, res):
+        self.count += 1
+        time.sleep(0.002)
+
+    def setConfigs(self, **kwargs):...
+
+
+def test_acquire_release():
+    pool = FramePool(4, 'f', count=2)
+    first, second = pool.acquire(), pool.acquire()
+    assert pool.acquire() is None
+    assert pool.stats() == {'count': 2, 'free': 0, 'in_use': 2, 'misses': 1}
+    first.release()
+    second.release()
+    assert pool.stats()['in_use'] == 0
+
+
+@pytest.mark.parametrize('policy', list(OverflowPolicy))
+def test_buffered_frm_returns_every_frame(policy):
+    pool = FramePool(16, 'f', count=8)
+    updater = SlowUpdater()
+    frm = FiniteReceiveMachine()
+    frm.setFRM(FrameReceiver(pool), updater)
+    frm.setBuffer(capacity=2, policy=policy)
+    frm.start(interval=0.0005, buffer=True)
+    time.sleep(0.1)
+    frm.stop()
+    assert updater.count > 0
+    assert pool.stats()['in_use'] == 0
+
+
+def test_default_buffer_returns_every_frame():
+    pool = FramePool(16, 'f', count=4)
+    frm = FiniteReceiveMachine()
+    frm.setFRM(FrameReceiver(pool), SlowUpdater())
+    frm.start(interval=0.0005, buffer=True)
+    time.sleep(0.05)
+    frm.stop()
+    assert pool.stats()['in_use'] == 0
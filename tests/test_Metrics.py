@@ -0,0 +1,126 @@
+import threading
+import time
+import pytest
+from FiniteReceiverMachine.FiniteReceiveMachine import FiniteReceiveMachine
+from FiniteReceiverMachine.Metrics import FRMMetrics, Histogram, Stamped
+
+
+class CountReceiver:
+    '''回傳 0~9 的小整數 (共用同一個 id)，送完 total 筆後不再有資料。'''
+    def __init__(self, total:int):
+        self.total = total
+        self.sent = 0
+
+    def getResults(self):
+        if self.sent >= self.total:
+            return None
+        self.sent += 1
+        return self.sent % 10
+
+    def setConfigs(self, **kwargs):...
+
+    def trigger(self, **kwargs):...
+
+    def stop(self):...
+
+
+class ListUpdater:
+    def __init__(self):
+        self.results = []
+
+    def update(self, res):
+        self.results.append(res)
+
+    def setConfigs(self, **kwargs):...
+
+
+def runFRM(frm:FiniteReceiveMachine, updater:ListUpdater, expected:int, buffer:bool=False):
+    '''執行到 updater 收到 expected 筆後取得統計 (stop 之後 pipeline 與 buffer 的計數不再列入)。'''
+    frm.enableMetrics()
+    frm.start(interval=0, buffer=buffer)
+    deadline = time.monotonic() + 5
+    while len(updater.results) < expected and time.monotonic() < deadline:
+        time.sleep(0.005)
+    time.sleep(0.01)
+    metrics = frm.getMetrics()
+    frm.stop()
+    return metrics
+
+
+@pytest.mark.parametrize('buffer', [False, True])
+def test_e2e_counts_every_item_through_pipeline(buffer):
+    receiver, updater = CountReceiver(1000), ListUpdater()
+    frm = FiniteReceiveMachine()
+    frm.setFRM(receiver, updater)
+    frm.addStage(lambda n: n * 2, executor='thread')
+    metrics = runFRM(frm, updater, 1000, buffer)
+    assert len(updater.results) == 1000
+    assert all(type(res) is int for res in updater.results)
+    assert metrics['results'] == 1000
+    assert metrics['e2e_latency']['count'] == 1000
+    assert metrics['dropped'] == 0
+    frm.clearStages()
+
+
+def test_filtered_items_are_not_dropped():
+    receiver, updater = CountReceiver(1000), ListUpdater()
+    frm = FiniteReceiveMachine()
+    frm.setFRM(receiver, updater)
+    frm.addStage(lambda n: n if n % 2 else None)
+    metrics = runFRM(frm, updater, 500)
+    assert metrics['filtered'] == 500
+    assert metrics['dropped'] == 0
+    assert metrics['e2e_latency']['count'] == len(updater.results) == 500
+
+
+def test_failed_stage_counts_as_dropped():
+    receiver, updater = CountReceiver(100), ListUpdater()
+    frm = FiniteReceiveMachine()
+    frm.setFRM(receiver, updater)
+    frm.addStage(lambda n: 1 // (n % 10))
+    metrics = runFRM(frm, updater, 90)
+    assert metrics['dropped'] == 10
+    assert metrics['filtered'] == 0
+
+
+def test_batch_updates_record_each_item():
+    receiver, updater = CountReceiver(1000), ListUpdater()
+    frm = FiniteReceiveMachine()
+    frm.setFRM(receiver, updater)
+    frm.setBatch(max_size=16)
+    metrics = runFRM(frm, updater, 1000, buffer=True)
+    assert metrics['e2e_latency']['count'] == len(updater.results) == 1000
+
+
+def test_histogram_concurrent_updates():
+    metrics = FRMMetrics()
+
+    def record():
+        for _ in range(10000):
+            metrics.updated((time.perf_counter(),), 0., 1e-6)
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    snapshot = metrics.snapshot()
+    assert snapshot['update_latency']['count'] == 40000
+    assert snapshot['e2e_latency']['count'] == 40000
+
+
+def test_histogram_percentile():
+    histogram = Histogram()
+    for us in (1, 2, 4, 1000):
+        histogram.record(us * 1e-6)
+    assert histogram.count == 4
+    assert histogram.percentile(0.5) == 4.
+    assert histogram.percentile(1.) == 1024.
+
+
+def test_stamped_is_unwrapped_before_update():
+    updater = ListUpdater()
+    frm = FiniteReceiveMachine()
+    frm.setUpdater(updater)
+    frm._update(Stamped('value', time.perf_counter()))
+    assert updater.results == ['value']
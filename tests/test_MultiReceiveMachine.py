@@ -0,0 +1,29 @@
+import time
+from FiniteReceiverMachine.MultiReceiveMachine import MultiReceiveMachine
+
+
+class EmptyReceiver:
+    '''polling 的 receiver，沒有任何資料。'''
+    def getResults(self):
+        return None
+
+    def setConfigs(self, **kwargs):...
+
+    def trigger(self, **kwargs):...
+
+    def stop(self):...
+
+
+def test_zero_interval_workers_yield_to_other_threads():
+    machine = MultiReceiveMachine(workers=2)
+    machine.addReceiver('a', EmptyReceiver())
+    machine.addReceiver('b', EmptyReceiver())
+    machine.start()
+    count = 0
+    deadline = time.monotonic() + 0.1
+    while time.monotonic() < deadline:
+        count += 1
+    machine.stop()
+    stats = machine.stats()
+    assert stats['a']['polls'] > 0 and stats['b']['polls'] > 0
+    assert count > 1000
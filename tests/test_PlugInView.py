@@ -0,0 +1,97 @@
+import os
+import pytest
+
+
+@pytest.fixture(scope='module')
+def qapp():
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PySide6 import QtWidgets
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def app_view(qapp):
+    from PySide6 import QtWidgets
+    from MainView import AppView, Counter
+    from MainViewModel import AppViewModel, CounterModel, ViewModelEventMediator
+    mediator = ViewModelEventMediator()
+    view = AppView('Main', AppViewModel('Main', mediator))
+    widget = QtWidgets.QWidget()
+    view.setupUI(widget)
+    view.addPluginFactory('Counter', lambda: Counter('Counter', CounterModel('Counter', mediator)))
+    view.addPluginFactory('Counter2', lambda: Counter('Counter2', CounterModel('Counter2', mediator)))
+    view.run()
+    yield view
+    view.stop()
+    widget.deleteLater()
+
+
+def test_factory_plugin_syncs_connect_state(app_view):
+    view = app_view.activatePlugin('Counter')
+    assert view.view_model.is_enable is False
+    assert view.wg.isEnabled() is False
+    app_view.view_model.connectDevice()
+    assert view.wg.isEnabled() is True
+
+
+def test_unload_keeps_view_model_state(app_view):
+    view = app_view.activatePlugin('Counter')
+    view_model = view.view_model
+    view_model.plusOne()
+    view_model.plusOne()
+    app_view.activatePlugin('Counter2')
+
+    assert app_view.unloadIdlePlugins(0) == ['Counter']
+    assert app_view.plugin_views['Counter'].is_loaded is False
+    assert view.is_connected is False
+    assert app_view.view_model.plugins['Counter'] is view_model
+
+    app_view.view_model.connectDevice()
+    reloaded = app_view.activatePlugin('Counter')
+    assert reloaded is view
+    assert reloaded.view_model is view_model
+    assert view_model.current_number == 2
+    assert view.lb_number.text() == 'Current Number : 2'
+    assert view.wg.isEnabled() is True
+
+
+def test_unload_skips_active_and_unloaded_plugins(app_view):
+    app_view.activatePlugin('Counter')
+    assert app_view.unloadPlugin('Counter') is False
+    assert app_view.unloadPlugin('Counter2') is False
+
+
+def test_default_unload_removes_widget_tree(qapp):
+    from PySide6 import QtWidgets
+    from View import PlugInView
+    from MainView import Counter
+    from MainViewModel import AppViewModel, CounterModel, ViewModelEventMediator
+
+    class ListView(PlugInView):
+        def setupUI(self, wg):
+            self.wg = wg
+            self.ly = QtWidgets.QVBoxLayout(wg)
+
+        def getModelState(self, view_model):...
+
+        def _addPluginToLayout(self, view):
+            wg = QtWidgets.QWidget()
+            self.ly.addWidget(wg)
+            view.setupUI(wg=wg)
+
+    mediator = ViewModelEventMediator()
+    view = ListView('List', AppViewModel('List', mediator))
+    view.setupUI(QtWidgets.QWidget())
+    for name in ('Counter', 'Counter2'):
+        view.addPluginFactory(name, lambda name=name: Counter(name, CounterModel(name, mediator)))
+    view.run()
+    counter = view.activatePlugin('Counter')
+    view.activatePlugin('Counter2')
+    old = counter.wg
+    assert view.unloadPlugin('Counter') is True
+    assert view.ly.count() == 1
+    assert old.isHidden()
+    view.activatePlugin('Counter')
+    assert view.ly.count() == 2
+    assert counter.wg is not old
+    view.stop()
@@ -0,0 +1,83 @@
+import json
+import sys
+import pytest
+from View import PluginDiscovery
+from View.PluginDiscovery import PluginSpec, discoverPlugins, registerPlugins
+
+
+def installPlugin(path, dist:str, version:str, plugins:dict):
+    '''在 path 建立一個已安裝的套件 (dist-info)，plugins 為 {名稱: "module:attr"}。'''
+    # 與 wheel 安裝的目錄名稱相同，套件名稱中的 "-" 以 "_" 表示
+    info = path / f'{dist.replace("-", "_")}-{version}.dist-info'
+    info.mkdir()
+    (info / 'METADATA').write_text(f'Metadata-Version: 2.1\nName: {dist}\nVersion: {version}\n')
+    lines = [f'[{PluginDiscovery.ENTRY_POINT_GROUP}]'] + [f'{name} = {value}' for name, value in plugins.items()]
+    (info / 'entry_points.txt').write_text('\n'.join(lines) + '\n')
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    path = tmp_path / 'site'
+    path.mkdir()
+    (path / 'fake_scope.py').write_text(
+        'LOADED = True\n'
+        'def createView(name, mediator):\n'
+        '    return ("view", name, mediator)\n')
+    installPlugin(path, 'fake-scope', '1.0', {'Scope': 'fake_scope:createView'})
+    monkeypatch.syspath_prepend(str(path))
+    monkeypatch.delitem(sys.modules, 'fake_scope', raising=False)
+    return path
+
+
+def test_discover_scans_entry_points_and_writes_manifest(site, tmp_path):
+    manifest = tmp_path / 'plugins.json'
+    specs = discoverPlugins(str(manifest))
+    assert specs == [PluginSpec('Scope', 'fake_scope:createView', 'fake-scope', '1.0')]
+    assert json.loads(manifest.read_text())['plugins'][0]['name'] == 'Scope'
+    assert 'fake_scope' not in sys.modules
+
+
+def test_discover_uses_manifest_when_packages_unchanged(site, tmp_path, monkeypatch):
+    manifest = str(tmp_path / 'plugins.json')
+    specs = discoverPlugins(manifest)
+
+    def scan(group):
+        raise AssertionError('should not scan entry points')
+
+    monkeypatch.setattr(PluginDiscovery, 'scanEntryPoints', scan)
+    assert discoverPlugins(manifest) == specs
+    with pytest.raises(AssertionError):
+        discoverPlugins(manifest, refresh=True)
+
+
+def test_discover_rescans_when_packages_change(site, tmp_path):
+    manifest = str(tmp_path / 'plugins.json')
+    assert [spec.name for spec in discoverPlugins(manifest)] == ['Scope']
+    installPlugin(site, 'fake-meter', '2.0', {'Meter': 'fake_meter:createView'})
+    assert [spec.name for spec in discoverPlugins(manifest)] == ['Meter', 'Scope']
+
+
+def test_discover_rescans_corrupt_manifest(site, tmp_path):
+    manifest = tmp_path / 'plugins.json'
+    manifest.write_text('{not json')
+    assert [spec.name for spec in discoverPlugins(str(manifest))] == ['Scope']
+    assert json.loads(manifest.read_text())['plugins']
+
+
+class FakePlugInView:
+    def __init__(self):
+        self.plugin_views = {}
+
+    def addPluginFactory(self, name, factory):
+        self.plugin_views[name] = factory
+
+
+def test_register_imports_plugin_only_when_created(site, tmp_path):
+    view, mediator = FakePlugInView(), object()
+    view.plugin_views['Existing'] = None
+    specs = discoverPlugins(str(tmp_path / 'plugins.json'))
+    registerPlugins(view, mediator, specs + [PluginSpec('Existing', 'fake_scope:createView')])
+    assert view.plugin_views['Existing'] is None
+    assert 'fake_scope' not in sys.modules
+    assert view.plugin_views['Scope']() == ('view', 'Scope', mediator)
+    assert sys.modules['fake_scope'].LOADED
@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def runPython(code:str)->str:
+    return subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+
+
+def test_import_has_no_package_side_effects():
+    out = runPython('import sys, Profiler; print(sorted(m for m in ("ViewModel", "View", "PySide6") if m in sys.modules))')
+    assert out.strip() == '[]'
+
+
+def test_profile_includes_application_imports():
+    code = '''
+import Profiler
+profiler = Profiler.enable()
+import ViewModel
+from ViewModel import ColumnRepository
+ColumnRepository(4, {"value": "d"})
+names = {r.name for r in profiler.records if r.kind == "import"}
+print(all(name in names for name in ("ViewModel", "ViewModel.ViewModel", "ViewModel.ViewModelMediator")))
+'''
+    assert runPython(code).strip() == 'True'
+
+
+def test_section_records_nested_self_time():
+    import Profiler
+    profiler = Profiler.StartupProfiler()
+    with profiler.section('outer'):
+        with profiler.section('inner'):
+            pass
+    inner, outer = profiler.records
+    assert (inner.name, outer.name) == ('inner', 'outer')
+    assert outer.self_time <= outer.total
+    assert 'outer' in profiler.report()
@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+import pytest
+from ViewModel import PropertyChange
+
+
+@pytest.fixture(scope='module')
+def qapp():
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PySide6 import QtWidgets
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def processEventsUntil(app, predicate, timeout:float=2.)->bool:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        app.processEvents()
+        time.sleep(0.001)
+    return True
+
+
+def processEventsFor(app, duration:float)->None:
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        app.processEvents()
+        time.sleep(0.001)
+
+
+class Recorder:
+    def __init__(self):
+        self.states = []
+        self.changes = []
+        self.threads = []
+
+    def state(self, view_model):
+        self.states.append((view_model, time.perf_counter()))
+        self.threads.append(threading.get_ident())
+
+    def change(self, change):
+        self.changes.append(change)
+
+
+def makeScheduler(max_fps:float=1000.):
+    from View import RenderScheduler
+    recorder = Recorder()
+    scheduler = RenderScheduler(recorder.state, recorder.change, max_fps)
+    scheduler.is_active = True
+    return scheduler, recorder
+
+
+def test_states_in_one_frame_render_once_with_latest(qapp):
+    scheduler, recorder = makeScheduler()
+    for value in range(10):
+        scheduler.markState(value)
+    assert recorder.states == []
+    assert processEventsUntil(qapp, lambda: recorder.states)
+    processEventsFor(qapp, 0.02)
+    assert [state for state, _ in recorder.states] == [9]
+    assert scheduler.stats() == {'max_fps': 1000., 'emissions': 10, 'renders': 1, 'coalesced': 9}
+
+
+def test_property_changes_merge_per_property(qapp):
+    scheduler, recorder = makeScheduler()
+    scheduler.markProperty(PropertyChange('a', 0, 1))
+    scheduler.markProperty(PropertyChange('b', 'x', 'y'))
+    scheduler.markProperty(PropertyChange('a', 1, 2))
+    assert processEventsUntil(qapp, lambda: len(recorder.changes) == 2)
+    assert recorder.changes == [PropertyChange('a', 0, 2), PropertyChange('b', 'x', 'y')]
+
+
+def test_state_supersedes_property_changes_in_same_frame(qapp):
+    scheduler, recorder = makeScheduler()
+    scheduler.markProperty(PropertyChange('a', 0, 1))
+    scheduler.markState('model')
+    assert processEventsUntil(qapp, lambda: recorder.states)
+    processEventsFor(qapp, 0.02)
+    assert recorder.changes == []
+
+
+def test_max_fps_spaces_renders(qapp):
+    scheduler, recorder = makeScheduler(max_fps=20)
+    scheduler.markState(1)
+    assert processEventsUntil(qapp, lambda: len(recorder.states) == 1)
+    scheduler.markState(2)
+    scheduler.markState(3)
+    assert processEventsUntil(qapp, lambda: len(recorder.states) == 2)
+    (_, first), (state, second) = recorder.states
+    assert state == 3
+    assert second - first >= 1 / 20 - 0.005
+
+
+def test_flush_renders_pending_state_immediately(qapp):
+    scheduler, recorder = makeScheduler(max_fps=1)
+    scheduler.markState(1)
+    scheduler.flush()
+    assert [state for state, _ in recorder.states] == [1]
+    # flush 後沒有待渲染的狀態，排定的 flush 不會再渲染
+    processEventsFor(qapp, 0.02)
+    assert len(recorder.states) == 1
+
+
+def test_cancel_drops_pending_and_ignores_new_marks(qapp):
+    scheduler, recorder = makeScheduler()
+    scheduler.markState(1)
+    scheduler.cancel()
+    scheduler.markState(2)
+    scheduler.markProperty(PropertyChange('a', 0, 1))
+    processEventsFor(qapp, 0.05)
+    assert recorder.states == [] and recorder.changes == []
+
+
+def test_marks_from_worker_render_on_gui_thread(qapp):
+    scheduler, recorder = makeScheduler()
+    worker = threading.Thread(target=lambda: [scheduler.markState(value) for value in range(100)])
+    worker.start()
+    worker.join()
+    assert processEventsUntil(qapp, lambda: recorder.states)
+    assert recorder.threads == [threading.get_ident()]
+    assert recorder.states[-1][0] == 99
+
+
+def test_view_max_fps_coalesces_emits(qapp):
+    from PySide6 import QtWidgets
+    from View import BaseView, isFragment
+    from ViewModel import ViewModel, ViewModelEventMediator
+
+    class Model(ViewModel):
+        def render(self):
+            self.sentinel.sig_state.emit(self)
+
+    class CountView(BaseView):
+        renders = 0
+
+        def setupUI(self, wg):
+            self.wg = wg
+
+        @isFragment()
+        def getModelState(self, view_model):
+            self.renders += 1
+
+    view = CountView('Count', Model('Count', ViewModelEventMediator()))
+    view.setupUI(QtWidgets.QWidget())
+    view.setMaxFps(1000)
+    view.run()
+    try:
+        for _ in range(50):
+            view.view_model.render()
+        assert processEventsUntil(qapp, lambda: view.renders)
+        processEventsFor(qapp, 0.02)
+        assert view.renders == 1
+        assert view.renderStats()['emissions'] == 50
+        with pytest.raises(Exception):
+            view.setMaxFps(30)
+    finally:
+        view.stop()
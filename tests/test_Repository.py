@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+import pytest
+from ViewModel.Repository import Repository, ColumnRepository, _numpy
+
+
+class State(Repository):
+    is_connect: bool = False
+    count: int = 0
+
+
+def test_repository_snapshot_and_version():
+    state = State()
+    snapshot = state.snapshot()
+    state.count = 1
+    state.update(is_connect=True, count=2)
+    assert snapshot == (False, 0)
+    assert state.snapshot() == (True, 2)
+    assert state.version == 2
+
+
+def test_column_window_wraps_around():
+    history = ColumnRepository(4, {'value': 'd'})
+    for i in range(6):
+        history.append(value=i)
+    assert list(history.window('value')) == [2., 3., 4., 5.]
+    assert list(history.window('value', 2)) == [4., 5.]
+    assert history.latest('value') == 5.
+    assert len(history) == 4 and history.total == 6
+
+
+@pytest.mark.parametrize('spec', ['d', ('f', 3)])
+def test_extend_empty_batch(spec):
+    if not isinstance(spec, str) and _numpy() is None:
+        pytest.skip('column width needs NumPy')
+    history = ColumnRepository(4, {'value': spec})
+    history.extend(value=[])
+    assert len(history) == 0 and history.total == 0
+
+
+def test_extend_more_than_capacity():
+    history = ColumnRepository(4, {'value': 'd'})
+    history.append(value=-1)
+    history.extend(value=list(range(10)))
+    assert list(history.window('value')) == [6., 7., 8., 9.]
+    assert history.total == 11
+
+
+def test_import_does_not_load_numpy_or_qt():
+    code = 'import sys, ViewModel; print("numpy" in sys.modules, "PySide6" in sys.modules)'
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True, check=True).stdout
+    assert out.split() == ['False', 'False']
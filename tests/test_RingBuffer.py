@@ -0,0 +1,193 @@
+import threading
+import time
+import pytest
+from FiniteReceiverMachine.RingBuffer import RingBuffer, OverflowPolicy, DispatchThread
+
+
+@pytest.mark.parametrize('policy', list(OverflowPolicy))
+def test_exactly_full(policy):
+    buffer = RingBuffer(4, policy)
+    for i in range(4):
+        assert buffer.push(i)
+    assert len(buffer) == 4
+    assert buffer.drain() == [0, 1, 2, 3]
+    assert buffer.drops == 0
+    assert buffer.stats()['high_water'] == 4
+
+
+@pytest.mark.parametrize('policy', list(OverflowPolicy))
+def test_wrap_around(policy):
+    buffer = RingBuffer(4, policy)
+    result = []
+    for i in range(10):
+        buffer.push(i)
+        if i % 3 == 2:
+            result.extend(buffer.drain())
+    result.extend(buffer.drain())
+    assert result == list(range(10))
+    assert buffer.drops == 0
+    assert buffer.pushed == buffer.popped == 10
+
+
+def test_drop_oldest():
+    buffer = RingBuffer(4, OverflowPolicy.DROP_OLDEST)
+    for i in range(7):
+        assert buffer.push(i)
+    assert len(buffer) == 4
+    assert buffer.drain() == [3, 4, 5, 6]
+    assert buffer.drops == 3
+
+
+def test_drop_oldest_partial_drain():
+    buffer = RingBuffer(4, OverflowPolicy.DROP_OLDEST)
+    for i in range(4):
+        buffer.push(i)
+    assert buffer.pop() == 0
+    for i in range(4, 7):
+        buffer.push(i)
+    assert buffer.drain() == [3, 4, 5, 6]
+    assert buffer.drops == 2
+
+
+def test_drop_newest():
+    buffer = RingBuffer(4, OverflowPolicy.DROP_NEWEST)
+    for i in range(4):
+        assert buffer.push(i)
+    assert not buffer.push(4)
+    assert not buffer.push(5)
+    assert buffer.drain() == [0, 1, 2, 3]
+    assert buffer.drops == 2
+
+
+def test_block_timeout():
+    buffer = RingBuffer(2, OverflowPolicy.BLOCK)
+    assert buffer.push(0) and buffer.push(1)
+    assert not buffer.push(2, timeout=0.01)
+    assert buffer.drops == 1
+    assert buffer.drain() == [0, 1]
+
+
+def test_block_waits_for_consumer():
+    buffer = RingBuffer(2, OverflowPolicy.BLOCK)
+    buffer.push(0)
+    buffer.push(1)
+    pushed = threading.Event()
+
+    def produce():
+        buffer.push(2, timeout=5)
+        pushed.set()
+
+    thread = threading.Thread(target=produce)
+    thread.start()
+    assert not pushed.wait(0.05)
+    assert buffer.pop() == 0
+    assert pushed.wait(5)
+    thread.join()
+    assert buffer.drain() == [1, 2]
+    assert buffer.drops == 0
+
+
+def test_block_close_wakes_producer():
+    buffer = RingBuffer(1, OverflowPolicy.BLOCK)
+    buffer.push(0)
+    thread = threading.Thread(target=buffer.push, args=(1, None))
+    thread.start()
+    buffer.close()
+    thread.join(5)
+    assert not thread.is_alive()
+    assert buffer.drops == 1
+
+
+def test_pop_timeout_on_empty():
+    buffer = RingBuffer(4)
+    assert buffer.pop() is None
+    assert buffer.pop(timeout=0.01) is None
+
+
+def test_concurrent_block_keeps_every_item():
+    buffer = RingBuffer(8, OverflowPolicy.BLOCK)
+    received = []
+    dispatch = DispatchThread(buffer, received.append)
+    dispatch.start()
+    for i in range(5000):
+        assert buffer.push(i, timeout=5)
+    dispatch.cancel()
+    assert received == list(range(5000))
+    assert buffer.drops == 0
+
+
+@pytest.mark.parametrize('policy', [OverflowPolicy.DROP_NEWEST, OverflowPolicy.DROP_OLDEST])
+def test_concurrent_drop_accounts_every_item(policy):
+    buffer = RingBuffer(8, policy)
+    received = []
+    dispatch = DispatchThread(buffer, received.append)
+    dispatch.start()
+    for i in range(20000):
+        buffer.push(i)
+    dispatch.cancel()
+    assert received == sorted(set(received))
+    assert len(received) + buffer.drops == 20000
+
+
+def test_drop_oldest_evicts_overwritten_items():
+    evicted = []
+    buffer = RingBuffer(4, OverflowPolicy.DROP_OLDEST, on_evict=evicted.append)
+    for i in range(7):
+        buffer.push(i)
+    assert evicted == [0, 1, 2]
+    assert buffer.drain() == [3, 4, 5, 6]
+    assert buffer.drops == 3
+
+
+def test_concurrent_drop_oldest_delivers_or_evicts_each_item_once():
+    evicted = []
+    buffer = RingBuffer(8, OverflowPolicy.DROP_OLDEST, on_evict=evicted.append)
+    received = []
+    dispatch = DispatchThread(buffer, received.append)
+    dispatch.start()
+    for i in range(20000):
+        buffer.push(i)
+    dispatch.cancel()
+    assert sorted(received + evicted) == list(range(20000))
+    assert len(evicted) == buffer.drops
+
+
+def test_dispatch_batches_up_to_batch_size():
+    buffer = RingBuffer(64)
+    for item in range(10):
+        buffer.push(item)
+    batches = []
+    thread = DispatchThread(buffer, batches.append, batch_size=4, daemon=True)
+    thread.start()
+    thread.cancel()
+    assert batches == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+
+
+def test_dispatch_waits_max_latency_for_a_full_batch():
+    buffer = RingBuffer(64)
+    batches = []
+    thread = DispatchThread(buffer, batches.append, batch_size=4, max_latency=0.2, daemon=True)
+    thread.start()
+    buffer.push(0)
+    time.sleep(0.05)
+    buffer.push(1)
+    buffer.push(2)
+    buffer.push(3)
+    time.sleep(0.05)
+    assert batches == [[0, 1, 2, 3]]
+    buffer.push(4)
+    time.sleep(0.3)
+    # 等待超過 max_latency 後送出不滿的批次
+    assert batches == [[0, 1, 2, 3], [4]]
+    thread.cancel()
+
+
+def test_dispatch_without_batch_size_calls_per_item():
+    buffer = RingBuffer(8)
+    for item in range(3):
+        buffer.push(item)
+    items = []
+    thread = DispatchThread(buffer, items.append, daemon=True)
+    thread.start()
+    thread.cancel()
+    assert items == [0, 1, 2]
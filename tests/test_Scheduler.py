@@ -0,0 +1,132 @@
+import threading
+import time
+from FiniteReceiverMachine.Scheduler import nextTick, MissedTickPolicy, ScheduleThread, SharedScheduler, NotifyThread
+
+
+def test_next_tick_on_time():
+    assert nextTick(0., 1., 0.5, MissedTickPolicy.SKIP) == (1., 0)
+    assert nextTick(0., 1., 0.5, MissedTickPolicy.CATCH_UP) == (1., 0)
+
+
+def test_skip_counts_missed_ticks_once():
+    assert nextTick(0., 1., 3.5, MissedTickPolicy.SKIP) == (4., 3)
+
+
+def test_catch_up_advances_one_interval_per_tick():
+    next_tick, total = 0., 0
+    for _ in range(4):
+        next_tick, missed = nextTick(next_tick, 1., 3.5, MissedTickPolicy.CATCH_UP)
+        total += missed
+    assert next_tick == 4.
+    assert total == 3
+
+
+def test_zero_interval():
+    assert nextTick(0., 0., 2., MissedTickPolicy.SKIP) == (2., 0)
+
+
+def test_catch_up_thread_counts_each_late_tick_once():
+    def slowFirstTick():
+        if thread.ticks == 0:
+            time.sleep(0.05)
+
+    thread = ScheduleThread(0.01, slowFirstTick, MissedTickPolicy.CATCH_UP, daemon=True)
+    thread.start()
+    time.sleep(0.12)
+    thread.cancel()
+    # 第一個 tick 耗時約 5 個 interval，之後補跑的 tick 各只計算一次
+    assert 3 <= thread.missed_ticks <= 6
+
+
+def test_zero_interval_thread_yields_to_other_threads():
+    thread = ScheduleThread(0, lambda: None, daemon=True)
+    thread.start()
+    count = 0
+    deadline = time.monotonic() + 0.1
+    while time.monotonic() < deadline:
+        count += 1
+    thread.cancel()
+    assert thread.ticks > 0
+    assert count > 1000
+
+
+def test_shared_scheduler_runs_jobs():
+    scheduler = SharedScheduler()
+    done = threading.Event()
+    job = scheduler.schedule(0.001, done.set)
+    job.start()
+    assert done.wait(1)
+    job.cancel()
+    scheduler.close()
+
+
+def test_shared_job_cancel_waits_for_running_call():
+    scheduler = SharedScheduler()
+    started, finished = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        finished.set()
+
+    job = scheduler.schedule(0, slow)
+    job.start()
+    assert started.wait(1)
+    job.cancel()
+    assert finished.is_set()
+    count = len(calls)
+    time.sleep(0.05)
+    assert len(calls) == count
+    scheduler.close()
+
+
+def test_shared_job_cancel_from_own_call_does_not_block():
+    scheduler = SharedScheduler()
+    done = threading.Event()
+    job = scheduler.schedule(0, lambda: (job.cancel(), done.set()))
+    job.start()
+    assert done.wait(1)
+    scheduler.close()
+
+
+def test_notify_thread_runs_only_when_notified():
+    calls = []
+    ran = threading.Event()
+    thread = NotifyThread(lambda: (calls.append(1), ran.set()), daemon=True)
+    thread.start()
+    time.sleep(0.05)
+    assert calls == []
+    thread.notify()
+    assert ran.wait(1)
+    ran.clear()
+    time.sleep(0.05)
+    assert calls == [1]
+    thread.notify()
+    assert ran.wait(1)
+    thread.cancel()
+    assert not thread.is_alive()
+    assert thread.ticks == 2
+
+
+def test_notify_thread_coalesces_notifies_while_running():
+    release = threading.Event()
+    calls = []
+
+    def func():
+        calls.append(1)
+        release.wait(1)
+
+    thread = NotifyThread(func, daemon=True)
+    thread.start()
+    thread.notify()
+    while not calls:
+        time.sleep(0.001)
+    for _ in range(10):
+        thread.notify()
+    release.set()
+    time.sleep(0.05)
+    thread.cancel()
+    # 執行期間的多次 notify 只再執行一次
+    assert len(calls) == 2
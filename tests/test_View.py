@@ -0,0 +1,247 @@
+import os
+import pytest
+from ViewModel import ViewModel, ViewModelEventMediator, ObservableProperty
+
+
+@pytest.fixture(scope='module')
+def qapp():
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PySide6 import QtWidgets
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+class StateModel(ViewModel):
+    is_on = False
+    title = ''
+
+    def render(self):
+        self.sentinel.sig_state.emit(self)
+
+
+def makeView(qapp, base=None):
+    from PySide6 import QtWidgets
+    from View import BaseView, isFragment
+
+    class ParentView(base or BaseView):
+        def setupUI(self, wg):
+            self.wg = wg
+            self.cb = QtWidgets.QCheckBox(wg)
+            self.lb = QtWidgets.QLabel(wg)
+            self.calls = []
+
+        @isFragment()
+        def getModelState(self, view_model):
+            self.calls.append('parent')
+
+    class DiffView(ParentView):
+        @isFragment()
+        def getModelState(self, view_model):
+            assert isinstance(self, ParentView)
+            super().getModelState(view_model)
+            self.diff(self.cb).setChecked(view_model.is_on)
+            self.diff(self.lb).setText(view_model.title)
+            self.diff(self.cb).setEnabled(view_model.is_on)
+
+    view = DiffView('Diff', StateModel('State', ViewModelEventMediator()))
+    view.setupUI(QtWidgets.QWidget())
+    return view
+
+
+def test_diff_fragment_receives_view_itself(qapp):
+    view = makeView(qapp)
+    view.view_model.title = 'A'
+    view.getModelState(view.view_model)
+    assert view.calls == ['parent']
+    assert view.lb.text() == 'A'
+
+
+def test_diff_skips_values_already_on_widget(qapp):
+    view = makeView(qapp)
+    model = view.view_model
+    model.is_on, model.title = True, 'A'
+    view.getModelState(model)
+    # checkbox 一開始就是 enabled，setEnabled(True) 不需要呼叫
+    assert view.widgetStats() == {'applied': 2, 'skipped': 1}
+    view.getModelState(model)
+    assert view.widgetStats() == {'applied': 2, 'skipped': 4}
+    model.title = 'B'
+    view.getModelState(model)
+    assert view.widgetStats() == {'applied': 3, 'skipped': 6}
+    assert view.lb.text() == 'B'
+
+
+def test_diff_restores_widget_edited_by_user(qapp):
+    view = makeView(qapp)
+    model = view.view_model
+    model.is_on = True
+    view.getModelState(model)
+    view.cb.setChecked(False)
+    view.getModelState(model)
+    assert view.cb.isChecked() is True
+
+
+def test_diff_compares_own_enabled_state_not_parent(qapp):
+    view = makeView(qapp)
+    model = view.view_model
+    view.wg.setEnabled(False)
+    model.is_on = False
+    view.getModelState(model)
+    view.wg.setEnabled(True)
+    assert view.cb.isEnabled() is False
+
+
+class PropertyModel(ViewModel):
+    count = ObservableProperty(0)
+    title = ObservableProperty('')
+    other = ObservableProperty(0)
+
+    def render(self):
+        self.sentinel.sig_state.emit(self)
+
+
+def makePropertyView(qapp):
+    from PySide6 import QtWidgets
+    from View import BaseView, isFragment
+
+    class PropertyView(BaseView):
+        def setupUI(self, wg):
+            self.wg = wg
+            self.calls = []
+
+        @isFragment()
+        def getModelState(self, view_model):
+            self.calls.append(('state', view_model.count, view_model.title))
+
+        @isFragment(observe='title')
+        def onTitle(self, change):
+            self.calls.append(('title', change.old, change.new))
+
+        @isFragment(observe=('count', 'title'))
+        def onCountOrTitle(self, change):
+            self.calls.append(('any', change.name))
+
+    view = PropertyView('Property', PropertyModel('Property', ViewModelEventMediator()))
+    view.setupUI(QtWidgets.QWidget())
+    return view
+
+
+def test_property_change_runs_only_observing_fragments(qapp):
+    view = makePropertyView(qapp)
+    view.run()
+    try:
+        view.view_model.title = 'A'
+        assert sorted(view.calls) == [('any', 'title'), ('title', '', 'A')]
+        view.calls.clear()
+        view.view_model.count = 1
+        assert view.calls == [('any', 'count')]
+    finally:
+        view.stop()
+
+
+def test_unobserved_property_falls_back_to_model_state(qapp):
+    view = makePropertyView(qapp)
+    view.run()
+    try:
+        view.view_model.other = 5
+        view.view_model.render()
+        assert view.calls == [('state', 0, ''), ('state', 0, '')]
+    finally:
+        view.stop()
+    view.view_model.title = 'B'
+    assert len(view.calls) == 2
+
+
+def test_bind_parses_target():
+    from View import bind, Binding
+    formatter = str
+    assert bind('count', 'lb.text', formatter) == Binding('count', 'lb', 'setText', formatter)
+    assert bind('count', 'lb.setText') == Binding('count', 'lb', 'setText')
+    assert bind('is_on', 'wg.enabled') == Binding('is_on', 'wg', 'setEnabled')
+    for target in ('lb', '.text', 'lb.'):
+        with pytest.raises(Exception):
+            bind('count', target)
+
+
+def makeBoundView(qapp, bindings):
+    from PySide6 import QtWidgets
+    from View import BaseView, isFragment
+
+    class BoundView(BaseView):
+        def setupUI(self, wg):
+            self.wg = wg
+            self.lb = QtWidgets.QLabel(wg)
+            self.lb_copy = QtWidgets.QLabel(wg)
+            self.states = 0
+
+        @isFragment()
+        def getModelState(self, view_model):
+            self.states += 1
+
+    BoundView.bindings = bindings
+    view = BoundView('Bound', PropertyModel('Bound', ViewModelEventMediator()))
+    view.setupUI(QtWidgets.QWidget())
+    return view
+
+
+def test_bindings_apply_initial_state_and_updates(qapp):
+    from View import bind
+    view = makeBoundView(qapp, (
+        bind('count', 'lb.text', lambda count: f'Count : {count}'),
+        bind('count', 'lb_copy.text', str),
+        bind('other', 'wg.enabled', bool),
+    ))
+    model = view.view_model
+    model.count = 3
+    view.run()
+    try:
+        assert view.lb.text() == 'Count : 3'
+        assert view.lb_copy.text() == '3'
+        assert view.wg.isEnabled() is False
+        model.count = 4
+        model.other = 1
+        assert (view.lb.text(), view.lb_copy.text()) == ('Count : 4', '4')
+        assert view.wg.isEnabled() is True
+        # 綁定的屬性只更新 widget，不執行 getModelState
+        assert view.states == 0
+    finally:
+        view.stop()
+    model.count = 5
+    assert view.lb.text() == 'Count : 4'
+
+
+def test_bindings_skip_unchanged_formatted_values(qapp):
+    from View import bind
+    view = makeBoundView(qapp, (bind('count', 'lb.text', lambda count: 'odd' if count % 2 else 'even'),))
+    view.run()
+    try:
+        stats = view.widgetStats()
+        view.view_model.count = 2
+        view.view_model.count = 4
+        view.view_model.count = 5
+        after = view.widgetStats()
+    finally:
+        view.stop()
+    assert view.lb.text() == 'odd'
+    assert after['applied'] - stats['applied'] == 1
+    assert after['skipped'] - stats['skipped'] == 2
+
+
+def test_sig_state_updates_bindings_before_fragment(qapp):
+    from View import bind
+    view = makeBoundView(qapp, (bind('title', 'lb.text'),))
+    view.run()
+    try:
+        view.view_model._title = 'direct'
+        view.view_model.render()
+        assert view.lb.text() == 'direct'
+        assert view.states == 1
+    finally:
+        view.stop()
+
+
+def test_binding_to_missing_widget_raises_on_run(qapp):
+    from View import bind
+    view = makeBoundView(qapp, (bind('count', 'missing.text'),))
+    with pytest.raises(Exception):
+        view.run()
+    assert not view.is_connected
@@ -0,0 +1,170 @@
+import os
+import threading
+from PySide6 import QtCore
+from ViewModel import ViewModel, ObservableProperty, PropertyChange, ViewModelEventMediator
+
+DIRECT = QtCore.Qt.ConnectionType.DirectConnection
+
+
+class Model(ViewModel):
+    sentinel_signals = {'sig_plugin': object}
+    value = ObservableProperty(0)
+    other = ObservableProperty(0)
+
+    def render(self):
+        self.sentinel.sig_state.emit(self)
+
+
+class Recorder:
+    def __init__(self, model:Model):
+        self.events = []
+        sentinel = model.sentinel
+        for name in ('sig_message', 'sig_state', 'sig_plugin'):
+            # 直接在 emit 的執行緒呼叫，才能記錄送出通知的執行緒
+            getattr(sentinel, name).connect(lambda arg, name=name: self.append(name, arg), DIRECT)
+        sentinel.sig_property.connect(lambda change: self.append('sig_property', change), DIRECT)
+        model.mediator.register('event', self.onEvent)
+
+    def append(self, name, arg):
+        self.events.append((name, arg, threading.get_ident()))
+
+    def onEvent(self, *args):
+        self.append('event', args)
+
+    def names(self):
+        return [(name, arg) for name, arg, _ in self.events]
+
+
+def test_observable_property_emits_change_only_when_value_changes():
+    model = Model('Model', ViewModelEventMediator())
+    recorder = Recorder(model)
+    model.value = 1
+    model.value = 1
+    model.other = 0
+    model.value = 2
+    assert recorder.names() == [('sig_property', PropertyChange('value', 0, 1)),
+                                ('sig_property', PropertyChange('value', 1, 2))]
+
+
+def test_observable_property_convert():
+    class Clamped(ViewModel):
+        level = ObservableProperty(0, convert=lambda value: max(0, min(value, 10)))
+
+        def render(self):...
+
+    model = Clamped('Clamped', ViewModelEventMediator())
+    changes = []
+    model.sentinel.sig_property.connect(changes.append, DIRECT)
+    model.level = 42
+    model.level = 12
+    assert model.level == 10
+    assert changes == [PropertyChange('level', 0, 10)]
+    assert Clamped('Other', ViewModelEventMediator()).level == 0
+
+def test_batch_keeps_emission_order():
+    model = Model('model', ViewModelEventMediator())
+    recorder = Recorder(model)
+    with model.batch():
+        model.sentinel.sig_message.emit('first')
+        model.value = 1
+        model.sentinel.sig_plugin.emit('plugin')
+        model.render()
+        model.mediator.trigger('event', 1)
+        model.sentinel.sig_message.emit('last')
+        assert recorder.events == []
+    assert recorder.names() == [
+        ('sig_message', 'first'),
+        ('sig_property', PropertyChange('value', 0, 1)),
+        ('sig_plugin', 'plugin'),
+        ('sig_state', model),
+        ('event', (1,)),
+        ('sig_message', 'last'),
+    ]
+
+
+def test_batch_merges_at_last_position():
+    model = Model('model', ViewModelEventMediator())
+    recorder = Recorder(model)
+    with model.batch():
+        model.value = 1
+        model.render()
+        model.mediator.trigger('event', 1)
+        model.other = 5
+        model.value = 2
+        with model.batch():
+            model.mediator.trigger('event', 2)
+            model.render()
+        model.other = 0
+    assert recorder.names() == [
+        ('sig_property', PropertyChange('value', 0, 2)),
+        ('event', (2,)),
+        ('sig_state', model),
+    ]
+
+
+def test_batch_only_captures_owning_thread():
+    model = Model('model', ViewModelEventMediator())
+    recorder = Recorder(model)
+    opened, emitted = threading.Event(), threading.Event()
+    main = threading.get_ident()
+
+    def worker():
+        with model.batch():
+            model.value = 1
+            opened.set()
+            emitted.wait(5)
+            model.sentinel.sig_message.emit('worker')
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    opened.wait(5)
+    model.sentinel.sig_message.emit('main')
+    model.other = 3
+    assert recorder.events == [('sig_message', 'main', main),
+                               ('sig_property', PropertyChange('other', 0, 3), main)]
+    emitted.set()
+    thread.join()
+    assert [(name, tid) for name, _, tid in recorder.events[2:]] == \
+        [('sig_property', thread.ident), ('sig_message', thread.ident)]
+
+
+def test_concurrent_batches():
+    model = Model('model', ViewModelEventMediator())
+    recorder = Recorder(model)
+    barrier = threading.Barrier(4)
+
+    def worker(index):
+        barrier.wait()
+        for i in range(200):
+            with model.batch():
+                model.sentinel.sig_message.emit(str(index))
+                with model.batch():
+                    model.sentinel.sig_message.emit(str(index))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    messages = [arg for name, arg, _ in recorder.events if name == 'sig_message']
+    assert sorted(messages) == sorted([str(i) for i in range(4)] * 400)
+
+
+def test_sentinel_created_off_gui_thread_belongs_to_gui_thread():
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PySide6 import QtWidgets
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    model = Model('Model', ViewModelEventMediator())
+    worker = threading.Thread(target=lambda: setattr(model, 'value', 1))
+    worker.start()
+    worker.join()
+    assert model.sentinel.thread() == app.thread()
+
+    received = []
+    model.sentinel.sig_state.connect(lambda vm: received.append(threading.get_ident()),
+                                      QtCore.Qt.ConnectionType.QueuedConnection)
+    worker = threading.Thread(target=model.render)
+    worker.start()
+    worker.join()
+    app.processEvents()
+    assert received == [threading.get_ident()]
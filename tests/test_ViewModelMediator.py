@@ -0,0 +1,233 @@
+import gc
+import os
+import threading
+import time
+import pytest
+from ViewModel.ViewModelMediator import ViewModelEventMediator, DispatchMode
+
+
+@pytest.fixture(scope='module')
+def qapp():
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PySide6 import QtWidgets
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+def processEventsUntil(app, predicate, timeout:float=2.)->bool:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        app.processEvents()
+        time.sleep(0.001)
+    return True
+
+
+class Handler:
+    def __init__(self):
+        self.calls = []
+
+    def handle(self, *args):
+        self.calls.append(args)
+
+
+class SlotsHandler:
+    __slots__ = ('calls',)
+
+    def __init__(self):
+        self.calls = []
+
+    def handle(self, *args):
+        self.calls.append(args)
+
+
+def test_bound_method_is_weak():
+    mediator = ViewModelEventMediator()
+    handler = Handler()
+    mediator.register('event', handler.handle)
+    mediator.trigger('event', 1)
+    assert handler.calls == [(1,)]
+    del handler
+    gc.collect()
+    assert mediator.handlerCount('event') == 0
+    mediator.trigger('event', 2)
+
+
+def test_lambda_is_kept_alive():
+    mediator = ViewModelEventMediator()
+    calls = []
+    mediator.register('event', lambda *args: calls.append(args))
+    gc.collect()
+    mediator.trigger('event', 1)
+    assert calls == [(1,)]
+
+
+def test_closure_and_local_function():
+    mediator = ViewModelEventMediator()
+    calls = []
+
+    def register():
+        def local(value):
+            calls.append(('local', value))
+        mediator.register('event', local)
+        mediator.register('event', lambda value: calls.append(('lambda', value)))
+
+    register()
+    gc.collect()
+    mediator.trigger('event', 1)
+    assert calls == [('local', 1), ('lambda', 1)]
+
+
+def test_function_unregister():
+    mediator = ViewModelEventMediator()
+    calls = []
+
+    def handler(value):
+        calls.append(value)
+
+    mediator.register('event', handler)
+    mediator.register('event', handler)
+    assert mediator.handlerCount('event') == 1
+    mediator.unregister('event', handler)
+    mediator.trigger('event', 1)
+    assert calls == []
+
+
+def test_builtin_bound_method():
+    mediator = ViewModelEventMediator()
+    calls = []
+    mediator.register('event', calls.append)
+    mediator.register('event', calls.append)
+    assert mediator.handlerCount('event') == 1
+    mediator.trigger('event', 1)
+    assert calls == [1]
+    mediator.unregister('event', calls.append)
+    mediator.trigger('event', 2)
+    assert calls == [1]
+
+
+def test_bound_method_without_weakref_support():
+    mediator = ViewModelEventMediator()
+    handler = SlotsHandler()
+    mediator.register('event', handler.handle)
+    mediator.trigger('event', 1)
+    assert handler.calls == [(1,)]
+    mediator.unregister('event', handler.handle)
+    assert mediator.handlerCount('event') == 0
+
+
+def test_same_method_of_different_objects():
+    mediator = ViewModelEventMediator()
+    first, second = Handler(), Handler()
+    mediator.register('event', first.handle)
+    mediator.register('event', second.handle)
+    mediator.trigger('event', 1)
+    assert first.calls == second.calls == [(1,)]
+
+
+def test_worker_lambda():
+    mediator = ViewModelEventMediator()
+    calls = []
+    mediator.register('event', lambda value: calls.append(value), DispatchMode.WORKER)
+    gc.collect()
+    for i in range(10):
+        mediator.trigger('event', i)
+    mediator.shutdown()
+    assert calls == list(range(10))
+
+
+def test_wildcard_subscription():
+    mediator = ViewModelEventMediator()
+    calls = []
+    mediator.register('device.*.connected', lambda: calls.append('one'))
+    mediator.register('device/**', lambda: calls.append('any'))
+    mediator.trigger('device.a.connected')
+    mediator.trigger('device.a.b')
+    assert calls == ['one', 'any', 'any']
+
+
+def test_dispatch_cache_is_bounded():
+    mediator = ViewModelEventMediator()
+    mediator.dispatch_cache_size = 8
+    calls = []
+    mediator.register('device.*.value', calls.append)
+    for index in range(100):
+        mediator.trigger(f'device.{index}.value', index)
+    assert calls == list(range(100))
+    assert len(mediator._dispatch) == 8
+    # 最近使用的 topic 保留在快取中
+    mediator.trigger('device.92.value', 'again')
+    mediator.trigger('device.200.value', 200)
+    assert 'device.92.value' in mediator._dispatch
+    assert 'device.93.value' not in mediator._dispatch
+
+
+def test_unregister_removes_empty_events():
+    mediator = ViewModelEventMediator()
+    handler = Handler()
+    mediator.register('event', handler.handle)
+    mediator.register('device.*', handler.handle)
+    mediator.unregister('event', handler.handle)
+    mediator.unregister('device.*', handler.handle)
+    assert mediator._events == {}
+    mediator.register('event', handler.handle)
+    del handler
+    gc.collect()
+    assert mediator._events == {}
+
+
+def test_register_during_trigger_is_not_lost():
+    mediator = ViewModelEventMediator()
+    stop = threading.Event()
+
+    def storm():
+        while not stop.is_set():
+            mediator.trigger('device.1.value', 0)
+
+    threads = [threading.Thread(target=storm) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    try:
+        for index in range(200):
+            calls = []
+            mediator.register('device.1.value', calls.append)
+            mediator.trigger('device.1.value', index)
+            assert index in calls
+            mediator.unregister('device.1.value', calls.append)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+def test_coalesce_without_event_loop_is_direct(monkeypatch):
+    mediator = ViewModelEventMediator()
+    monkeypatch.setattr(mediator._gui_queue, 'isGuiThread', lambda: None)
+    threads = []
+    mediator.register('event', lambda value: threads.append((value, threading.get_ident())))
+    mediator.setCoalesce('event', window=0.05, dedup=True)
+    for value in (1, 1, 2):
+        mediator.trigger('event', value)
+    assert threads == [(1, threading.get_ident()), (2, threading.get_ident())]
+    assert mediator.coalesceStats()['event']['deduped'] == 1
+
+
+def test_coalesce_window_delivers_last_payload_on_gui_thread(qapp):
+    mediator = ViewModelEventMediator()
+    calls = []
+    mediator.register('event', lambda value: calls.append((value, threading.get_ident())))
+    mediator.setCoalesce('event', window=0.02)
+
+    def produce():
+        for value in range(100):
+            mediator.trigger('event', value)
+
+    thread = threading.Thread(target=produce)
+    thread.start()
+    thread.join()
+    assert calls == []
+    assert processEventsUntil(qapp, lambda: calls)
+    assert calls == [(99, threading.get_ident())]
+    assert not any(isinstance(t, threading.Timer) for t in threading.enumerate())
+    stats = mediator.coalesceStats()['event']
+    assert stats['delivered'] == 1 and stats['collapsed'] == 99